@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import ChapistaProfile
+
+
+@admin.register(ChapistaProfile)
+class ChapistaProfileAdmin(LargeTableAdmin):
+    list_display = ['display_name', 'user', 'location', 'precio_hora_estimado', 'rating_promedio', 'disponibilidad']
+    list_select_related = ['user', 'location']
+    search_fields = ['^display_name']
+    raw_id_fields = ['user']
+    autocomplete_fields = ['location']
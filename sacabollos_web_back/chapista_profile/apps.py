@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ChapistaProfileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chapista_profile'
+
+    def ready(self):
+        from . import dashboard, directory
+        dashboard.connect_signals()
+        directory.connect_signals()
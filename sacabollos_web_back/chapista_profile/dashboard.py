@@ -0,0 +1,250 @@
+"""
+Chapista dashboard stats backed by the ChapistaDailyStats rollup
+
+Writes to proposals, contracts, transactions and reviews recompute only the
+(chapista, day) rollup rows they touch, after commit. Dashboard reads then
+aggregate at most one row per day instead of scanning raw history. Archived
+proposals/contracts, and payments of archived contracts, are counted too, so
+archival doesn't change the stats.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from core.rollups import day_bounds
+from job_contract.models import ArchivedJobContract, JobContract
+from job_proposal.models import ArchivedJobProposal, JobProposal
+from job_review.models import JobReview
+from transaction.models import Transaction
+from .models import ChapistaDailyStats, ChapistaProfile
+
+
+PERIODS = {
+    'month': 30,
+    'year': 365,
+    'all': None,
+}
+
+PROPOSAL_METRICS = {
+    'proposals_sent': Count('id'),
+    'proposals_accepted': Count('id', filter=Q(status='accepted')),
+    'proposals_rejected': Count('id', filter=Q(status='rejected')),
+}
+
+CONTRACT_METRICS = {
+    'contracts_started': Count('id'),
+    'contracts_finished': Count('id', filter=Q(status='finished')),
+    'contracts_cancelled': Count('id', filter=Q(status='cancelled')),
+}
+
+
+def _with_contract_chapista(queryset):
+    """
+    Annotate payments with their contract's chapista, wherever the contract lives
+    """
+    return queryset.annotate(contract_chapista_id=Coalesce(
+        Subquery(JobContract.objects.filter(pk=OuterRef('booking_id')).values('chapista_profile_id')[:1]),
+        Subquery(ArchivedJobContract.objects.filter(pk=OuterRef('booking_id')).values('chapista_profile_id')[:1]),
+        output_field=BigIntegerField(),
+    ))
+
+
+def _sources():
+    """
+    (queryset, chapista id lookup, metrics) for every table feeding the rollup
+    """
+    return [
+        (JobProposal.objects.all(), 'chapista_profile_id', PROPOSAL_METRICS),
+        (ArchivedJobProposal.objects.all(), 'chapista_profile_id', PROPOSAL_METRICS),
+        (JobContract.objects.all(), 'chapista_profile_id', CONTRACT_METRICS),
+        (ArchivedJobContract.objects.all(), 'chapista_profile_id', CONTRACT_METRICS),
+        (_with_contract_chapista(Transaction.objects.filter(status='completed')), 'contract_chapista_id',
+            {'earnings': Sum('amount')}),
+        (JobReview.objects.all(), 'to_user__chapistaprofile__id',
+            {'reviews_count': Count('id'), 'reviews_rating_sum': Sum('rating')}),
+    ]
+
+
+def refresh_day(chapista_id, day):
+    """
+    Recompute one rollup row from the source tables
+
+    Args:
+        chapista_id (int): ChapistaProfile id
+        day (date): Local date to recompute
+    """
+    if not ChapistaProfile.objects.filter(pk=chapista_id).exists():
+        return
+    start, end = day_bounds(day)
+    values = {}
+    for queryset, chapista_lookup, metrics in _sources():
+        row = queryset.filter(
+            **{chapista_lookup: chapista_id}, created_at__gte=start, created_at__lt=end
+        ).aggregate(**metrics)
+        for name, value in row.items():
+            values[name] = values.get(name, 0) + (value or 0)
+    ChapistaDailyStats.objects.update_or_create(chapista_profile_id=chapista_id, day=day, defaults=values)
+
+
+def rebuild(chapista_ids=None):
+    """
+    Rebuild rollup rows from scratch with one grouped query per source table
+
+    Args:
+        chapista_ids (list): Only rebuild these chapistas (None = all)
+
+    Returns:
+        int: Rollup rows written
+    """
+    rows = defaultdict(lambda: defaultdict(int))
+    for queryset, chapista_lookup, metrics in _sources():
+        if chapista_ids is not None:
+            queryset = queryset.filter(**{f'{chapista_lookup}__in': chapista_ids})
+        grouped = (
+            queryset.filter(**{f'{chapista_lookup}__isnull': False})
+            .annotate(day=TruncDate('created_at'))
+            .values(chapista_lookup, 'day')
+            .annotate(**metrics)
+            .order_by()
+        )
+        for row in grouped:
+            target = rows[(row[chapista_lookup], row['day'])]
+            for name in metrics:
+                target[name] += row[name] or 0
+
+    with transaction.atomic():
+        stale = ChapistaDailyStats.objects.all()
+        if chapista_ids is not None:
+            stale = stale.filter(chapista_profile_id__in=chapista_ids)
+        stale.delete()
+        ChapistaDailyStats.objects.bulk_create(
+            [
+                ChapistaDailyStats(chapista_profile_id=chapista_id, day=day, **values)
+                for (chapista_id, day), values in rows.items()
+            ],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def _summary(earnings, proposals_accepted, proposals_rejected, proposals_sent,
+            reviews_count, reviews_rating_sum, contracts_finished, active_contracts):
+    decided = (proposals_accepted or 0) + (proposals_rejected or 0)
+    return {
+        'earnings': str((earnings or Decimal('0')).quantize(Decimal('0.01'))),
+        'active_contracts': active_contracts,
+        'contracts_finished': contracts_finished or 0,
+        'proposals_sent': proposals_sent or 0,
+        'acceptance_rate': round(proposals_accepted / decided, 4) if decided else None,
+        'reviews_count': reviews_count or 0,
+        'average_rating': round(reviews_rating_sum / reviews_count, 2) if reviews_count else None,
+    }
+
+
+def get_dashboard(chapista_id, period='month'):
+    """
+    Dashboard stats for a chapista over a period, from the rollup table
+
+    Two queries: one aggregate over the rollup rows of the period and one
+    count of contracts currently in progress (a state, not history).
+
+    Args:
+        chapista_id (int): ChapistaProfile id
+        period (str): 'month', 'year' or 'all'
+
+    Returns:
+        dict: Dashboard stats
+    """
+    stats = ChapistaDailyStats.objects.filter(chapista_profile_id=chapista_id)
+    days = PERIODS[period]
+    if days is not None:
+        stats = stats.filter(day__gt=timezone.localdate() - datetime.timedelta(days=days))
+    totals = stats.aggregate(
+        earnings=Sum('earnings'),
+        proposals_sent=Sum('proposals_sent'),
+        proposals_accepted=Sum('proposals_accepted'),
+        proposals_rejected=Sum('proposals_rejected'),
+        reviews_count=Sum('reviews_count'),
+        reviews_rating_sum=Sum('reviews_rating_sum'),
+        contracts_finished=Sum('contracts_finished'),
+    )
+    active = JobContract.objects.filter(chapista_profile_id=chapista_id, status='in_progress').count()
+    return _summary(active_contracts=active, **totals)
+
+
+def get_dashboard_from_raw(chapista_id, period='month'):
+    """
+    Same stats straight from the live source tables, one conditional
+    aggregation per table (used to check and benchmark the rollup)
+    """
+    days = PERIODS[period]
+    since = timezone.now() - datetime.timedelta(days=days) if days is not None else None
+
+    def scoped(queryset, chapista_lookup):
+        queryset = queryset.filter(**{chapista_lookup: chapista_id})
+        return queryset.filter(created_at__gte=since) if since is not None else queryset
+
+    in_period = Q(created_at__gte=since) if since is not None else Q()
+    proposals = scoped(JobProposal.objects.all(), 'chapista_profile_id').aggregate(**PROPOSAL_METRICS)
+    contracts = JobContract.objects.filter(chapista_profile_id=chapista_id).aggregate(
+        active_contracts=Count('id', filter=Q(status='in_progress')),
+        contracts_finished=Count('id', filter=Q(status='finished') & in_period),
+    )
+    earnings = scoped(Transaction.objects.filter(status='completed'), 'booking__chapista_profile_id').aggregate(
+        earnings=Sum('amount'),
+    )
+    reviews = scoped(JobReview.objects.all(), 'to_user__chapistaprofile__id').aggregate(
+        reviews_count=Count('id'), reviews_rating_sum=Sum('rating'),
+    )
+    return _summary(**proposals, **contracts, **earnings, **reviews)
+
+
+def _schedule_refresh(chapista_id, created_at):
+    if chapista_id is None or created_at is None:
+        return
+    day = timezone.localdate(created_at)
+    transaction.on_commit(lambda: refresh_day(chapista_id, day))
+
+
+def _chapista_saved(sender, instance, **kwargs):
+    _schedule_refresh(instance.chapista_profile_id, instance.created_at)
+
+
+def _transaction_saved(sender, instance, **kwargs):
+    chapista_id = (
+        JobContract.objects.filter(pk=instance.booking_id).values_list('chapista_profile_id', flat=True).first()
+        or ArchivedJobContract.objects.filter(pk=instance.booking_id)
+        .values_list('chapista_profile_id', flat=True).first()
+    )
+    _schedule_refresh(chapista_id, instance.created_at)
+
+
+def _review_saved(sender, instance, **kwargs):
+    chapista_id = (
+        ChapistaProfile.objects.filter(user_id=instance.to_user_id).values_list('id', flat=True).first()
+    )
+    _schedule_refresh(chapista_id, instance.created_at)
+
+
+def connect_signals():
+    """
+    Keep the rollup in sync with writes to the source tables
+
+    Archival bulk-inserts archive rows and deletes the live ones in the same
+    transaction, so the live post_delete refresh already sees both.
+    """
+    for model, handler in (
+        (JobProposal, _chapista_saved),
+        (JobContract, _chapista_saved),
+        (Transaction, _transaction_saved),
+        (JobReview, _review_saved),
+    ):
+        label = model._meta.label
+        post_save.connect(handler, sender=model, dispatch_uid=f'dashboard-save-{label}')
+        post_delete.connect(handler, sender=model, dispatch_uid=f'dashboard-delete-{label}')
@@ -0,0 +1,544 @@
+"""
+Process-local faceted search over ChapistaProfile
+
+Chapistas are loaded into a columnar snapshot where every row has a fixed
+position and every filterable value (service, rating band, price band,
+availability, location) owns a bitmap of positions stored as a Python int.
+A search ANDs the bitmaps of the active filters, and each facet count is a
+popcount of that result against a value bitmap, so results and all facet
+counts come out of the same pass without touching the database. Facets are
+disjunctive: the counts of a facet ignore that facet's own filter.
+
+Like the location autocomplete index, the snapshot is built lazily, kept in
+sync by signals in this process and fully rebuilt every REBUILD_INTERVAL
+seconds to pick up writes made by other processes (or through .update()).
+Only the first build runs on a request thread; a stale snapshot starts one
+background rebuild and keeps being served until the new one is swapped in.
+Signals only record the changed row; the next search applies every pending
+change to one copy of the snapshot, so a burst of profile saves costs one
+copy instead of one per save.
+"""
+import bisect
+import heapq
+import math
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+
+from core.pagination import decode_cursor, encode_cursor
+from locations.autocomplete import fold
+
+
+RATING_BANDS = [('0-1', 0, 1), ('1-2', 1, 2), ('2-3', 2, 3), ('3-4', 3, 4), ('4-5', 4, None)]
+PRICE_BANDS = [('0-20', 0, 20), ('20-30', 20, 30), ('30-40', 30, 40), ('40-60', 40, 60), ('60+', 60, None)]
+SORTS = ('rating', 'price', 'distance')
+LOCATION_FACET_SIZE = 20
+RANGE_CACHE_SIZE = 256
+EARTH_RADIUS_KM = 6371.0
+INF = float('inf')
+
+
+def _setting(name, default):
+    return getattr(settings, 'CHAPISTA_DIRECTORY', {}).get(name, default)
+
+
+def _band(bands, value):
+    if value is None:
+        return None
+    for label, low, high in bands:
+        if value >= low and (high is None or value < high):
+            return label
+    return None
+
+
+def _mask(positions, size):
+    bits = bytearray((size + 7) >> 3)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _positions(mask, size):
+    for i, byte in enumerate(mask.to_bytes((size + 7) >> 3, 'little')):
+        if byte:
+            base = i << 3
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield base + bit
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _decode_after(cursor, sort):
+    """
+    Returns:
+        tuple: (sort key, chapista id) to resume after, or None if the cursor
+        is malformed or was issued for another sort
+    """
+    values = decode_cursor(cursor, 3)
+    if values is None or values[0] != sort:
+        return None
+    try:
+        return float(values[1]), int(values[2])
+    except (ValueError, TypeError):
+        return None
+
+
+class _Snapshot:
+    """
+    Columns, bitmaps and sort orders of one version of the directory
+    """
+    __slots__ = (
+        'size', 'ids', 'ratings', 'prices', 'location_ids', 'pos_of', 'alive', 'available',
+        'services', 'rating_bands', 'price_bands', 'locations', 'coords', 'by_rating', 'by_price',
+        'range_masks',
+    )
+
+    def __init__(self):
+        self.size = 0
+        self.ids = []            # position -> chapista id (None once removed)
+        self.ratings = []        # position -> rating
+        self.prices = []         # position -> hourly price or None
+        self.location_ids = []   # position -> location id or None
+        self.pos_of = {}         # chapista id -> position
+        self.alive = 0
+        self.available = 0
+        self.services = {}       # folded service -> bitmap
+        self.rating_bands = {}   # band label -> bitmap
+        self.price_bands = {}    # band label -> bitmap
+        self.locations = {}      # location id -> bitmap
+        self.coords = {}         # location id -> (lat, lng, city)
+        self.by_rating = []      # sorted (-rating, chapista id)
+        self.by_price = []       # sorted (price or inf, chapista id)
+        self.range_masks = {}    # (column, low, high) -> bitmap, valid for this version only
+
+    def copy(self):
+        other = _Snapshot()
+        for name in self.__slots__:
+            if name != 'range_masks':
+                value = getattr(self, name)
+                setattr(other, name, value.copy() if isinstance(value, (list, dict)) else value)
+        return other
+
+
+class ChapistaDirectory:
+    """
+    Faceted chapista search over an in-memory snapshot
+
+    Pending changes are applied to a copy of the current snapshot that is
+    then swapped in, so readers never need the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # held by whoever is (re)building
+        self._snapshot = _Snapshot()
+        self._built_at = None
+        self._seq = 0          # number of the last recorded change
+        self._applied = 0      # last change included in the snapshot
+        self._changes = {}     # ('chapista', id) -> (seq, row or None if removed), ('location', id) -> (seq, coords)
+
+    @staticmethod
+    def _row(pk, rating, price, available, location_id, servicios):
+        return {
+            'id': pk,
+            'rating': float(rating or 0),
+            'price': float(price) if price is not None else None,
+            'available': available,
+            'location_id': location_id,
+            'services': {fold(str(s)) for s in servicios or [] if str(s).strip()},
+        }
+
+    @staticmethod
+    def _coords(location):
+        return (
+            float(location.lat) if location.lat is not None else None,
+            float(location.lng) if location.lng is not None else None,
+            location.city,
+        )
+
+    @staticmethod
+    def _set_bit(bitmaps, key, bit):
+        if key is not None:
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+
+    @staticmethod
+    def _clear_bit(bitmaps, key, bit):
+        if key in bitmaps:
+            bitmaps[key] &= ~bit
+            if not bitmaps[key]:
+                del bitmaps[key]
+
+    def _add(self, snap, pos, row):
+        bit = 1 << pos
+        snap.ids[pos] = row['id']
+        snap.ratings[pos] = row['rating']
+        snap.prices[pos] = row['price']
+        snap.location_ids[pos] = row['location_id']
+        snap.pos_of[row['id']] = pos
+        snap.alive |= bit
+        if row['available']:
+            snap.available |= bit
+        for service in row['services']:
+            self._set_bit(snap.services, service, bit)
+        self._set_bit(snap.rating_bands, _band(RATING_BANDS, row['rating']), bit)
+        self._set_bit(snap.price_bands, _band(PRICE_BANDS, row['price']), bit)
+        self._set_bit(snap.locations, row['location_id'], bit)
+
+    def _discard(self, snap, chapista_id):
+        pos = snap.pos_of.pop(chapista_id, None)
+        if pos is None:
+            return None
+        bit = 1 << pos
+        snap.ids[pos] = None
+        snap.alive &= ~bit
+        snap.available &= ~bit
+        for service in [s for s, bitmap in snap.services.items() if bitmap & bit]:
+            self._clear_bit(snap.services, service, bit)
+        self._clear_bit(snap.rating_bands, _band(RATING_BANDS, snap.ratings[pos]), bit)
+        self._clear_bit(snap.price_bands, _band(PRICE_BANDS, snap.prices[pos]), bit)
+        self._clear_bit(snap.locations, snap.location_ids[pos], bit)
+        for items, key in ((snap.by_rating, (-snap.ratings[pos], chapista_id)),
+                        (snap.by_price, (INF if snap.prices[pos] is None else snap.prices[pos], chapista_id))):
+            i = bisect.bisect_left(items, key)
+            if i < len(items) and items[i] == key:
+                del items[i]
+        return pos
+
+    def _insert(self, snap, row):
+        pos = self._discard(snap, row['id'])
+        if pos is None:
+            pos = snap.size
+            snap.size += 1
+            snap.ids.append(None)
+            snap.ratings.append(0.0)
+            snap.prices.append(None)
+            snap.location_ids.append(None)
+        self._add(snap, pos, row)
+        bisect.insort(snap.by_rating, (-row['rating'], row['id']))
+        bisect.insort(snap.by_price, (INF if row['price'] is None else row['price'], row['id']))
+        if row['coords'] is not None and row['location_id'] not in snap.coords:
+            snap.coords[row['location_id']] = row['coords']
+
+    def _load(self):
+        ChapistaProfile = apps.get_model('chapista_profile', 'ChapistaProfile')
+        Location = apps.get_model('locations', 'Location')
+        profiles = ChapistaProfile.objects.values_list(
+            'id', 'rating_promedio', 'precio_hora_estimado', 'disponibilidad', 'location', 'servicios_ofrecidos'
+        ).order_by('pk')
+
+        snap = _Snapshot()
+        rows = [self._row(*values) for values in profiles.iterator(chunk_size=2000)]
+        snap.size = len(rows)
+        snap.ids = [None] * snap.size
+        snap.ratings = [0.0] * snap.size
+        snap.prices = [None] * snap.size
+        snap.location_ids = [None] * snap.size
+        for pos, row in enumerate(rows):
+            self._add(snap, pos, row)
+        snap.by_rating = sorted((-row['rating'], row['id']) for row in rows)
+        snap.by_price = sorted((INF if row['price'] is None else row['price'], row['id']) for row in rows)
+        for pk, lat, lng, city in Location.objects.filter(pk__in=snap.locations).values_list('id', 'lat', 'lng', 'city'):
+            snap.coords[pk] = (float(lat) if lat is not None else None, float(lng) if lng is not None else None, city)
+        return snap
+
+    def build(self):
+        """
+        (Re)load every chapista and referenced location from the database
+        """
+        with self._lock:
+            started = self._seq
+        snap = self._load()
+        with self._lock:
+            # Changes recorded while loading may be missing from it: keep them pending for the new snapshot
+            self._changes = {key: change for key, change in self._changes.items() if change[0] > started}
+            self._snapshot = snap
+            self._applied = started
+            self._built_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        finally:
+            self._build_lock.release()
+            connection.close()
+
+    def _ensure_fresh(self):
+        if self._built_at is None:
+            # Nothing to serve yet: concurrent first searches wait for a single build
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+            return
+        interval = _setting('REBUILD_INTERVAL', 600)
+        if time.monotonic() - self._built_at > interval and self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild, name='chapista-directory-rebuild', daemon=True).start()
+
+    def _record(self, key, value):
+        with self._lock:
+            self._seq += 1
+            # re-insert so the dict stays in change order
+            self._changes.pop(key, None)
+            self._changes[key] = (self._seq, value)
+
+    def _apply_changes(self):
+        if self._applied == self._seq:
+            return
+        with self._lock:
+            pending = [(key, value) for key, (seq, value) in self._changes.items() if seq > self._applied]
+            if not pending:
+                return
+            snap = self._snapshot.copy()
+            for (kind, pk), value in pending:
+                if kind == 'location':
+                    if pk in snap.coords:
+                        snap.coords[pk] = value
+                elif value is None:
+                    self._discard(snap, pk)
+                else:
+                    self._insert(snap, value)
+            self._snapshot = snap
+            self._applied = self._seq
+
+    def upsert(self, profile):
+        """
+        Add or refresh a single chapista (applied by the next search)
+        """
+        if self._built_at is None:
+            return
+        row = self._row(profile.pk, profile.rating_promedio, profile.precio_hora_estimado,
+                        profile.disponibilidad, profile.location_id, profile.servicios_ofrecidos)
+        location_known = row['location_id'] is None or row['location_id'] in self._snapshot.coords
+        row['coords'] = None if location_known else self._coords(profile.location)
+        self._record(('chapista', row['id']), row)
+
+    def remove(self, chapista_id):
+        """
+        Drop a single chapista (applied by the next search)
+        """
+        if self._built_at is None:
+            return
+        self._record(('chapista', chapista_id), None)
+
+    def update_location(self, location):
+        """
+        Refresh the coordinates and city of a referenced location (applied by the next search)
+        """
+        if self._built_at is None:
+            return
+        self._record(('location', location.pk), self._coords(location))
+
+    @staticmethod
+    def _range_mask(snap, column, low, high):
+        # Range bitmaps cost a pass over the matching rows, and clients reuse
+        # a handful of bounds (rating >= 4, price <= 30...), so keep them
+        key = (column, low, high)
+        mask = snap.range_masks.get(key)
+        if mask is not None:
+            return mask
+        if len(snap.range_masks) >= RANGE_CACHE_SIZE:
+            snap.range_masks.clear()
+        items = snap.by_rating if column == 'rating' else snap.by_price
+        start = bisect.bisect_left(items, (low,)) if low is not None else 0
+        # Rows without a value sort last as inf and never match a range
+        end = bisect.bisect_right(items, (high, INF)) if high is not None else bisect.bisect_left(items, (INF,))
+        pos_of = snap.pos_of
+        mask = snap.range_masks[key] = _mask((pos_of[chapista_id] for _, chapista_id in items[start:end]), snap.size)
+        return mask
+
+    def _filter_masks(self, snap, servicios, rating_min, rating_max, precio_min, precio_max,
+                    disponibilidad, location_ids, near):
+        masks = {}
+        if servicios:
+            mask = 0
+            for service in servicios:
+                mask |= snap.services.get(fold(service), 0)
+            masks['servicios'] = mask
+        if rating_min is not None or rating_max is not None:
+            masks['rating'] = self._range_mask(
+                snap, 'rating',
+                -rating_max if rating_max is not None else None,
+                -rating_min if rating_min is not None else None,
+            )
+        if precio_min is not None or precio_max is not None:
+            masks['precio'] = self._range_mask(snap, 'precio', precio_min, precio_max)
+        if disponibilidad is not None:
+            masks['disponibilidad'] = snap.available if disponibilidad else snap.alive & ~snap.available
+        if location_ids:
+            mask = 0
+            for location_id in location_ids:
+                mask |= snap.locations.get(location_id, 0)
+            masks['location'] = mask
+        if near is not None and near[2] is not None:
+            lat, lng, radius_km = near
+            mask = 0
+            for location_id, (loc_lat, loc_lng, _) in snap.coords.items():
+                if loc_lat is not None and loc_lng is not None and haversine_km(lat, lng, loc_lat, loc_lng) <= radius_km:
+                    mask |= snap.locations.get(location_id, 0)
+            # Not a facet: the radius always applies
+            masks[None] = mask
+        return masks
+
+    @staticmethod
+    def _combine(snap, masks, skip=False):
+        result = snap.alive
+        for dim, mask in masks.items():
+            if dim != skip:
+                result &= mask
+        return result
+
+    def _facets(self, snap, masks):
+        def counts(dim, bitmaps):
+            base = self._combine(snap, masks, skip=dim)
+            return {key: (base & bitmap).bit_count() for key, bitmap in bitmaps.items()}
+
+        services = counts('servicios', snap.services)
+        ratings = counts('rating', snap.rating_bands)
+        prices = counts('precio', snap.price_bands)
+        locations = counts('location', snap.locations)
+        top_locations = heapq.nlargest(
+            LOCATION_FACET_SIZE, ((n, -pk) for pk, n in locations.items() if n)
+        )
+        availability = self._combine(snap, masks, skip='disponibilidad')
+        return {
+            'servicios': dict(sorted(((k, n) for k, n in services.items() if n), key=lambda kv: (-kv[1], kv[0]))),
+            'rating': {label: ratings.get(label, 0) for label, _, _ in RATING_BANDS},
+            'precio': {label: prices.get(label, 0) for label, _, _ in PRICE_BANDS},
+            'disponibilidad': {
+                'true': (availability & snap.available).bit_count(),
+                'false': (availability & ~snap.available).bit_count(),
+            },
+            'location': [
+                {'id': -neg_pk, 'city': snap.coords.get(-neg_pk, (None, None, None))[2], 'count': n}
+                for n, neg_pk in top_locations
+            ],
+        }
+
+    def _page(self, snap, mask, sort, near, after, limit):
+        count = mask.bit_count()
+        if sort == 'distance':
+            lat, lng = near[0], near[1]
+            distance_of = {}
+            for location_id, (loc_lat, loc_lng, _) in snap.coords.items():
+                if loc_lat is not None and loc_lng is not None:
+                    distance_of[location_id] = haversine_km(lat, lng, loc_lat, loc_lng)
+            keys = (
+                (distance_of.get(snap.location_ids[pos], INF), snap.ids[pos])
+                for pos in _positions(mask, snap.size)
+            )
+            if after is not None:
+                keys = (key for key in keys if key > after)
+            return heapq.nsmallest(limit + 1, keys)
+
+        items = snap.by_rating if sort == 'rating' else snap.by_price
+        start = bisect.bisect_right(items, after) if after is not None else 0
+        if count * count <= limit * len(items):
+            # Few matches: sort them directly
+            keys = (
+                (-snap.ratings[pos] if sort == 'rating' else (INF if snap.prices[pos] is None else snap.prices[pos]),
+                snap.ids[pos])
+                for pos in _positions(mask, snap.size)
+            )
+            if after is not None:
+                keys = (key for key in keys if key > after)
+            return heapq.nsmallest(limit + 1, keys)
+
+        # Most rows match: walk the sort order until the page is full
+        bits = mask.to_bytes((snap.size + 7) >> 3, 'little')
+        pos_of = snap.pos_of
+        page = []
+        for i in range(start, len(items)):
+            pos = pos_of[items[i][1]]
+            if bits[pos >> 3] >> (pos & 7) & 1:
+                page.append(items[i])
+                if len(page) > limit:
+                    break
+        return page
+
+    def search(self, servicios=None, rating_min=None, rating_max=None, precio_min=None, precio_max=None,
+            disponibilidad=None, location_ids=None, near=None, sort='rating', cursor=None, limit=20):
+        """
+        Filter chapistas, count every facet and return one keyset page
+
+        Args:
+            servicios (list): Match chapistas offering any of these services
+            rating_min (float): Minimum rating_promedio (inclusive)
+            rating_max (float): Maximum rating_promedio (inclusive)
+            precio_min (float): Minimum precio_hora_estimado (inclusive)
+            precio_max (float): Maximum precio_hora_estimado (inclusive)
+            disponibilidad (bool): Availability filter (None = any)
+            location_ids (list): Match chapistas in any of these locations
+            near (tuple): (lat, lng, radius_km or None); required for sort='distance'
+            sort (str): 'rating' (best first), 'price' (cheapest first) or 'distance' (closest first)
+            cursor (str): 'next' value of the previous page
+            limit (int): Page size
+
+        Returns:
+            dict: ids (page of chapista ids), distances (id -> km when near is
+            given), count, facets and next (cursor or None)
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Invalid sort '{sort}'. Valid sorts: {list(SORTS)}")
+        if sort == 'distance' and near is None:
+            raise ValueError("Sorting by distance needs lat and lng")
+        self._ensure_fresh()
+        self._apply_changes()
+        snap = self._snapshot
+
+        masks = self._filter_masks(snap, servicios, rating_min, rating_max, precio_min, precio_max,
+                                disponibilidad, location_ids, near)
+        result = self._combine(snap, masks)
+        after = _decode_after(cursor, sort) if cursor else None
+        page = self._page(snap, result, sort, near, after, limit)
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        distances = {}
+        if near is not None:
+            for _, chapista_id in page:
+                coords = snap.coords.get(snap.location_ids[snap.pos_of[chapista_id]])
+                if coords and coords[0] is not None and coords[1] is not None:
+                    distances[chapista_id] = round(haversine_km(near[0], near[1], coords[0], coords[1]), 2)
+
+        return {
+            'ids': [chapista_id for _, chapista_id in page],
+            'distances': distances,
+            'count': result.bit_count(),
+            'facets': self._facets(snap, masks),
+            'next': encode_cursor(sort, *page[-1]) if has_more else None,
+        }
+
+
+chapista_directory = ChapistaDirectory()
+
+
+def _profile_saved(sender, instance, **kwargs):
+    chapista_directory.upsert(instance)
+
+
+def _profile_deleted(sender, instance, **kwargs):
+    chapista_directory.remove(instance.pk)
+
+
+def _location_saved(sender, instance, **kwargs):
+    chapista_directory.update_location(instance)
+
+
+def connect_signals():
+    """
+    Keep the directory in sync with ChapistaProfile and Location writes
+    """
+    ChapistaProfile = apps.get_model('chapista_profile', 'ChapistaProfile')
+    Location = apps.get_model('locations', 'Location')
+    post_save.connect(_profile_saved, sender=ChapistaProfile, dispatch_uid='directory-chapista-save')
+    post_delete.connect(_profile_deleted, sender=ChapistaProfile, dispatch_uid='directory-chapista-delete')
+    post_save.connect(_location_saved, sender=Location, dispatch_uid='directory-location-save')
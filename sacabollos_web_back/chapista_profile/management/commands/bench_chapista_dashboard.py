@@ -0,0 +1,96 @@
+import datetime
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from chapista_profile.dashboard import get_dashboard, get_dashboard_from_raw, rebuild
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from job_proposal.models import JobProposal
+from transaction.models import Transaction
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the chapista dashboard from raw tables vs the daily rollup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contracts', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def _backdate(self, model, objs, now):
+        # auto_now_add overrides created_at on insert, so spread rows over ~3 years afterwards
+        for obj in objs:
+            obj.created_at = now - datetime.timedelta(days=obj.pk % 1095)
+        model.objects.bulk_update(objs, ['created_at'], batch_size=1000)
+
+    def _populate(self, contracts):
+        now = timezone.now()
+        company = CompanyProfile.objects.create(
+            user=User.objects.create(username='bench_company'), company_name='Bench SL',
+            contact_person='Bench', address='-',
+        )
+        chapista = ChapistaProfile.objects.create(
+            user=User.objects.create(username='bench_chapista'), display_name='Bench',
+        )
+        offers = JobOffer.objects.bulk_create(
+            (JobOffer(company=company, title=f'Offer {i}', description='-', status='assigned')
+                for i in range(contracts)),
+            batch_size=1000,
+        )
+        proposals = JobProposal.objects.bulk_create(
+            (JobProposal(job=offer, chapista_profile=chapista, message='-', proposed_price=Decimal('100'),
+                        proposed_time_hours=2, status='accepted' if i % 3 else 'rejected')
+                for i, offer in enumerate(offers)),
+            batch_size=1000,
+        )
+        jobs = JobContract.objects.bulk_create(
+            (JobContract(job=offer, chapista_profile=chapista, company=company, agreed_price=Decimal('100'),
+                        agreed_time_hours=2, status='finished' if i % 10 else 'in_progress')
+                for i, offer in enumerate(offers)),
+            batch_size=1000,
+        )
+        payments = Transaction.objects.bulk_create(
+            (Transaction(booking=job, amount=Decimal('100'), status='completed') for job in jobs[::2]),
+            batch_size=1000,
+        )
+        for model, objs in ((JobProposal, proposals), (JobContract, jobs), (Transaction, payments)):
+            self._backdate(model, objs, now)
+        return chapista.id
+
+    def _time(self, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                chapista_id = self._populate(options['contracts'])
+                self.stdout.write(f"Created {options['contracts']} contracts in {time.perf_counter() - start:.1f}s")
+
+                start = time.perf_counter()
+                rows = rebuild([chapista_id])
+                self.stdout.write(f'Rebuilt {rows} rollup rows in {time.perf_counter() - start:.2f}s')
+
+                for period in ('month', 'year', 'all'):
+                    raw = self._time(lambda: get_dashboard_from_raw(chapista_id, period), repeat)
+                    rollup = self._time(lambda: get_dashboard(chapista_id, period), repeat)
+                    self.stdout.write(
+                        f'{period:<6} raw {raw:8.2f} ms   rollup {rollup:6.2f} ms   ({raw / rollup:.0f}x)'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from chapista_profile.dashboard import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ChapistaDailyStats rollup from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('chapista_ids', nargs='*', type=int, help='Only these chapistas (default: all)')
+
+    def handle(self, *args, **options):
+        written = rebuild(options['chapista_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup rows'))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chapista_profile', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChapistaDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('contracts_started', models.IntegerField(default=0)),
+                ('contracts_finished', models.IntegerField(default=0)),
+                ('contracts_cancelled', models.IntegerField(default=0)),
+                ('proposals_sent', models.IntegerField(default=0)),
+                ('proposals_accepted', models.IntegerField(default=0)),
+                ('proposals_rejected', models.IntegerField(default=0)),
+                ('reviews_count', models.IntegerField(default=0)),
+                ('reviews_rating_sum', models.IntegerField(default=0)),
+                ('chapista_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='chapista_profile.chapistaprofile')),
+            ],
+            options={
+                'unique_together': {('chapista_profile', 'day')},
+            },
+        ),
+    ]
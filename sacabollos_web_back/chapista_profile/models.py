@@ -14,4 +14,29 @@ class ChapistaProfile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Chapista: {self.display_name}"
\ No newline at end of file
+        return f"Chapista: {self.display_name}"
+
+
+class ChapistaDailyStats(models.Model):
+    """
+    Per-chapista daily rollup backing the dashboard (see chapista_profile/dashboard.py)
+
+    Each source row is counted on the day it was created.
+    """
+    chapista_profile = models.ForeignKey(ChapistaProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    contracts_started = models.IntegerField(default=0)
+    contracts_finished = models.IntegerField(default=0)
+    contracts_cancelled = models.IntegerField(default=0)
+    proposals_sent = models.IntegerField(default=0)
+    proposals_accepted = models.IntegerField(default=0)
+    proposals_rejected = models.IntegerField(default=0)
+    reviews_count = models.IntegerField(default=0)
+    reviews_rating_sum = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['chapista_profile', 'day']
+
+    def __str__(self):
+        return f"Stats {self.chapista_profile_id} {self.day}"
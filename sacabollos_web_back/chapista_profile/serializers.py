@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from locations.serializers import LocationSerializer
+from .models import ChapistaProfile
+
+
+class ChapistaProfileSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading public chapista profile data
+    """
+    location = LocationSerializer(read_only=True)
+
+    class Meta:
+        model = ChapistaProfile
+        fields = ['id', 'display_name', 'bio', 'servicios_ofrecidos', 'precio_hora_estimado',
+                'rating_promedio', 'location', 'disponibilidad', 'created_at', 'updated_at']
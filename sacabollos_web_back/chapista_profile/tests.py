@@ -1,3 +1,242 @@
+import datetime
+import time
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from company_profile.models import CompanyProfile
+from job_contract.archive import contract_archive
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from job_proposal.archive import proposal_archive
+from job_proposal.models import JobProposal
+from job_review.models import JobReview
+from locations.models import Location
+from transaction.models import Transaction
+from . import dashboard
+from .directory import ChapistaDirectory, _Snapshot
+from .models import ChapistaDailyStats, ChapistaProfile
 
-# Create your tests here.
+
+class ChapistaDirectoryTests(TestCase):
+    def setUp(self):
+        self.sevilla = Location.objects.create(city='Sevilla', province='Sevilla', lat=Decimal('37.38'), lng=Decimal('-5.98'))
+        self.madrid = Location.objects.create(city='Madrid', province='Madrid', lat=Decimal('40.42'), lng=Decimal('-3.70'))
+        rows = [
+            ('ana', ['Chapa', 'Pintura'], '4.80', '35', True, self.sevilla),
+            ('beto', ['Pintura'], '4.20', '25', True, self.madrid),
+            ('carla', ['Granizo'], '3.10', None, False, self.sevilla),
+            ('dani', ['Chapa'], '2.50', '55', True, None),
+        ]
+        self.ids = {}
+        for name, servicios, rating, precio, disponible, location in rows:
+            user = User.objects.create_user(name, f'{name}@example.com', 'pass')
+            profile = ChapistaProfile.objects.create(
+                user=user, display_name=name, servicios_ofrecidos=servicios, rating_promedio=Decimal(rating),
+                precio_hora_estimado=Decimal(precio) if precio else None, disponibilidad=disponible, location=location,
+            )
+            self.ids[name] = profile.pk
+        self.directory = ChapistaDirectory()
+        self.directory.build()
+
+    def names(self, ids):
+        by_id = {pk: name for name, pk in self.ids.items()}
+        return [by_id[pk] for pk in ids]
+
+    def test_filters_and_disjunctive_facets(self):
+        result = self.directory.search(servicios=['chapa'], disponibilidad=True)
+        self.assertEqual(self.names(result['ids']), ['ana', 'dani'])
+        self.assertEqual(result['count'], 2)
+        # Service counts ignore the service filter but keep the availability one
+        self.assertEqual(result['facets']['servicios'], {'chapa': 2, 'pintura': 2})
+        self.assertEqual(result['facets']['disponibilidad'], {'true': 2, 'false': 0})
+        self.assertEqual(result['facets']['rating']['4-5'], 1)
+        self.assertEqual(result['facets']['precio'], {'0-20': 0, '20-30': 0, '30-40': 1, '40-60': 1, '60+': 0})
+
+    def test_ranges_exclude_missing_prices(self):
+        result = self.directory.search(rating_min=3, precio_min=20)
+        self.assertEqual(self.names(result['ids']), ['ana', 'beto'])
+
+    def test_keyset_pagination_by_price(self):
+        first = self.directory.search(sort='price', limit=2)
+        self.assertEqual(self.names(first['ids']), ['beto', 'ana'])
+        second = self.directory.search(sort='price', limit=2, cursor=first['next'])
+        self.assertEqual(self.names(second['ids']), ['dani', 'carla'])
+        self.assertIsNone(second['next'])
+
+    def test_distance_sort_and_radius(self):
+        result = self.directory.search(sort='distance', near=(40.4, -3.7, None))
+        self.assertEqual(self.names(result['ids'])[0], 'beto')
+        self.assertEqual(self.names(result['ids'])[-1], 'dani')
+        nearby = self.directory.search(near=(37.4, -6.0, 30))
+        self.assertEqual(self.names(nearby['ids']), ['ana', 'carla'])
+
+    def test_incremental_update_matches_rebuild(self):
+        profile = ChapistaProfile.objects.get(pk=self.ids['carla'])
+        profile.servicios_ofrecidos = ['Chapa']
+        profile.rating_promedio = Decimal('4.90')
+        profile.save()
+        self.directory.upsert(profile)
+        self.directory.remove(self.ids['dani'])
+        incremental = self.directory.search(servicios=['chapa'])
+        ChapistaProfile.objects.filter(pk=self.ids['dani']).delete()
+        self.directory.build()
+        self.assertEqual(incremental, self.directory.search(servicios=['chapa']))
+        self.assertEqual(self.names(incremental['ids']), ['carla', 'ana'])
+
+    def test_writes_are_applied_in_one_copy_by_the_next_search(self):
+        profiles = list(ChapistaProfile.objects.all())
+        with mock.patch.object(_Snapshot, 'copy', autospec=True, side_effect=_Snapshot.copy) as copy:
+            for profile in profiles:
+                profile.precio_hora_estimado = Decimal('10')
+                self.directory.upsert(profile)
+            self.directory.remove(self.ids['dani'])
+            copy.assert_not_called()
+            result = self.directory.search(precio_max=10)
+            self.directory.search(precio_max=10)
+        copy.assert_called_once()
+        self.assertEqual(sorted(self.names(result['ids'])), ['ana', 'beto', 'carla'])
+
+    def test_stale_snapshot_is_rebuilt_in_the_background(self):
+        self.directory._built_at = time.monotonic() - 3600
+        ChapistaProfile.objects.filter(pk=self.ids['dani']).update(servicios_ofrecidos=['Granizo'])
+        with mock.patch('chapista_profile.directory.threading.Thread') as thread:
+            # the old snapshot is served while one rebuild is pending
+            self.assertEqual(self.names(self.directory.search(servicios=['granizo'])['ids']), ['carla'])
+            self.assertEqual(self.names(self.directory.search(servicios=['granizo'])['ids']), ['carla'])
+        thread.assert_called_once()
+        with mock.patch('chapista_profile.directory.connection'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(self.names(self.directory.search(servicios=['granizo'])['ids']), ['carla', 'dani'])
+
+    def test_changes_made_during_a_rebuild_survive_it(self):
+        beto = ChapistaProfile.objects.get(pk=self.ids['beto'])
+        load = self.directory._load
+
+        def load_then_write():
+            snap = load()
+            # saved after the rebuild read the table
+            beto.servicios_ofrecidos = ['Granizo']
+            beto.save()
+            self.directory.upsert(beto)
+            return snap
+
+        with mock.patch.object(self.directory, '_load', side_effect=load_then_write):
+            self.directory.build()
+        self.assertEqual(self.names(self.directory.search(servicios=['granizo'])['ids']), ['beto', 'carla'])
+
+
+class ChapistaDashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'pass')
+        self.chapista = ChapistaProfile.objects.create(user=self.user, display_name='Ana')
+        self.company_user = User.objects.create_user('empresa', 'empresa@example.com', 'pass')
+        self.company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Talleres SL', contact_person='-', address='-'
+        )
+
+    def job(self, days_ago=0, proposal='pending', contract=None, paid=None, rating=None):
+        """
+        One offer with the chapista's proposal and optionally a contract, its
+        payment and the company's review, all created days_ago
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = JobOffer.objects.create(company=self.company, title='Aleta', description='-')
+            JobProposal.objects.create(
+                job=offer, chapista_profile=self.chapista, message='-', proposed_price=Decimal('100'),
+                proposed_time_hours=2, status=proposal,
+            )
+            if contract is not None:
+                signed = JobContract.objects.create(
+                    job=offer, chapista_profile=self.chapista, company=self.company,
+                    agreed_price=Decimal('100'), agreed_time_hours=2, status=contract,
+                )
+                if paid is not None:
+                    Transaction.objects.create(booking=signed, amount=Decimal(paid), status='completed')
+                    Transaction.objects.create(booking=signed, amount=Decimal('999'), status='failed')
+                if rating is not None:
+                    JobReview.objects.create(
+                        job=signed, from_user=self.company_user, to_user=self.user, rating=rating, comment='-'
+                    )
+        if days_ago:
+            when = timezone.now() - datetime.timedelta(days=days_ago)
+            for queryset in (
+                JobOffer.objects.filter(pk=offer.pk), JobProposal.objects.filter(job=offer),
+                JobContract.objects.filter(job=offer), Transaction.objects.filter(booking__job=offer),
+                JobReview.objects.filter(job__job=offer),
+            ):
+                queryset.update(created_at=when)
+        return offer
+
+    def assertMatchesLive(self):
+        for period in dashboard.PERIODS:
+            with self.assertNumQueries(2):
+                from_rollup = dashboard.get_dashboard(self.chapista.pk, period)
+            self.assertEqual(from_rollup, dashboard.get_dashboard_from_raw(self.chapista.pk, period), period)
+
+    def rollup_rows(self):
+        return list(ChapistaDailyStats.objects.order_by('day').values(*[
+            f.attname for f in ChapistaDailyStats._meta.concrete_fields if f.name != 'id'
+        ]))
+
+    def test_signals_keep_rollup_equal_to_live_aggregate(self):
+        self.job(proposal='accepted', contract='finished', paid='250.00', rating=5)
+        self.job(proposal='accepted', contract='in_progress', paid='80.50', rating=3)
+        self.job(proposal='rejected')
+        pending = self.job()
+        self.assertMatchesLive()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal = JobProposal.objects.get(job=pending)
+            proposal.status = 'accepted'
+            proposal.save()
+            JobReview.objects.filter(rating=3).delete()
+        self.assertMatchesLive()
+        summary = dashboard.get_dashboard(self.chapista.pk, 'month')
+        self.assertEqual(summary['earnings'], '330.50')
+        self.assertEqual((summary['proposals_sent'], summary['acceptance_rate']), (4, 0.75))
+        self.assertEqual((summary['reviews_count'], summary['average_rating']), (1, 5.0))
+
+        incremental = self.rollup_rows()
+        dashboard.rebuild()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_periods_match_live_aggregate_after_rebuild(self):
+        self.job(days_ago=3, proposal='accepted', contract='finished', paid='100.00', rating=4)
+        self.job(days_ago=45, proposal='accepted', contract='finished', paid='200.00', rating=2)
+        self.job(days_ago=200, proposal='rejected')
+        self.job(days_ago=800, proposal='accepted', contract='cancelled')
+        dashboard.rebuild()
+        self.assertMatchesLive()
+        self.assertEqual(dashboard.get_dashboard(self.chapista.pk, 'month')['earnings'], '100.00')
+        self.assertEqual(dashboard.get_dashboard(self.chapista.pk, 'year')['proposals_sent'], 3)
+        self.assertEqual(dashboard.get_dashboard(self.chapista.pk, 'all')['proposals_sent'], 4)
+
+    def test_archival_keeps_the_stats(self):
+        self.job(days_ago=400, proposal='rejected')
+        self.job(days_ago=500, proposal='accepted', contract='cancelled')
+        self.job(days_ago=600, proposal='accepted', contract='finished', paid='90.00', rating=4)
+        dashboard.rebuild()
+        before = dashboard.get_dashboard(self.chapista.pk, 'all')
+        self.assertEqual(before['earnings'], '90.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(contract_archive.run(180)['moved'], 2)
+            self.assertEqual(proposal_archive.run(180)['moved'], 1)
+        self.assertEqual(dashboard.get_dashboard(self.chapista.pk, 'all'), before)
+        rows = self.rollup_rows()
+        dashboard.rebuild()
+        self.assertEqual(self.rollup_rows(), rows)
+
+    def test_endpoint(self):
+        self.job(proposal='accepted', contract='in_progress', paid='60.00')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/chapistas/me/dashboard/', {'period': 'year'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'period': 'year', **dashboard.get_dashboard_from_raw(self.chapista.pk, 'year')})
+        self.assertEqual(response.data['active_contracts'], 1)
+        self.assertEqual(client.get('/api/chapistas/me/dashboard/', {'period': 'week'}).status_code, 400)
+        client.force_authenticate(self.company_user)
+        self.assertEqual(client.get('/api/chapistas/me/dashboard/').status_code, 404)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'chapista_profile'
+
+urlpatterns = [
+    path('', views.ChapistaProfileListView.as_view(), name='chapista_list'),
+    path('directory/', views.chapista_directory_search, name='chapista_directory'),
+    path('<int:pk>/', views.ChapistaProfileDetailView.as_view(), name='chapista_detail'),
+    path('me/dashboard/', views.chapista_dashboard, name='chapista_dashboard'),
+]
@@ -1,3 +1,109 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from core.cache import cache_response
+from users.identity import get_identity
+from .dashboard import PERIODS, get_dashboard
+from .directory import chapista_directory
+from .models import ChapistaProfile
+from .serializers import ChapistaProfileSerializer
 
-# Create your views here.
+
+@method_decorator(cache_response('chapistas', 'locations'), name='dispatch')
+class ChapistaProfileListView(generics.ListAPIView):
+    """
+    List chapista profiles (public)
+    """
+    queryset = ChapistaProfile.objects.select_related('location').order_by('-rating_promedio', 'id')
+    serializer_class = ChapistaProfileSerializer
+    permission_classes = [AllowAny]
+
+
+@method_decorator(cache_response('chapista:{pk}', 'locations'), name='dispatch')
+class ChapistaProfileDetailView(generics.RetrieveAPIView):
+    """
+    Retrieve a single chapista profile (public)
+    """
+    queryset = ChapistaProfile.objects.select_related('location')
+    serializer_class = ChapistaProfileSerializer
+    permission_classes = [AllowAny]
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chapista_dashboard(request):
+    """
+    Get the current chapista's earnings, contracts, acceptance rate and
+    average review for ?period=month|year|all
+    """
+    period = request.query_params.get('period', 'month')
+    if period not in PERIODS:
+        return Response({
+            'error': f"Invalid period '{period}'. Valid periods: {list(PERIODS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    chapista = get_identity(request).chapista
+    if chapista is None:
+        return Response({
+            'error': 'Chapista profile not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({'period': period, **get_dashboard(chapista.pk, period)})
+
+
+def _float_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    return float(value)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def chapista_directory_search(request):
+    """
+    Search chapistas with facet counts and keyset pagination
+
+    Filters: ?servicios=a,b&rating_min=&rating_max=&precio_min=&precio_max=
+    &disponibilidad=true|false&location=1,2&lat=&lng=&radius_km=
+    Sorting: ?sort=rating|price|distance&cursor=<next>&limit=
+    """
+    params = request.query_params
+    try:
+        lat, lng = _float_param(request, 'lat'), _float_param(request, 'lng')
+        near = (lat, lng, _float_param(request, 'radius_km')) if lat is not None and lng is not None else None
+        disponibilidad = params.get('disponibilidad')
+        result = chapista_directory.search(
+            servicios=[s for s in params.get('servicios', '').split(',') if s.strip()],
+            rating_min=_float_param(request, 'rating_min'),
+            rating_max=_float_param(request, 'rating_max'),
+            precio_min=_float_param(request, 'precio_min'),
+            precio_max=_float_param(request, 'precio_max'),
+            disponibilidad=None if disponibilidad in (None, '') else disponibilidad.lower() in ('1', 'true'),
+            location_ids=[int(pk) for pk in params.get('location', '').split(',') if pk.strip()],
+            near=near,
+            sort=params.get('sort', 'rating'),
+            cursor=params.get('cursor'),
+            limit=max(1, min(int(params.get('limit', 20)), 100)),
+        )
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    profiles = ChapistaProfile.objects.select_related('location').in_bulk(result['ids'])
+    results = []
+    for chapista_id in result['ids']:
+        if chapista_id in profiles:
+            data = ChapistaProfileSerializer(profiles[chapista_id]).data
+            if near is not None:
+                data['distance_km'] = result['distances'].get(chapista_id)
+            results.append(data)
+    return Response({
+        'count': result['count'],
+        'facets': result['facets'],
+        'results': results,
+        'next': result['next'],
+    })
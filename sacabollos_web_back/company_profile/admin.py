@@ -1,3 +1,25 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from users import moderation
+from .models import CompanyProfile
+
+
+@admin.register(CompanyProfile)
+class CompanyProfileAdmin(LargeTableAdmin):
+    list_display = ['company_name', 'user', 'contact_person', 'location', 'verified', 'created_at']
+    list_select_related = ['user', 'location']
+    search_fields = ['^company_name']
+    raw_id_fields = ['user']
+    autocomplete_fields = ['location']
+    actions = ['verify', 'unverify']
+
+    @admin.action(description='Verify selected companies')
+    def verify(self, request, queryset):
+        changed = moderation.verify_companies(queryset.values_list('user_id', flat=True), actor=request.user)
+        self.message_user(request, f'{changed} companies verified.', messages.SUCCESS)
+
+    @admin.action(description='Remove verification of selected companies')
+    def unverify(self, request, queryset):
+        changed = moderation.verify_companies(queryset.values_list('user_id', flat=True), verified=False, actor=request.user)
+        self.message_user(request, f'{changed} companies unverified.', messages.SUCCESS)
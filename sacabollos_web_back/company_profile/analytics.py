@@ -0,0 +1,297 @@
+"""
+Company analytics backed by daily and monthly rollup tables
+
+Writes to offers, contracts and transactions recompute the (company, day)
+daily row they touch and then its month row from the daily rows, after
+commit. A date range query reads monthly rows for whole months and daily rows
+for the partial months at both ends, so its cost doesn't grow with history.
+Archived offers/contracts, and payments of archived contracts, are counted
+too, so archival doesn't change past months.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, DurationField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from core.rollups import day_bounds, month_start, next_month
+from job_contract.models import ArchivedJobContract, JobContract
+from job_offer.models import ArchivedJobOffer, JobOffer
+from transaction.models import Transaction
+from .models import CompanyDailyStats, CompanyMonthlyStats, CompanyProfile
+
+
+STAT_FIELDS = [
+    'spend', 'offers_posted', 'contracts_signed', 'assign_seconds_sum', 'agreed_price_sum',
+    'budget_min_sum', 'budget_min_count', 'budget_max_sum', 'budget_max_count',
+]
+
+OFFER_METRICS = {'offers_posted': Count('id')}
+
+SPEND_METRICS = {'spend': Sum('amount')}
+
+CONTRACT_METRICS = {
+    'contracts_signed': Count('id'),
+    'agreed_price_sum': Sum('agreed_price'),
+    'assign_time_sum': Sum(F('created_at') - F('offer_created_at'), output_field=DurationField()),
+    'budget_min_sum': Sum('offer_budget_min'),
+    'budget_min_count': Count('offer_budget_min'),
+    'budget_max_sum': Sum('offer_budget_max'),
+    'budget_max_count': Count('offer_budget_max'),
+}
+
+
+def _with_offer(queryset):
+    """
+    Annotate contracts with their offer's columns, wherever the offer lives
+    """
+    def offer_column(name):
+        return Coalesce(
+            Subquery(JobOffer.objects.filter(pk=OuterRef('job_id')).values(name)[:1]),
+            Subquery(ArchivedJobOffer.objects.filter(pk=OuterRef('job_id')).values(name)[:1]),
+        )
+
+    return queryset.annotate(
+        offer_created_at=offer_column('created_at'),
+        offer_budget_min=offer_column('budget_min'),
+        offer_budget_max=offer_column('budget_max'),
+    )
+
+
+def _with_contract_company(queryset):
+    """
+    Annotate payments with their contract's company, wherever the contract lives
+    """
+    return queryset.annotate(contract_company_id=Coalesce(
+        Subquery(JobContract.objects.filter(pk=OuterRef('booking_id')).values('company_id')[:1]),
+        Subquery(ArchivedJobContract.objects.filter(pk=OuterRef('booking_id')).values('company_id')[:1]),
+        output_field=BigIntegerField(),
+    ))
+
+
+def _sources():
+    """
+    (queryset, company id lookup, metrics) for every table feeding the rollup
+    """
+    return [
+        (JobOffer.objects.all(), 'company_id', OFFER_METRICS),
+        (ArchivedJobOffer.objects.all(), 'company_id', OFFER_METRICS),
+        (_with_offer(JobContract.objects.all()), 'company_id', CONTRACT_METRICS),
+        (_with_offer(ArchivedJobContract.objects.all()), 'company_id', CONTRACT_METRICS),
+        (_with_contract_company(Transaction.objects.filter(status='completed')), 'contract_company_id',
+            SPEND_METRICS),
+    ]
+
+
+def _add_metrics(target, row, metrics):
+    for name in metrics:
+        value = row[name]
+        if value is None:
+            continue
+        if name == 'assign_time_sum':
+            target['assign_seconds_sum'] += int(value.total_seconds())
+        else:
+            target[name] += value
+
+
+def _refresh_month(company_id, month):
+    totals = CompanyDailyStats.objects.filter(
+        company_id=company_id, day__gte=month, day__lt=next_month(month)
+    ).aggregate(**{name: Sum(name) for name in STAT_FIELDS})
+    CompanyMonthlyStats.objects.update_or_create(
+        company_id=company_id, month=month,
+        defaults={name: value or 0 for name, value in totals.items()},
+    )
+
+
+def refresh_day(company_id, day):
+    """
+    Recompute the daily row of a company and then its month row
+
+    Args:
+        company_id (int): CompanyProfile id
+        day (date): Local date to recompute
+    """
+    if not CompanyProfile.objects.filter(pk=company_id).exists():
+        return
+    start, end = day_bounds(day)
+    values = defaultdict(int)
+    for queryset, company_lookup, metrics in _sources():
+        row = queryset.filter(
+            **{company_lookup: company_id}, created_at__gte=start, created_at__lt=end
+        ).aggregate(**metrics)
+        _add_metrics(values, row, metrics)
+    with transaction.atomic():
+        CompanyDailyStats.objects.update_or_create(
+            company_id=company_id, day=day, defaults={name: values[name] for name in STAT_FIELDS}
+        )
+        _refresh_month(company_id, month_start(day))
+
+
+def rebuild(company_ids=None):
+    """
+    Rebuild daily and monthly rows with one grouped query per source table
+
+    Args:
+        company_ids (list): Only rebuild these companies (None = all)
+
+    Returns:
+        tuple: (daily rows, monthly rows) written
+    """
+    daily = defaultdict(lambda: defaultdict(int))
+    for queryset, company_lookup, metrics in _sources():
+        if company_ids is not None:
+            queryset = queryset.filter(**{f'{company_lookup}__in': company_ids})
+        grouped = (
+            queryset.filter(**{f'{company_lookup}__isnull': False})
+            .annotate(day=TruncDate('created_at'))
+            .values(company_lookup, 'day')
+            .annotate(**metrics)
+            .order_by()
+        )
+        for row in grouped:
+            _add_metrics(daily[(row[company_lookup], row['day'])], row, metrics)
+
+    monthly = defaultdict(lambda: defaultdict(int))
+    for (company_id, day), values in daily.items():
+        target = monthly[(company_id, month_start(day))]
+        for name in STAT_FIELDS:
+            target[name] += values[name]
+
+    with transaction.atomic():
+        for model in (CompanyDailyStats, CompanyMonthlyStats):
+            stale = model.objects.all()
+            if company_ids is not None:
+                stale = stale.filter(company_id__in=company_ids)
+            stale.delete()
+        CompanyDailyStats.objects.bulk_create(
+            [
+                CompanyDailyStats(company_id=company_id, day=day, **{n: values[n] for n in STAT_FIELDS})
+                for (company_id, day), values in daily.items()
+            ],
+            batch_size=1000,
+        )
+        CompanyMonthlyStats.objects.bulk_create(
+            [
+                CompanyMonthlyStats(company_id=company_id, month=month, **{n: values[n] for n in STAT_FIELDS})
+                for (company_id, month), values in monthly.items()
+            ],
+            batch_size=1000,
+        )
+    return len(daily), len(monthly)
+
+
+def _ratio(total, count, places='0.01'):
+    if not count:
+        return None
+    return str((Decimal(total) / count).quantize(Decimal(places)))
+
+
+def summarize(values):
+    """
+    Turn summed rollup columns into the reported metrics
+    """
+    return {
+        'spend': str(Decimal(values['spend'] or 0).quantize(Decimal('0.01'))),
+        'offers_posted': values['offers_posted'] or 0,
+        'contracts_signed': values['contracts_signed'] or 0,
+        'avg_time_to_assign_hours': _ratio((values['assign_seconds_sum'] or 0) / 3600, values['contracts_signed']),
+        'avg_agreed_price': _ratio(values['agreed_price_sum'] or 0, values['contracts_signed']),
+        'avg_budget_min': _ratio(values['budget_min_sum'] or 0, values['budget_min_count']),
+        'avg_budget_max': _ratio(values['budget_max_sum'] or 0, values['budget_max_count']),
+    }
+
+
+def month_rows(company_id, start, end):
+    """
+    Per-month summed rollup columns for [start, end], whole months from the
+    monthly table and partial ones from the daily table (two queries)
+
+    Args:
+        company_id (int): CompanyProfile id
+        start (date): First day (inclusive)
+        end (date): Last day (inclusive)
+
+    Returns:
+        list: (month, values dict) tuples ordered by month
+    """
+    first_full = start if start.day == 1 else next_month(start)
+    after_last_full = month_start(end + datetime.timedelta(days=1))
+
+    months = defaultdict(lambda: defaultdict(int))
+    if first_full < after_last_full:
+        for row in CompanyMonthlyStats.objects.filter(
+            company_id=company_id, month__gte=first_full, month__lt=after_last_full
+        ).values('month', *STAT_FIELDS):
+            months[row.pop('month')].update(row)
+
+    # Leading partial month, then trailing one unless it is the same month
+    edges = Q(day__gte=start, day__lt=min(first_full, end + datetime.timedelta(days=1)))
+    if after_last_full >= first_full:
+        edges |= Q(day__gte=after_last_full, day__lte=end)
+    for row in (
+        CompanyDailyStats.objects.filter(edges, company_id=company_id)
+        .annotate(month=TruncMonth('day')).values('month')
+        .annotate(**{name: Sum(name) for name in STAT_FIELDS}).order_by()
+    ):
+        month = row.pop('month')
+        for name, value in row.items():
+            months[month][name] += value or 0
+    return sorted(months.items())
+
+
+def get_analytics(company_id, start, end):
+    """
+    Analytics of a company for a date range: totals and a per-month series
+
+    Returns:
+        dict: totals and months
+    """
+    rows = month_rows(company_id, start, end)
+    totals = defaultdict(int)
+    for _, values in rows:
+        for name in STAT_FIELDS:
+            totals[name] += values[name]
+    return {
+        'start': start,
+        'end': end,
+        'totals': summarize(totals),
+        'months': [{'month': month.strftime('%Y-%m'), **summarize(values)} for month, values in rows],
+    }
+
+
+def _schedule_refresh(company_id, created_at):
+    if company_id is None or created_at is None:
+        return
+    day = timezone.localdate(created_at)
+    transaction.on_commit(lambda: refresh_day(company_id, day))
+
+
+def _company_row_saved(sender, instance, **kwargs):
+    _schedule_refresh(instance.company_id, instance.created_at)
+
+
+def _transaction_saved(sender, instance, **kwargs):
+    company_id = (
+        JobContract.objects.filter(pk=instance.booking_id).values_list('company_id', flat=True).first()
+        or ArchivedJobContract.objects.filter(pk=instance.booking_id).values_list('company_id', flat=True).first()
+    )
+    _schedule_refresh(company_id, instance.created_at)
+
+
+def connect_signals():
+    """
+    Keep the rollups in sync with writes to the source tables
+    """
+    for model, handler in (
+        (JobOffer, _company_row_saved),
+        (JobContract, _company_row_saved),
+        (Transaction, _transaction_saved),
+    ):
+        label = model._meta.label
+        post_save.connect(handler, sender=model, dispatch_uid=f'company-analytics-save-{label}')
+        post_delete.connect(handler, sender=model, dispatch_uid=f'company-analytics-delete-{label}')
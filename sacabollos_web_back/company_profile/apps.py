@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CompanyProfileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'company_profile'
+
+    def ready(self):
+        from . import analytics
+        analytics.connect_signals()
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from company_profile.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the company daily/monthly analytics rollups from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('company_ids', nargs='*', type=int, help='Only these companies (default: all)')
+
+    def handle(self, *args, **options):
+        daily, monthly = rebuild(options['company_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {daily} daily and {monthly} monthly rollup rows'))
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company_profile', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('offers_posted', models.IntegerField(default=0)),
+                ('contracts_signed', models.IntegerField(default=0)),
+                ('assign_seconds_sum', models.BigIntegerField(default=0, help_text='Sum of offer -> contract delays')),
+                ('agreed_price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_min_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_min_count', models.IntegerField(default=0)),
+                ('budget_max_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_max_count', models.IntegerField(default=0)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='company_profile.companyprofile')),
+            ],
+            options={
+                'unique_together': {('company', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CompanyDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('offers_posted', models.IntegerField(default=0)),
+                ('contracts_signed', models.IntegerField(default=0)),
+                ('assign_seconds_sum', models.BigIntegerField(default=0, help_text='Sum of offer -> contract delays')),
+                ('agreed_price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_min_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_min_count', models.IntegerField(default=0)),
+                ('budget_max_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('budget_max_count', models.IntegerField(default=0)),
+                ('day', models.DateField()),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='company_profile.companyprofile')),
+            ],
+            options={
+                'unique_together': {('company', 'day')},
+            },
+        ),
+    ]
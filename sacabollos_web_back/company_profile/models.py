@@ -15,4 +15,47 @@ class CompanyProfile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.company_name
\ No newline at end of file
+        return self.company_name
+
+
+class CompanyStatsBase(models.Model):
+    """
+    Columns shared by the company analytics rollups (see company_profile/analytics.py)
+
+    Offers count on the day they were posted, contracts on the day they were
+    signed and spend on the day the transaction was created.
+    """
+    company = models.ForeignKey(CompanyProfile, on_delete=models.CASCADE)
+    spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    offers_posted = models.IntegerField(default=0)
+    contracts_signed = models.IntegerField(default=0)
+    assign_seconds_sum = models.BigIntegerField(default=0, help_text="Sum of offer -> contract delays")
+    agreed_price_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    budget_min_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    budget_min_count = models.IntegerField(default=0)
+    budget_max_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    budget_max_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class CompanyDailyStats(CompanyStatsBase):
+    day = models.DateField()
+
+    class Meta:
+        unique_together = ['company', 'day']
+
+    def __str__(self):
+        return f"Stats {self.company_id} {self.day}"
+
+
+class CompanyMonthlyStats(CompanyStatsBase):
+    month = models.DateField(help_text="First day of the month")
+
+    class Meta:
+        unique_together = ['company', 'month']
+
+    def __str__(self):
+        return f"Stats {self.company_id} {self.month:%Y-%m}"
+
@@ -1,3 +1,252 @@
+import csv
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from job_contract.archive import contract_archive
+from job_contract.models import ArchivedJobContract, JobContract
+from job_offer.archive import offer_archive
+from job_offer.models import ArchivedJobOffer, JobOffer
+from transaction.models import Transaction
+from . import analytics
+from .models import CompanyDailyStats, CompanyMonthlyStats, CompanyProfile
 
-# Create your tests here.
+
+def at(day, hour=9):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+
+class CompanyAnalyticsTests(TestCase):
+    # (offer day, budget min, budget max, contract (status, agreed price) or None, paid amounts)
+    JOBS = [
+        (datetime.date(2025, 1, 15), '100', '300', ('finished', '250'), ['250.00']),
+        (datetime.date(2025, 2, 1), '50', None, ('in_progress', '80.50'), ['40.25', '40.25']),
+        (datetime.date(2025, 2, 28), None, None, None, []),
+        (datetime.date(2025, 3, 1), '200', '400', ('cancelled', '300'), []),
+        (datetime.date(2025, 3, 10), None, '90', ('finished', '95'), ['95.00']),
+        (datetime.date(2025, 3, 31), '10', '20', None, []),
+        (datetime.date(2025, 5, 20), '500', '900', ('finished', '700'), ['700.00']),
+    ]
+
+    RANGES = [
+        (datetime.date(2025, 1, 1), datetime.date(2025, 12, 31)),
+        (datetime.date(2025, 1, 20), datetime.date(2025, 3, 15)),
+        (datetime.date(2025, 2, 1), datetime.date(2025, 2, 28)),
+        (datetime.date(2025, 3, 5), datetime.date(2025, 3, 20)),
+        (datetime.date(2025, 2, 28), datetime.date(2025, 3, 1)),
+        (datetime.date(2025, 3, 2), datetime.date(2025, 5, 31)),
+        (datetime.date(2024, 6, 1), datetime.date(2024, 12, 31)),
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user('empresa', 'empresa@example.com', 'pass')
+        self.company = CompanyProfile.objects.create(
+            user=self.user, company_name='Talleres SL', contact_person='-', address='-'
+        )
+        other = User.objects.create_user('otra', 'otra@example.com', 'pass')
+        self.other = CompanyProfile.objects.create(user=other, company_name='Otra SL', contact_person='-', address='-')
+        chapista_user = User.objects.create_user('ana', 'ana@example.com', 'pass')
+        self.chapista = ChapistaProfile.objects.create(user=chapista_user, display_name='Ana')
+
+    def job(self, day, budget_min=None, budget_max=None, contract=None, paid=(), company=None, offer_status='open'):
+        """
+        One offer with an optional contract (signed 2 h later) and completed
+        payments, created on day; a failed payment is added next to each
+        """
+        company = company or self.company
+        offer = JobOffer.objects.create(
+            company=company, title='Aleta', description='-', status=offer_status,
+            budget_min=budget_min and Decimal(budget_min), budget_max=budget_max and Decimal(budget_max),
+        )
+        JobOffer.objects.filter(pk=offer.pk).update(created_at=at(day))
+        if contract is None:
+            return offer
+        status, price = contract
+        signed = JobContract.objects.create(
+            job=offer, chapista_profile=self.chapista, company=company,
+            agreed_price=Decimal(price), agreed_time_hours=2, status=status,
+        )
+        JobContract.objects.filter(pk=signed.pk).update(created_at=at(day, 11))
+        for amount in paid:
+            Transaction.objects.create(booking=signed, amount=Decimal(amount), status='completed')
+            Transaction.objects.create(booking=signed, amount=Decimal('999'), status='failed')
+        Transaction.objects.filter(booking=signed).update(created_at=at(day, 12))
+        return offer
+
+    def create_jobs(self):
+        for day, budget_min, budget_max, contract, paid in self.JOBS:
+            self.job(day, budget_min, budget_max, contract, paid)
+        # noise from another company on the same days
+        self.job(datetime.date(2025, 2, 1), '1', '2', ('finished', '1'), ['1.00'], company=self.other)
+
+    def live_analytics(self, start, end):
+        """
+        get_analytics() computed from the live and archived rows, without the rollups
+        """
+        months = defaultdict(lambda: defaultdict(int))
+
+        def bucket(created_at):
+            day = timezone.localdate(created_at)
+            return months[day.replace(day=1)] if start <= day <= end else defaultdict(int)
+
+        offers = {}
+        for model in (JobOffer, ArchivedJobOffer):
+            for offer in model.objects.filter(company_id=self.company.pk):
+                offers[offer.pk] = offer
+                bucket(offer.created_at)['offers_posted'] += 1
+        contracts = set()
+        for model in (JobContract, ArchivedJobContract):
+            for contract in model.objects.filter(company_id=self.company.pk):
+                contracts.add(contract.pk)
+                offer = offers[contract.job_id]
+                values = bucket(contract.created_at)
+                values['contracts_signed'] += 1
+                values['agreed_price_sum'] += contract.agreed_price
+                values['assign_seconds_sum'] += int((contract.created_at - offer.created_at).total_seconds())
+                for name in ('budget_min', 'budget_max'):
+                    if getattr(offer, name) is not None:
+                        values[f'{name}_sum'] += getattr(offer, name)
+                        values[f'{name}_count'] += 1
+        for payment in Transaction.objects.filter(booking_id__in=contracts, status='completed'):
+            bucket(payment.created_at)['spend'] += payment.amount
+
+        totals = defaultdict(int)
+        for values in months.values():
+            for name in analytics.STAT_FIELDS:
+                totals[name] += values[name]
+        return {
+            'start': start,
+            'end': end,
+            'totals': analytics.summarize(totals),
+            'months': [
+                {'month': month.strftime('%Y-%m'), **analytics.summarize(values)}
+                for month, values in sorted(months.items())
+            ],
+        }
+
+    def assertMatchesLive(self):
+        for start, end in self.RANGES:
+            with CaptureQueriesContext(connection) as queries:
+                from_rollup = analytics.get_analytics(self.company.pk, start, end)
+            self.assertLessEqual(len(queries), 2)
+            self.assertEqual(from_rollup, self.live_analytics(start, end), (start, end))
+
+    def rollup_rows(self):
+        return [
+            list(model.objects.order_by('company_id', date_field).values_list('company_id', date_field, *analytics.STAT_FIELDS))
+            for model, date_field in ((CompanyDailyStats, 'day'), (CompanyMonthlyStats, 'month'))
+        ]
+
+    def test_ranges_match_live_aggregate_after_rebuild(self):
+        self.create_jobs()
+        # seven days and four months of this company, one of each of the other
+        self.assertEqual(analytics.rebuild(), (8, 5))
+        self.assertMatchesLive()
+
+        year = analytics.get_analytics(self.company.pk, *self.RANGES[0])
+        self.assertEqual(year['totals'], {
+            'spend': '1125.50', 'offers_posted': 7, 'contracts_signed': 5, 'avg_time_to_assign_hours': '2.00',
+            'avg_agreed_price': '285.10', 'avg_budget_min': '212.50', 'avg_budget_max': '422.50',
+        })
+        self.assertEqual([month['month'] for month in year['months']], ['2025-01', '2025-02', '2025-03', '2025-05'])
+
+        analytics.rebuild([self.other.pk])
+        self.assertMatchesLive()
+
+    def test_signals_keep_rollups_equal_to_rebuild(self):
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = JobOffer.objects.create(company=self.company, title='Aleta', description='-', budget_min=Decimal('60'))
+        with self.captureOnCommitCallbacks(execute=True):
+            contract = JobContract.objects.create(
+                job=offer, chapista_profile=self.chapista, company=self.company,
+                agreed_price=Decimal('75'), agreed_time_hours=1,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = Transaction.objects.create(booking=contract, amount=Decimal('75'))
+        # pending payments are no spend yet
+        self.assertEqual(analytics.get_analytics(self.company.pk, today, today)['totals']['spend'], '0.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.status = 'completed'
+            payment.save()
+            JobOffer.objects.create(company=self.company, title='Puerta', description='-')
+
+        summary = analytics.get_analytics(self.company.pk, today.replace(day=1), today)
+        self.assertEqual(summary, self.live_analytics(today.replace(day=1), today))
+        self.assertEqual(
+            (summary['totals']['spend'], summary['totals']['offers_posted'], summary['totals']['avg_budget_min']),
+            ('75.00', 2, '60.00'),
+        )
+        incremental = self.rollup_rows()
+        analytics.rebuild()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.delete()
+        self.assertEqual(analytics.get_analytics(self.company.pk, today, today)['totals'], analytics.summarize({
+            name: 1 if name == 'offers_posted' else 0 for name in analytics.STAT_FIELDS
+        }))
+
+    def test_archival_keeps_past_months(self):
+        self.create_jobs()
+        self.job(datetime.date(2025, 4, 2), '30', '60', offer_status='closed')
+        cancelled = JobOffer.objects.get(created_at=at(datetime.date(2025, 3, 1)))
+        cancelled.status = 'cancelled'
+        cancelled.save()
+        analytics.rebuild()
+        before = [analytics.get_analytics(self.company.pk, start, end) for start, end in self.RANGES]
+
+        # paid contracts archive too, their payments stay live
+        self.assertEqual(contract_archive.run(180)['moved'], 5)
+        self.assertEqual(offer_archive.run(180)['moved'], 2)
+        self.assertEqual(ArchivedJobOffer.objects.count(), 2)
+        self.assertEqual(list(JobContract.objects.values_list('status', flat=True)), ['in_progress'])
+        self.assertEqual(Transaction.objects.filter(status='completed').count(), 6)
+        self.assertEqual([analytics.get_analytics(self.company.pk, start, end) for start, end in self.RANGES], before)
+        rows = self.rollup_rows()
+        analytics.rebuild()
+        self.assertEqual(self.rollup_rows(), rows)
+        self.assertMatchesLive()
+
+    def test_endpoint_and_csv_export(self):
+        self.create_jobs()
+        analytics.rebuild()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        start, end = self.RANGES[1]
+        response = client.get('/api/companies/me/analytics/', {'start': start, 'end': end})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.live_analytics(start, end))
+        self.assertEqual(client.get('/api/companies/me/analytics/', {'start': end, 'end': start}).status_code, 400)
+        self.assertEqual(client.get('/api/companies/me/analytics/', {'start': 'ayer'}).status_code, 400)
+
+        def export(granularity):
+            response = client.get('/api/companies/me/analytics/export/', {
+                'granularity': granularity, 'start': start, 'end': end,
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/csv')
+            return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+        # the first and last months are clipped to the range, like the JSON months
+        live = self.live_analytics(start, end)
+        for granularity in ('month', 'day'):
+            rows = export(granularity)
+            self.assertEqual(rows[0], [granularity, *analytics.STAT_FIELDS])
+            self.assertEqual(sum(int(row[2]) for row in rows[1:]), live['totals']['offers_posted'])
+            self.assertEqual(str(sum(Decimal(row[1]) for row in rows[1:])), live['totals']['spend'])
+            if granularity == 'month':
+                self.assertEqual(
+                    [(row[0][:7], int(row[2])) for row in rows[1:] if int(row[2])],
+                    [(month['month'], month['offers_posted']) for month in live['months'] if month['offers_posted']],
+                )
+        self.assertEqual([row[0] for row in rows[1:]], ['2025-02-01', '2025-02-28', '2025-03-01', '2025-03-10'])
+
+        client.force_authenticate(self.chapista.user)
+        self.assertEqual(client.get('/api/companies/me/analytics/').status_code, 404)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'company_profile'
+
+urlpatterns = [
+    path('me/analytics/', views.company_analytics, name='company_analytics'),
+    path('me/analytics/export/', views.export_company_analytics, name='company_analytics_export'),
+]
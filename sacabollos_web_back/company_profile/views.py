@@ -1,3 +1,98 @@
-from django.shortcuts import render
+import csv
+import datetime
 
-# Create your views here.
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from users.identity import get_identity
+from .analytics import STAT_FIELDS, get_analytics, month_rows
+from .models import CompanyDailyStats
+
+
+def _get_company_and_range(request):
+    """
+    Resolve the current user's company id and the ?start=&end= range
+    (ISO dates, default: the last 12 months)
+    """
+    company = get_identity(request).company
+    if company is None:
+        return None, None, Response({
+            'error': 'Company profile not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    try:
+        end = datetime.date.fromisoformat(request.query_params.get('end', timezone.localdate().isoformat()))
+        start = datetime.date.fromisoformat(
+            request.query_params.get('start', (end - datetime.timedelta(days=365)).isoformat())
+        )
+    except ValueError:
+        return None, None, Response({
+            'error': 'Invalid date, use YYYY-MM-DD'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return None, None, Response({
+            'error': 'start must be before end'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return company.pk, (start, end), None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def company_analytics(request):
+    """
+    Get spend, time-to-assign and accepted price vs budget for the current
+    company, as totals and per month
+    """
+    company_id, date_range, error = _get_company_and_range(request)
+    if error is not None:
+        return error
+    return Response(get_analytics(company_id, *date_range))
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line back to the csv writer caller
+    """
+    def write(self, value):
+        return value
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_company_analytics(request):
+    """
+    Stream the current company's rollup rows as CSV (?granularity=day|month)
+
+    Months cut by the range only count its days, so the totals match the
+    JSON analytics endpoint.
+    """
+    company_id, date_range, error = _get_company_and_range(request)
+    if error is not None:
+        return error
+    start, end = date_range
+
+    if request.query_params.get('granularity', 'month') == 'day':
+        columns = ['day', *STAT_FIELDS]
+        rows = CompanyDailyStats.objects.filter(
+            company_id=company_id, day__gte=start, day__lte=end
+        ).order_by('day').values_list(*columns).iterator(chunk_size=2000)
+    else:
+        # At most one row per month, clipped to the range
+        columns = ['month', *STAT_FIELDS]
+        rows = [
+            (month, *(values[name] for name in STAT_FIELDS))
+            for month, values in month_rows(company_id, start, end)
+        ]
+
+    writer = csv.writer(Echo())
+
+    def stream():
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="analytics_{start}_{end}.csv"'
+    return response
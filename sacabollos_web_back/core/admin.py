@@ -0,0 +1,63 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+
+# below this many rows the estimate is too coarse to be worth it and COUNT(*) is cheap anyway
+ESTIMATE_THRESHOLD = 100000
+
+
+def estimated_count(model):
+    """
+    Row count of the model's table from the database statistics, without
+    scanning it
+
+    Returns:
+        The estimate, or None on backends without usable statistics (SQLite)
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the table statistics for the unfiltered changelist
+
+    Filtered changelists keep the exact COUNT(*), which the indexed
+    list_filter columns keep cheap.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base ModelAdmin for tables that grow to millions of rows
+
+    Subclasses list every relation their list_display (and the __str__ of
+    those relations) touches in list_select_related, use raw_id_fields or
+    autocomplete_fields for foreign keys and only filter on indexed columns.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ['-pk']
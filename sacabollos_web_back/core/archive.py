@@ -0,0 +1,194 @@
+"""
+Archival of terminal-state rows into per-model archive tables
+
+An ArchivePolicy moves rows of a live model that reached a terminal status
+before a cutoff date into an archive model with the same column names, in
+bounded batches (one transaction per batch). Each batch locks its rows and
+checks them against the policy again before copying, so a row that stopped
+being eligible since the batch was listed (e.g. an offer that just got a
+contract) stays live instead of having its new children cascade deleted.
+history() reads both tables as one keyset-paginated UNION, so history views
+don't care where a row lives.
+"""
+import time
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class ArchivePolicy:
+    """
+    How rows of one live model get archived
+
+    Args:
+        model: Live model
+        archive_model: Archive model with the live model's column names
+        terminal_statuses (list): Status values that can be archived
+        exclude (Q): Condition for rows that must stay live (e.g. rows
+            other tables still reference with CASCADE)
+        children (list): (policy, fk attname) pairs archived together with
+            each batch, for children that would otherwise be cascade deleted
+    """
+
+    def __init__(self, model, archive_model, terminal_statuses, exclude=None, children=()):
+        self.model = model
+        self.archive_model = archive_model
+        self.terminal_statuses = list(terminal_statuses)
+        self.exclude = exclude
+        self.children = list(children)
+        self.fields = [f.attname for f in model._meta.concrete_fields]
+
+    @property
+    def label(self):
+        return self.model._meta.label
+
+    def candidates(self, cutoff):
+        """
+        Live rows eligible for archival
+        """
+        queryset = self.model.objects.filter(status__in=self.terminal_statuses, created_at__lt=cutoff)
+        if self.exclude is not None:
+            queryset = queryset.exclude(self.exclude)
+        return queryset
+
+    def archive_batch(self, ids, cutoff):
+        """
+        Archive the given rows that are still eligible; call inside a transaction
+
+        Returns:
+            int: Rows moved, children included
+        """
+        ids = list(
+            self.candidates(cutoff).filter(pk__in=ids).select_for_update().values_list('pk', flat=True)
+        )
+        if not ids:
+            return 0
+        return self._move(ids)
+
+    def _move(self, ids):
+        # Parents are locked by now, so no new child can reference them before the delete
+        moved = 0
+        for child, fk_attname in self.children:
+            child_ids = list(
+                child.model.objects.filter(**{f'{fk_attname}__in': ids}).values_list('pk', flat=True)
+            )
+            if child_ids:
+                moved += child._move(child_ids)
+
+        rows = list(self.model.objects.filter(pk__in=ids).values(*self.fields))
+        self.archive_model.objects.bulk_create(
+            [self.archive_model(**row) for row in rows], ignore_conflicts=True
+        )
+        self.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        return moved + len(rows)
+
+    def run(self, older_than_days, batch_size=1000, max_batches=None):
+        """
+        Archive eligible rows in batches
+
+        Args:
+            older_than_days (int): Only rows created before now - N days
+            batch_size (int): Rows per batch/transaction
+            max_batches (int): Stop after this many batches (None = until done)
+
+        Returns:
+            dict: moved rows, elapsed seconds and rows_per_second
+        """
+        cutoff = timezone.now() - timezone.timedelta(days=older_than_days)
+        moved, batches, last_id = 0, 0, 0
+        start = time.perf_counter()
+        while max_batches is None or batches < max_batches:
+            # Keyset over the pk so each batch query stays cheap as the table shrinks
+            ids = list(
+                self.candidates(cutoff).filter(pk__gt=last_id)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                moved += self.archive_batch(ids, cutoff)
+            last_id = ids[-1]
+            batches += 1
+        elapsed = time.perf_counter() - start
+        return {
+            'moved': moved,
+            'elapsed': elapsed,
+            'rows_per_second': moved / elapsed if elapsed else 0.0,
+        }
+
+    def history(self, *fields, before=None, limit=50, **filters):
+        """
+        One page of live and archived rows, newest first
+
+        Args:
+            *fields (str): Columns to return (defaults to every live column);
+                created_at and id are always included
+            before (tuple): (created_at, id) of the last row of the previous
+                page, None for the first page
+            limit (int): Rows per page
+            **filters: Lookups valid on both tables (plain columns, e.g. company_id=3)
+
+        Returns:
+            list: Row dicts ordered by (-created_at, -id)
+        """
+        fields = list(fields or self.fields)
+        fields += [name for name in ('created_at', 'id') if name not in fields]
+        keyset = Q()
+        if before is not None:
+            created_at, pk = before
+            keyset = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        live, archived = (
+            model.objects.filter(keyset, **filters).order_by().values(*fields)
+            for model in (self.model, self.archive_model)
+        )
+        return list(live.union(archived, all=True).order_by('-created_at', '-id')[:limit])
+
+
+def table_size(model):
+    """
+    Row count and, on MySQL, on-disk size of a model's table
+
+    Returns:
+        dict: rows and bytes (None when the backend can't tell)
+    """
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            return {'rows': row[0], 'bytes': row[1]}
+    return {'rows': model.objects.count(), 'bytes': None}
+
+
+def partition_by_year(model, first_year, last_year):
+    """
+    Range partition an archive table by created_at year (MySQL only)
+
+    MySQL requires the partition column in every unique key and doesn't allow
+    foreign keys on partitioned tables, which is why only archive tables (no
+    FKs) are partitioned. The primary key becomes (id, created_at).
+
+    Args:
+        model: Archive model to partition
+        first_year (int): First year with its own partition
+        last_year (int): Last year with its own partition, newer rows go to pmax
+    """
+    if connection.vendor != 'mysql':
+        raise NotImplementedError('Range partitioning is only supported on MySQL')
+    table = connection.ops.quote_name(model._meta.db_table)
+    partitions = ', '.join(
+        f"PARTITION p{year} VALUES LESS THAN (TO_DAYS('{year + 1}-01-01'))"
+        for year in range(first_year, last_year + 1)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(
+            f'ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(created_at)) '
+            f'({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)'
+        )
@@ -0,0 +1,253 @@
+"""
+Response caching for public read endpoints
+
+Cached entries are keyed by route, query params, selected request headers and
+the current version of every namespace the view depends on. Model signals bump
+namespace versions, so stale entries are never read again and simply expire.
+"""
+import functools
+import hashlib
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+
+KEY_PREFIX = 'rc'
+
+# Model -> callable returning the namespaces touched by a saved/deleted instance
+INVALIDATION_RULES = {
+    'locations.Location': lambda obj: ['locations'],
+    'chapista_profile.ChapistaProfile': lambda obj: ['chapistas', f'chapista:{obj.pk}'],
+    'portfolio_item.PortfolioItem': lambda obj: [f'portfolio:{obj.chapista_profile_id}'],
+    'photo.Photo': lambda obj: _photo_namespaces(obj),
+    'job_offer.JobOffer': lambda obj: ['offers', f'offer:{obj.pk}'],
+    # Offer list and detail responses embed the company name
+    'company_profile.CompanyProfile': lambda obj: ['offers', 'companies'],
+}
+
+
+def _photo_namespaces(photo):
+    if photo.portfolio_item_id is None:
+        return []
+    PortfolioItem = apps.get_model('portfolio_item', 'PortfolioItem')
+    chapista_id = (
+        PortfolioItem.objects.filter(pk=photo.portfolio_item_id)
+        .values_list('chapista_profile_id', flat=True)
+        .first()
+    )
+    return [f'portfolio:{chapista_id}'] if chapista_id is not None else []
+
+
+def _setting(name, default):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, default)
+
+
+def _cache():
+    return caches[_setting('ALIAS', 'default')]
+
+
+def _namespace_key(namespace):
+    return f'{KEY_PREFIX}:ns:{namespace}'
+
+
+def get_namespace_versions(namespaces):
+    """
+    Get the current version token of each namespace, creating missing ones
+
+    Args:
+        namespaces (list): Namespace names
+
+    Returns:
+        list: Version tokens in the same order as namespaces
+    """
+    cache = _cache()
+    keys = [_namespace_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            # A fresh token (never a reset counter) so evicted versions can't collide
+            cache.add(key, str(time.time_ns()), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def invalidate(*namespaces):
+    """
+    Invalidate every cached response depending on the given namespaces
+
+    Args:
+        *namespaces (str): Namespace names to bump
+    """
+    if namespaces:
+        _cache().set_many(
+            {_namespace_key(ns): str(time.time_ns()) for ns in namespaces},
+            timeout=None,
+        )
+
+
+def invalidate_rows(model, pks):
+    """
+    Invalidate what post_save would have for every row of a bulk UPDATE, in
+    one cache write
+
+    Args:
+        model (Model): Model class the rows belong to
+        pks (iterable): Primary keys of the changed rows
+    """
+    rule = INVALIDATION_RULES.get(model._meta.label)
+    if rule is not None:
+        invalidate(*{namespace for pk in pks for namespace in rule(model(pk=pk))})
+
+
+def _invalidate_instance(sender, instance, **kwargs):
+    rule = INVALIDATION_RULES.get(sender._meta.label)
+    if rule is not None:
+        invalidate(*rule(instance))
+
+
+def connect_invalidation_signals():
+    """
+    Connect post_save/post_delete handlers for every model in INVALIDATION_RULES
+    """
+    for label in INVALIDATION_RULES:
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_instance, sender=model, dispatch_uid=f'rc-save-{label}')
+        post_delete.connect(_invalidate_instance, sender=model, dispatch_uid=f'rc-delete-{label}')
+
+
+def _record(outcome):
+    cache = _cache()
+    key = f'{KEY_PREFIX}:stats:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    """
+    Get response cache hit/miss counters
+
+    Returns:
+        dict: hits, misses and hit_ratio
+    """
+    found = _cache().get_many([f'{KEY_PREFIX}:stats:hit', f'{KEY_PREFIX}:stats:miss'])
+    hits = found.get(f'{KEY_PREFIX}:stats:hit', 0)
+    misses = found.get(f'{KEY_PREFIX}:stats:miss', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    """
+    Reset response cache hit/miss counters
+    """
+    _cache().delete_many([f'{KEY_PREFIX}:stats:hit', f'{KEY_PREFIX}:stats:miss'])
+
+
+def _build_key(request, namespaces, vary):
+    versions = get_namespace_versions(namespaces)
+    parts = [request.path]
+    parts.extend(f'{k}={v}' for k, v in sorted(request.GET.lists()))
+    parts.extend(f'{h}:{request.headers.get(h, "")}' for h in vary)
+    parts.extend(f'{ns}@{v}' for ns, v in zip(namespaces, versions))
+    digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+    return f'{KEY_PREFIX}:resp:{digest}'
+
+
+def _not_modified(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags or etag in [e.removeprefix('W/') for e in etags]
+
+
+def _to_response(request, entry, vary, outcome):
+    if _not_modified(request, entry['etag']):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['X-Cache'] = outcome
+    patch_vary_headers(response, vary)
+    return response
+
+
+def cache_response(*namespaces, timeout=None, vary=('Accept', 'Accept-Language')):
+    """
+    Cache GET responses of a view, invalidated through namespace versions
+
+    Namespaces may reference URL kwargs, e.g. 'chapista:{pk}'. Use on DRF
+    class based views through method_decorator(..., name='dispatch').
+
+    Args:
+        *namespaces (str): Namespaces the response depends on
+        timeout (int): Entry TTL in seconds (defaults to RESPONSE_CACHE['TIMEOUT'])
+        vary (tuple): Request headers that are part of the cache key
+
+    Returns:
+        function: View decorator
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not _setting('ENABLED', True):
+                return view_func(request, *args, **kwargs)
+
+            cache = _cache()
+            resolved = [ns.format(**kwargs) for ns in namespaces]
+            key = _build_key(request, resolved, vary)
+
+            entry = cache.get(key)
+            if entry is not None:
+                _record('hit')
+                return _to_response(request, entry, vary, 'HIT')
+
+            # Single-flight: only the lock holder recomputes, others wait for its result
+            lock_key = f'{key}:lock'
+            lock_timeout = _setting('LOCK_TIMEOUT', 10)
+            have_lock = cache.add(lock_key, 1, timeout=lock_timeout)
+            if not have_lock:
+                deadline = time.monotonic() + _setting('LOCK_WAIT', 2.0)
+                while time.monotonic() < deadline:
+                    time.sleep(0.02)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        _record('hit')
+                        return _to_response(request, entry, vary, 'HIT')
+
+            _record('miss')
+            try:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                if response.status_code != 200 or response.streaming:
+                    return response
+                entry = {
+                    'content': response.content,
+                    'status': response.status_code,
+                    'content_type': response['Content-Type'],
+                    'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+                }
+                cache.set(key, entry, timeout or _setting('TIMEOUT', 300))
+            finally:
+                if have_lock:
+                    cache.delete(lock_key)
+            return _to_response(request, entry, vary, 'MISS')
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import partition_by_year, table_size
+from job_contract.archive import contract_archive
+from job_offer.archive import offer_archive
+from job_proposal.archive import proposal_archive
+
+
+# Contracts first so their offers become eligible in the same run
+POLICIES = [contract_archive, proposal_archive, offer_archive]
+
+
+class Command(BaseCommand):
+    help = 'Move terminal-state offers, proposals and contracts into archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180, help='Archive rows created more than N days ago')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=None, help='Per model, default until done')
+        parser.add_argument(
+            '--partition', nargs=2, type=int, metavar=('FIRST_YEAR', 'LAST_YEAR'),
+            help='Range partition the archive tables by created_at year (MySQL) and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['partition']:
+            first_year, last_year = options['partition']
+            for policy in POLICIES:
+                try:
+                    partition_by_year(policy.archive_model, first_year, last_year)
+                except NotImplementedError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f'Partitioned {policy.archive_model._meta.db_table}')
+            return
+
+        for policy in POLICIES:
+            stats = policy.run(options['days'], options['batch_size'], options['max_batches'])
+            size = table_size(policy.model)
+            size_text = f"{size['rows']} rows"
+            if size['bytes'] is not None:
+                size_text += f", {size['bytes'] / 1024 / 1024:.1f} MB"
+            self.stdout.write(
+                f"{policy.label}: moved {stats['moved']} rows in {stats['elapsed']:.2f}s "
+                f"({stats['rows_per_second']:,.0f} rows/s), live table {size_text}"
+            )
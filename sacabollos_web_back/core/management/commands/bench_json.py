@@ -0,0 +1,70 @@
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from core.renderers import FastJSONRenderer, orjson
+
+
+def build_payload(rows):
+    """
+    Build a list payload shaped like serializer output, with raw Decimal and
+    datetime values mixed in so the encoder fallbacks are exercised too
+    """
+    now = datetime.datetime(2025, 10, 6, 10, 30, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            'id': i,
+            'username': f'user_{i}',
+            'email': f'user_{i}@example.com',
+            'first_name': 'Nombre',
+            'last_name': 'Apellido Ñúñez',
+            'role': 'chapista',
+            'phone': '+34600000000',
+            'is_verified': bool(i % 2),
+            'rating_promedio': '4.50',
+            'budget_min': Decimal('150.00'),
+            'amount': Decimal(i) / 100,
+            'created_at': now,
+            'updated_at': '2025-10-06T10:30:00Z',
+        }
+        for i in range(rows)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare CPU time of the stdlib and orjson JSON renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def _measure(self, renderer, payload, repeat):
+        renderer.render(payload)
+        start = time.process_time()
+        for _ in range(repeat):
+            renderer.render(payload)
+        return (time.process_time() - start) / repeat
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        payload = build_payload(rows)
+
+        stdlib = self._measure(JSONRenderer(), payload, repeat)
+        self.stdout.write(f'stdlib json: {stdlib * 1000:.3f} ms CPU per {rows} rows')
+
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, FastJSONRenderer uses stdlib json'))
+            return
+
+        fast = self._measure(FastJSONRenderer(), payload, repeat)
+        self.stdout.write(f'orjson:      {fast * 1000:.3f} ms CPU per {rows} rows')
+        saved = (stdlib - fast) * 1000 * 1000 / rows
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved {saved:.3f} ms CPU per 1,000 rows ({stdlib / fast:.1f}x faster)'
+        ))
+
+        same = json.loads(JSONRenderer().render(payload)) == json.loads(FastJSONRenderer().render(payload))
+        self.stdout.write(f'Identical output: {same}')
@@ -0,0 +1,87 @@
+import statistics
+import time
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.test.utils import override_settings
+
+from users import tokens
+from users.models import UserProfile
+
+
+class Rollback(Exception):
+    pass
+
+
+def _environ(path, key):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': f'Token {key}',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': BytesIO(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request cost of the full middleware stack against the slim API profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--path', default='/api/users/profile/')
+
+    def _measure(self, handler, path, key, requests):
+        status = []
+
+        def start_response(s, headers):
+            status.append(s)
+
+        handler(_environ(path, key), start_response)  # warm up url resolver and view imports
+        started = time.perf_counter()
+        for _ in range(requests):
+            b''.join(handler(_environ(path, key), start_response))
+        elapsed = time.perf_counter() - started
+        return elapsed / requests, status[0]
+
+    def handle(self, *args, **options):
+        # the handler would otherwise close the connection (and the rollback transaction) after each request
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with transaction.atomic():
+                user = User.objects.create(username='bench_middleware', password='!')
+                UserProfile.objects.create(user=user)
+                key, _ = tokens.issue(user, device='bench')
+
+                with override_settings(MIDDLEWARE_ROUTES=[]):
+                    full = WSGIHandler()
+                slim = WSGIHandler()
+
+                results = {'full': [], 'api': []}
+                for _ in range(options['rounds']):
+                    for name, handler in (('full', full), ('api', slim)):
+                        per_request, status = self._measure(handler, options['path'], key, options['requests'])
+                        results[name].append(per_request)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        medians = {name: statistics.median(values) for name, values in results.items()}
+        self.stdout.write(f"{options['path']}  status {status}  ({options['requests']} requests x {options['rounds']} rounds)")
+        for name, value in medians.items():
+            self.stdout.write(f'{name:<6} {value * 1e6:8.1f} µs/request')
+        saved = medians['full'] - medians['api']
+        self.stdout.write(f'saved  {saved * 1e6:8.1f} µs/request ({saved / medians["full"]:.1%})')
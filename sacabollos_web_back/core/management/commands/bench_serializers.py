@@ -0,0 +1,84 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.serializers import FlatSerializer
+from job_offer.models import JobOffer
+from job_offer.serializers import JobOfferSerializer
+from job_proposal.models import JobProposal
+from job_proposal.serializers import JobProposalSerializer
+from locations.models import Location
+from users.models import UserProfile
+from users.serializers import UserProfileSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of ModelSerializer and FlatSerializer for users, offers and proposals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+
+    def _populate(self, rows):
+        location = Location.objects.create(city='Bench', province='Bench')
+        users = User.objects.bulk_create(
+            User(username=f'bench_{i}', email=f'bench_{i}@example.com', password='!') for i in range(rows + 1)
+        )
+        UserProfile.objects.bulk_create(UserProfile(user=u, phone='+34600000000') for u in users)
+        company = CompanyProfile.objects.create(
+            user=users[-1], company_name='Bench SL', contact_person='Bench', address='-', location=location
+        )
+        chapistas = ChapistaProfile.objects.bulk_create(
+            ChapistaProfile(user=u, display_name=u.username, location=location) for u in users[:-1]
+        )
+        offers = JobOffer.objects.bulk_create(
+            JobOffer(company=company, title=f'Offer {i}', description='Paragolpes trasero',
+                    location=location, budget_min=Decimal('100.00'), budget_max=Decimal('250.50'),
+                    tags=['granizo', 'puerta'])
+            for i in range(rows)
+        )
+        JobProposal.objects.bulk_create(
+            JobProposal(job=offer, chapista_profile=chapista, message='Puedo hacerlo',
+                        proposed_price=Decimal('180.00'), proposed_time_hours=4)
+            for offer, chapista in zip(offers, chapistas)
+        )
+
+    def _rate(self, func, rows):
+        start = time.perf_counter()
+        data = func()
+        elapsed = time.perf_counter() - start
+        return data, rows / elapsed
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        cases = [
+            ('users', UserProfile.objects.select_related('user'), UserProfileSerializer),
+            ('offers', JobOffer.objects.select_related('company', 'location'), JobOfferSerializer),
+            ('proposals', JobProposal.objects.select_related('chapista_profile'), JobProposalSerializer),
+        ]
+        try:
+            with transaction.atomic():
+                self._populate(rows)
+                for name, queryset, serializer_class in cases:
+                    drf, drf_rate = self._rate(
+                        lambda: serializer_class(queryset.all(), many=True).data, rows
+                    )
+                    flat, flat_rate = self._rate(
+                        lambda: FlatSerializer(serializer_class).serialize(queryset.all()), rows
+                    )
+                    self.stdout.write(
+                        f'{name:<10} ModelSerializer {drf_rate:>10,.0f} rows/s   '
+                        f'FlatSerializer {flat_rate:>10,.0f} rows/s   '
+                        f'({flat_rate / drf_rate:.1f}x, identical={list(map(dict, drf)) == flat})'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,29 @@
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import run_child
+
+
+class Command(BaseCommand):
+    help = 'Measure time-to-first-request of fresh processes (spawn, django.setup(), first response)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', action='append', help='Request path (repeatable, default /api/locations/ and /api/schema)')
+
+    def handle(self, *args, **options):
+        paths = options['path'] or ['/api/locations/', '/api/schema']
+        for path in paths:
+            runs = []
+            for _ in range(options['runs']):
+                try:
+                    runs.append(run_child('request', path))
+                except RuntimeError as e:
+                    raise CommandError(f'Startup child failed: {e}')
+            median = {key: statistics.median(run[key] for run in runs) for key in ('setup', 'first_request', 'wall')}
+            self.stdout.write(
+                f"{path:<24} status {runs[0]['status']}  setup {median['setup'] * 1000:7.1f} ms  "
+                f"first request {median['first_request'] * 1000:7.1f} ms  "
+                f"process wall {median['wall'] * 1000:7.1f} ms  (median of {len(runs)})"
+            )
@@ -0,0 +1,16 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.openapi import build, schema_dir
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI document into a versioned, precompressed static file'
+
+    def handle(self, *args, **options):
+        manifest = build()
+        for encoding, name in manifest['encodings'].items():
+            size = os.path.getsize(os.path.join(schema_dir(), name))
+            self.stdout.write(f'{encoding:<9} {name:<36} {size / 1024:8.1f} KB')
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema version {manifest['version']}"))
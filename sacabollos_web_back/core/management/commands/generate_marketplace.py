@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from core.synthetic import MarketplaceGenerator
+
+
+class Command(BaseCommand):
+    help = 'Fill every marketplace table with deterministic synthetic data for load and scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--chapistas', type=int, default=1000)
+        parser.add_argument('--companies', type=int, default=200)
+        parser.add_argument('--locations', type=int, default=500)
+        parser.add_argument('--offers-per-company', type=int, default=10)
+        parser.add_argument('--max-proposals', type=int, default=5, help='Per offer')
+        parser.add_argument('--days', type=int, default=730, help='Spread timestamps over the past N days')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk INSERT/transaction')
+        parser.add_argument('--prefix', default='synth', help='Username/city prefix; use a new one per run')
+        parser.add_argument('--password', default='synthetic', help='Password of every generated user')
+        parser.add_argument('--skip-derived', action='store_true',
+                            help='Do not rebuild search documents, histograms, proposal counters and rollups')
+
+    def handle(self, *args, **options):
+        generator = MarketplaceGenerator(
+            seed=options['seed'],
+            chapistas=options['chapistas'],
+            companies=options['companies'],
+            locations=options['locations'],
+            offers_per_company=options['offers_per_company'],
+            max_proposals=options['max_proposals'],
+            days=options['days'],
+            chunk_size=options['chunk_size'],
+            prefix=options['prefix'],
+            password=options['password'],
+            log=self.stdout.write,
+        )
+        stats = generator.run(derived=not options['skip_derived'])
+
+        self.stdout.write('')
+        for label, rows in stats['rows'].items():
+            seconds = stats['seconds'].get(label, 0)
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(f'{label:<32} {rows:>10,} rows {seconds:7.2f}s {rate:>12,.0f} rows/s')
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['total_rows']:,} rows inserted in {stats['insert_seconds']:.1f}s "
+            f"({stats['total_rows'] / stats['insert_seconds']:,.0f} rows/s), {stats['elapsed']:.1f}s in total"
+        ))
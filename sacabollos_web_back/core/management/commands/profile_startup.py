@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import import_costs, run_child
+
+
+class Command(BaseCommand):
+    help = 'Report per-module import time and per-app ready() time of a cold django.setup()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Modules to list')
+        parser.add_argument('--depth', type=int, default=1, help='Group imports by N dotted components')
+        parser.add_argument('--path', default='/api/schema', help='Also resolve and serve this path (imports lazy views)')
+        parser.add_argument('--no-request', action='store_true', help='Only profile django.setup()')
+
+    def handle(self, *args, **options):
+        mode = 'setup' if options['no_request'] else 'request'
+        try:
+            report = run_child(mode, None if options['no_request'] else options['path'], importtime=True)
+        except RuntimeError as e:
+            raise CommandError(f'Startup child failed: {e}')
+
+        self.stdout.write(f"django.setup(): {report['setup'] * 1000:.0f} ms, process wall {report['wall'] * 1000:.0f} ms")
+        if mode == 'request':
+            self.stdout.write(
+                f"first request {options['path']} ({report['status']}): {report['first_request'] * 1000:.0f} ms"
+            )
+
+        self.stdout.write('\nImport time (self, grouped):')
+        costs = import_costs(report['imports'], options['depth'])
+        for module, seconds in costs[:options['top']]:
+            self.stdout.write(f'  {module:<40} {seconds * 1000:8.1f} ms')
+        self.stdout.write(f"  {'total':<40} {sum(s for _, s in costs) * 1000:8.1f} ms")
+
+        self.stdout.write('\nAppConfig.ready():')
+        for label, seconds in sorted(report['ready'].items(), key=lambda item: -item[1]):
+            self.stdout.write(f'  {label:<40} {seconds * 1000:8.2f} ms')
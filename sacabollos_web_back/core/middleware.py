@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+DEFAULT_PROFILE = 'full'
+
+# what django.contrib.admin's own checks (admin.E408-E410) expect from settings.MIDDLEWARE
+ADMIN_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+
+class _Chain:
+    """
+    One middleware stack, built the same way BaseHandler.load_middleware
+    builds settings.MIDDLEWARE
+    """
+
+    def __init__(self, paths, get_response):
+        handler = convert_exception_to_response(get_response)
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+        for path in reversed(paths):
+            try:
+                mw_instance = import_string(path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if mw_instance is None:
+                raise ImproperlyConfigured(f'Middleware factory {path} returned None.')
+            if hasattr(mw_instance, 'process_view'):
+                self.view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, 'process_template_response'):
+                self.template_response_middleware.append(mw_instance.process_template_response)
+            if hasattr(mw_instance, 'process_exception'):
+                self.exception_middleware.append(mw_instance.process_exception)
+            handler = convert_exception_to_response(mw_instance)
+        self.handler = handler
+
+
+class MiddlewareProfiles:
+    """
+    Routes each request through the middleware stack of its URL prefix
+
+    settings.MIDDLEWARE_PROFILES maps profile names to middleware lists and
+    settings.MIDDLEWARE_ROUTES is a list of (path prefix, profile) pairs,
+    first match wins; everything else goes through the 'full' profile.
+    Token-authenticated API calls skip the session lookup, CSRF, messages
+    and clickjacking work that only the admin needs.
+
+    The chosen stack's process_view / process_template_response /
+    process_exception hooks are run from this middleware's own hooks, which
+    the handler calls because this is the only entry in settings.MIDDLEWARE.
+    """
+
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        profiles = settings.MIDDLEWARE_PROFILES
+        routes = list(getattr(settings, 'MIDDLEWARE_ROUTES', []))
+        used = {DEFAULT_PROFILE} | {profile for _, profile in routes}
+        missing = used - set(profiles)
+        if missing:
+            raise ImproperlyConfigured(f'MIDDLEWARE_ROUTES uses unknown profiles: {", ".join(sorted(missing))}')
+        self.chains = {name: _Chain(profiles[name], get_response) for name in used}
+        self.routes = [(prefix, self.chains[profile]) for prefix, profile in routes]
+        self.default = self.chains[DEFAULT_PROFILE]
+
+    def chain_for(self, path):
+        for prefix, chain in self.routes:
+            if path.startswith(prefix):
+                return chain
+        return self.default
+
+    def __call__(self, request):
+        chain = request._middleware_chain = self.chain_for(request.path_info)
+        return chain.handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for process_view in request._middleware_chain.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+
+    def process_template_response(self, request, response):
+        for process_template_response in request._middleware_chain.template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        for process_exception in request._middleware_chain.exception_middleware:
+            response = process_exception(request, exception)
+            if response:
+                return response
+
+
+@register()
+def check_middleware_profiles(app_configs, **kwargs):
+    """
+    Stand-in for admin.E408-E410, which only look at settings.MIDDLEWARE:
+    whatever profile serves /admin/ must carry sessions, auth and messages
+    """
+    if 'core.middleware.MiddlewareProfiles' not in settings.MIDDLEWARE:
+        return []
+    profiles = getattr(settings, 'MIDDLEWARE_PROFILES', {})
+    routes = getattr(settings, 'MIDDLEWARE_ROUTES', [])
+    admin_profile = next((profile for prefix, profile in routes if '/admin/'.startswith(prefix)), DEFAULT_PROFILE)
+    missing = [path for path in ADMIN_MIDDLEWARE if path not in profiles.get(admin_profile, [])]
+    if missing:
+        return [Error(
+            f"Middleware profile '{admin_profile}' serves /admin/ but lacks {', '.join(missing)}.",
+            id='core.E001',
+        )]
+    return []
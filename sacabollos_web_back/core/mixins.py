@@ -0,0 +1,25 @@
+from rest_framework.response import Response
+from .serializers import FlatSerializer
+
+
+class FlatListMixin:
+    """
+    ListAPIView mixin that serializes the list through a FlatSerializer
+    compiled from serializer_class
+
+    Filtering, ordering and pagination still apply, they just run over a
+    values_list() queryset instead of model instances.
+    """
+
+    def get_flat_serializer(self):
+        return FlatSerializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        flat = self.get_flat_serializer()
+        queryset = flat.values_list(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(flat.to_representation(page))
+
+        return Response(flat.to_representation(queryset))
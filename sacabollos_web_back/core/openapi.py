@@ -0,0 +1,165 @@
+"""
+Prebuilt OpenAPI document
+
+build() generates the schema once, writes it as a content-addressed file
+(openapi.<hash>.json) next to gzip and, when the brotli package is
+installed, brotli precompressed copies, and points manifest.json at them.
+The schema view only streams the variant the client accepts, with the hash
+as ETag, so serving the document costs no view introspection.
+
+In DEBUG the manifest also records a fingerprint of the URLconf (routes,
+views and the mtime of their modules). runserver restarts on code changes,
+and the first schema request of a process rebuilds when the fingerprint no
+longer matches.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MANIFEST = 'manifest.json'
+
+_lock = threading.Lock()
+_fingerprint = None
+
+
+def schema_dir():
+    return str(settings.OPENAPI_SCHEMA_DIR)
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern.callback
+
+
+def urlconf_fingerprint():
+    """
+    Hash of every route, its view and the mtime of the view's module
+    """
+    parts = []
+    for route, callback in _walk(get_resolver().url_patterns):
+        view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+        module = getattr(view, '__module__', '')
+        source = getattr(sys.modules.get(module), '__file__', None)
+        mtime = os.path.getmtime(source) if source and os.path.exists(source) else 0
+        parts.append(f'{route}|{module}.{getattr(view, "__qualname__", view)}|{mtime}')
+    return hashlib.sha256('\n'.join(sorted(parts)).encode()).hexdigest()
+
+
+def _generate():
+    # Imported here: the generator pulls in most of drf_spectacular
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    schema = spectacular_settings.DEFAULT_GENERATOR_CLASS().get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def _write(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(fingerprint=None):
+    """
+    Generate the schema and write its versioned, precompressed files
+
+    Returns:
+        dict: The new manifest (version, file, encodings, fingerprint)
+    """
+    directory = schema_dir()
+    os.makedirs(directory, exist_ok=True)
+    body = _generate()
+    version = hashlib.sha256(body).hexdigest()[:16]
+    name = f'openapi.{version}.json'
+
+    encodings = {'identity': name}
+    _write(os.path.join(directory, name), body)
+    # mtime=0 keeps the gzip bytes (and so rebuilds) reproducible
+    _write(os.path.join(directory, f'{name}.gz'), gzip.compress(body, compresslevel=9, mtime=0))
+    encodings['gzip'] = f'{name}.gz'
+    if brotli is not None:
+        _write(os.path.join(directory, f'{name}.br'), brotli.compress(body, quality=11))
+        encodings['br'] = f'{name}.br'
+
+    manifest = {
+        'version': version,
+        'encodings': encodings,
+        'fingerprint': fingerprint or urlconf_fingerprint(),
+    }
+    _write(os.path.join(directory, MANIFEST), json.dumps(manifest, indent=2).encode())
+
+    keep = set(encodings.values()) | {MANIFEST}
+    for entry in os.listdir(directory):
+        if entry.startswith('openapi.') and entry not in keep:
+            os.remove(os.path.join(directory, entry))
+    return manifest
+
+
+def load_manifest():
+    """
+    Current manifest, rebuilding first in DEBUG if the URLconf changed
+
+    Returns:
+        dict: The manifest, or None if no schema was built (outside DEBUG)
+    """
+    global _fingerprint
+    try:
+        with open(os.path.join(schema_dir(), MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if not settings.DEBUG:
+        return manifest
+
+    with _lock:
+        if _fingerprint is None:
+            _fingerprint = urlconf_fingerprint()
+        if manifest is None or manifest.get('fingerprint') != _fingerprint:
+            manifest = build(_fingerprint)
+    return manifest
+
+
+def pick_encoding(manifest, accept_encoding):
+    """
+    Best precompressed variant the client accepts
+
+    Returns:
+        tuple: (encoding, file name)
+    """
+    accepted = set()
+    for token in accept_encoding.split(','):
+        name, *params = [part.strip() for part in token.split(';')]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0  # malformed weight: don't risk a coding the client may not decode
+        if quality > 0:
+            accepted.add(name.lower())
+    for encoding in ('br', 'gzip'):
+        if encoding in accepted and encoding in manifest['encodings']:
+            return encoding, manifest['encodings'][encoding]
+    return 'identity', manifest['encodings']['identity']
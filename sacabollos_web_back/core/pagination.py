@@ -0,0 +1,39 @@
+"""
+Opaque cursors for keyset pagination
+
+A cursor is the sort key of the last row of a page (plus anything needed to
+check it belongs to the same listing), JSON encoded and base64'd so clients
+treat it as a token.
+"""
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """
+    Args:
+        *values: JSON serializable sort key values
+
+    Returns:
+        str: URL safe cursor
+    """
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Args:
+        cursor (str): Value produced by encode_cursor
+        size (int): Expected number of values
+
+    Returns:
+        list: The encoded values, or None if the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
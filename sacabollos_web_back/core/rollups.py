@@ -0,0 +1,28 @@
+"""
+Date helpers shared by the rollup tables
+"""
+import datetime
+
+from django.utils import timezone
+
+
+def day_bounds(day):
+    """
+    Aware [start, end) datetimes covering a local date
+    """
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def month_start(day):
+    """
+    First day of the month of a date
+    """
+    return day.replace(day=1)
+
+
+def next_month(day):
+    """
+    First day of the month after the month of a date
+    """
+    return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
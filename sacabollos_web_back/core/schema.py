@@ -0,0 +1,31 @@
+"""
+OpenAPI generation with drf_spectacular's AutoSchema applied at generation time
+
+REST_FRAMEWORK keeps DRF's default DEFAULT_SCHEMA_CLASS: @api_view resolves
+that setting while the URLconf loads, and pointing it at drf_spectacular
+would import drf_spectacular.openapi, plumbing and DRF's test client in
+every process. SPECTACULAR_SETTINGS['DEFAULT_GENERATOR_CLASS'] points here
+instead, so this module (and drf_spectacular with it) is only imported when
+a schema is generated: build_openapi, the live schema view, the spectacular
+command and the deploy check.
+"""
+from drf_spectacular.generators import SchemaGenerator as SpectacularSchemaGenerator
+from drf_spectacular.openapi import AutoSchema
+from rest_framework.settings import api_settings
+
+
+class SchemaGenerator(SpectacularSchemaGenerator):
+    def create_view(self, callback, method, request=None):
+        view = super().create_view(callback, method, request)
+        schema = getattr(view, 'schema', None)
+        if schema is None or isinstance(schema, AutoSchema):
+            return view
+        # Rebase the view's inspector (DRF's default or a subclass of it) onto drf_spectacular's
+        schema_class = schema.__class__
+        own = tuple(cls for cls in schema_class.__mro__ if cls not in api_settings.DEFAULT_SCHEMA_CLASS.__mro__)
+        if own:
+            schema_class = type(schema_class.__name__, own + (AutoSchema,), {})
+        else:
+            schema_class = AutoSchema
+        self._set_schema_to_view(view, schema_class())
+        return view
@@ -0,0 +1,129 @@
+"""
+Flat read serializers for list endpoints
+
+A FlatSerializer compiles a regular (Model)Serializer class once into a list
+of values() lookups plus per-column converters, then builds rows straight from
+values_list() tuples. The output is identical to the original serializer but
+skips model instantiation and DRF's per-field attribute resolution.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import fields, relations, serializers
+
+
+# Fields whose to_representation is a no-op for values already returned by the DB
+IDENTITY_FIELDS = (
+    fields.CharField,
+    fields.IntegerField,
+    fields.BooleanField,
+    fields.ChoiceField,
+    fields.ReadOnlyField,
+    relations.PrimaryKeyRelatedField,
+)
+
+# Fields that can't be built from a single column
+UNSUPPORTED_FIELDS = (
+    fields.FileField,
+    fields.SerializerMethodField,
+    fields.HiddenField,
+    relations.ManyRelatedField,
+    serializers.ListSerializer,
+)
+
+
+class FlatSerializer:
+    """
+    Build serializer output from values_list() rows
+
+    Supports flat fields, dotted sources ('user.username') and nested
+    single-object serializers. Raises ImproperlyConfigured at compile time
+    for anything else (many=True, method fields, files...).
+    """
+    _compiled = {}
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        if serializer_class not in self._compiled:
+            self._compiled[serializer_class] = self._compile(serializer_class)
+        self.lookups, self.plan = self._compiled[serializer_class]
+
+    @classmethod
+    def _compile(cls, serializer_class):
+        lookups = []
+
+        def column(lookup):
+            if lookup not in lookups:
+                lookups.append(lookup)
+            return lookups.index(lookup)
+
+        def compile_fields(serializer, prefix):
+            plan = []
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                if isinstance(field, UNSUPPORTED_FIELDS) or field.source == '*':
+                    raise ImproperlyConfigured(
+                        f"{serializer_class.__name__}.{name} ({type(field).__name__}) "
+                        f"can't be used in a FlatSerializer"
+                    )
+                lookup = prefix + '__'.join(field.source_attrs)
+                if isinstance(field, serializers.BaseSerializer):
+                    # (name, null indicator column, nested plan)
+                    plan.append((name, column(lookup), compile_fields(field, lookup + '__')))
+                    continue
+                if isinstance(field, fields.JSONField) and field.binary:
+                    convert = field.to_representation
+                elif isinstance(field, IDENTITY_FIELDS + (fields.JSONField,)):
+                    convert = None
+                else:
+                    convert = field.to_representation
+                plan.append((name, column(lookup), convert))
+            return plan
+
+        plan = compile_fields(serializer_class(), '')
+        return lookups, plan
+
+    def values_list(self, queryset):
+        """
+        Get a values_list() queryset with the columns needed by this serializer
+        """
+        return queryset.values_list(*self.lookups)
+
+    def _build(self, row, plan):
+        data = {}
+        for name, index, convert in plan:
+            value = row[index]
+            if value is None:
+                data[name] = None
+            elif convert is None:
+                data[name] = value
+            elif isinstance(convert, list):
+                data[name] = self._build(row, convert)
+            else:
+                data[name] = convert(value)
+        return data
+
+    def to_representation(self, rows):
+        """
+        Convert values_list() rows into serialized dicts
+
+        Args:
+            rows (iterable): Tuples from values_list()
+
+        Returns:
+            list: Serialized rows
+        """
+        plan = self.plan
+        build = self._build
+        return [build(row, plan) for row in rows]
+
+    def serialize(self, queryset):
+        """
+        Serialize a model queryset
+
+        Args:
+            queryset (QuerySet): Queryset of the serializer's model
+
+        Returns:
+            list: Serialized rows
+        """
+        return self.to_representation(self.values_list(queryset))
@@ -0,0 +1,134 @@
+"""
+Cold start measurements in fresh interpreters
+
+Startup costs only show up in a new process, so the profile_startup and
+bench_startup commands re-run this module as a child (`python -m
+core.startup <mode>`) with the parent's settings and parse what it reports.
+Nothing here may import Django at module level.
+"""
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+IMPORTTIME_RE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def _timed_setup():
+    """
+    django.setup() with every AppConfig.ready() timed
+
+    Returns:
+        dict: setup seconds and per-app ready seconds
+    """
+    import django
+    from django.apps.config import AppConfig
+
+    ready_times = {}
+    original_create = AppConfig.__dict__['create']
+
+    def create(cls, entry):
+        config = original_create.__func__(cls, entry)
+        ready = config.ready
+
+        def timed_ready():
+            start = time.perf_counter()
+            ready()
+            ready_times[config.label] = time.perf_counter() - start
+
+        # Instance attribute, so it shadows the class' ready() for this app only
+        config.ready = timed_ready
+        return config
+
+    AppConfig.create = classmethod(create)
+    start = time.perf_counter()
+    try:
+        django.setup()
+    finally:
+        AppConfig.create = original_create
+    return {'setup': time.perf_counter() - start, 'ready': ready_times}
+
+
+def _first_request(path):
+    # Plain WSGI call: django.test would add its own imports to the profile
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    start = time.perf_counter()
+    handler = get_wsgi_application()
+    host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost').lstrip('.')
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': host, 'SERVER_PORT': '80', 'HTTP_HOST': host,
+        'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    body = handler(environ, lambda code, headers, exc_info=None: status.append(int(code.split()[0])))
+    b''.join(body)
+    return {'first_request': time.perf_counter() - start, 'status': status[0]}
+
+
+def child_main(mode, path=None):
+    started = time.perf_counter()
+    report = _timed_setup()
+    if mode == 'request':
+        report.update(_first_request(path))
+    report['total'] = time.perf_counter() - started
+    sys.stdout.write(json.dumps(report))
+
+
+def run_child(mode, path=None, importtime=False):
+    """
+    Run a fresh interpreter and collect its startup report
+
+    Returns:
+        dict: The child's report plus process wall seconds (spawn included)
+        and, with importtime, the raw `-X importtime` lines
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-m', 'core.startup', mode] + ([path] if path else [])
+    from django.conf import settings
+    start = time.perf_counter()
+    proc = subprocess.run(
+        cmd, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', '')},
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'child failed')
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report['wall'] = wall
+    if importtime:
+        report['imports'] = [line for line in proc.stderr.splitlines() if line.startswith('import time:')]
+    return report
+
+
+def import_costs(lines, depth=1):
+    """
+    Sum `-X importtime` self times by module prefix
+
+    Args:
+        lines (list): Raw importtime lines
+        depth (int): Dotted components to group by (1 = top-level package)
+
+    Returns:
+        list: (module, seconds) sorted by cost, highest first
+    """
+    totals = {}
+    for line in lines:
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            name = '.'.join(match.group(4).split('.')[:depth])
+            totals[name] = totals.get(name, 0) + int(match.group(1)) / 1e6
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+if __name__ == '__main__':
+    child_main(*sys.argv[1:])
@@ -0,0 +1,372 @@
+"""
+Deterministic synthetic marketplace data
+
+MarketplaceGenerator fills every marketplace table with interlinked rows for
+load and scale testing. The same seed and sizes always produce the same rows:
+one random.Random drives everything, consumed in a fixed order.
+
+Rows are written with chunked bulk_create (one transaction per chunk) and
+explicit primary keys (MySQL doesn't return ids from bulk inserts), so
+children can reference parents without reading them back. unique_together
+constraints hold by construction: distinct chapistas per offer for
+proposals, one contract per offer, at most one review per direction and
+contract. Every user shares one precomputed password hash, and
+created_at/updated_at are spread over the days before today (midnight UTC,
+so runs on the same day match) instead of all being "now".
+
+bulk_create sends no signals, so the derived tables (search documents, review
+histograms, offer proposal counters, dashboard and analytics rollups) are
+rebuilt at the end.
+"""
+import contextlib
+import datetime
+import random
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from job_proposal.models import JobProposal
+from job_review.models import JobReview
+from locations.models import Location
+from photo.models import Photo
+from portfolio_item.models import PortfolioItem
+from transaction.models import Transaction
+from users.models import UserProfile
+
+
+PROVINCES = [
+    'Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Málaga', 'Bizkaia', 'Zaragoza', 'Alicante',
+    'Murcia', 'Asturias', 'A Coruña', 'Granada', 'Cádiz', 'Navarra', 'Illes Balears', 'Las Palmas',
+]
+SERVICES = ['chapa', 'pintura', 'granizo', 'pulido', 'lunas', 'electricidad', 'mecánica', 'tapicería']
+PARTS = ['paragolpes', 'puerta', 'capó', 'aleta', 'techo', 'maletero', 'retrovisor', 'faro', 'lateral', 'llanta']
+DAMAGE = ['abolladura', 'arañazo', 'golpe', 'rayada', 'granizo', 'óxido', 'pintura', 'grieta']
+SIDES = ['delantero', 'trasero', 'izquierdo', 'derecho']
+OFFER_STATUSES = [('open', 40), ('closed', 15), ('assigned', 20), ('done', 20), ('cancelled', 5)]
+TRANSACTION_STATUSES = [('completed', 85), ('pending', 5), ('failed', 7), ('refunded', 3)]
+
+
+@contextlib.contextmanager
+def historical_timestamps(*models):
+    """
+    Let bulk_create keep explicit created_at/updated_at values
+
+    auto_now/auto_now_add would otherwise overwrite them with the current time.
+    """
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            for attr in ('auto_now', 'auto_now_add'):
+                if getattr(field, attr, False):
+                    setattr(field, attr, False)
+                    changed.append((field, attr))
+    try:
+        yield
+    finally:
+        for field, attr in changed:
+            setattr(field, attr, True)
+
+
+class MarketplaceGenerator:
+    """
+    Args:
+        seed (int): Random seed
+        chapistas (int): Chapista users/profiles
+        companies (int): Company users/profiles
+        locations (int): Locations
+        offers_per_company (int): Average job offers per company
+        max_proposals (int): Maximum proposals per offer
+        days (int): Spread created_at over this many past days
+        chunk_size (int): Rows per bulk INSERT
+        prefix (str): Username/location prefix, so several runs can coexist
+        password (str): Password of every generated user
+        log (callable): Progress callback taking a message
+    """
+
+    def __init__(self, seed=1, chapistas=1000, companies=200, locations=500, offers_per_company=10,
+                max_proposals=5, days=730, chunk_size=5000, prefix='synth', password='synthetic', log=None):
+        self.rng = random.Random(seed)
+        self.chapistas = chapistas
+        self.companies = companies
+        self.locations = locations
+        self.offers_per_company = offers_per_company
+        self.max_proposals = min(max_proposals, chapistas)
+        self.days = days
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.password = password
+        self.log = log or (lambda message: None)
+        self.now = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.counts = Counter()
+        self.seconds = Counter()
+
+    # Helpers
+
+    @staticmethod
+    def _next_id(model):
+        return (model.objects.aggregate(m=Max('pk'))['m'] or 0) + 1
+
+    def _past(self, after=None):
+        """
+        Random moment in the generation window, optionally after another one
+        """
+        start = after or self.now - datetime.timedelta(days=self.days)
+        span = max(int((self.now - start).total_seconds()), 1)
+        return start + datetime.timedelta(seconds=self.rng.randrange(span))
+
+    def _weighted(self, choices):
+        return self.rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+    def _money(self, low, high):
+        return Decimal(self.rng.randrange(low * 100, high * 100)) / 100
+
+    def _flush(self, *batches):
+        """
+        Insert one chunk of each model, parents first, in one transaction
+        """
+        with transaction.atomic():
+            for model, objs in batches:
+                if not objs:
+                    continue
+                start = time.perf_counter()
+                model.objects.bulk_create(objs, batch_size=self.chunk_size)
+                self.seconds[model._meta.label] += time.perf_counter() - start
+                self.counts[model._meta.label] += len(objs)
+
+    def _chunks(self, total):
+        for start in range(0, total, self.chunk_size):
+            yield range(start, min(start + self.chunk_size, total))
+
+    # Tables
+
+    def _generate_locations(self):
+        self.location_base = self._next_id(Location)
+        objs = []
+        for i in range(self.locations):
+            province = PROVINCES[i % len(PROVINCES)]
+            objs.append(Location(
+                id=self.location_base + i, city=f'{self.prefix} ciudad {i}', province=province, country='Spain',
+                postal_code=f'{self.rng.randrange(1000, 52999):05d}',
+                lat=Decimal(f'{self.rng.uniform(36.0, 43.5):.6f}'), lng=Decimal(f'{self.rng.uniform(-9.0, 3.2):.6f}'),
+                created_at=self._past(),
+            ))
+        self._flush((Location, objs))
+
+    def _location_id(self):
+        return self.location_base + self.rng.randrange(self.locations) if self.locations else None
+
+    def _generate_users(self):
+        password = make_password(self.password)
+        self.user_base = self._next_id(User)
+        self.profile_base = self._next_id(UserProfile)
+        self.chapista_base = self._next_id(ChapistaProfile)
+        self.company_base = self._next_id(CompanyProfile)
+        self.user_created = {}
+        total = self.chapistas + self.companies
+        for chunk in self._chunks(total):
+            users, profiles, chapistas, companies = [], [], [], []
+            for i in chunk:
+                user_id = self.user_base + i
+                is_chapista = i < self.chapistas
+                username = f'{self.prefix}_{"chapista" if is_chapista else "empresa"}_{i}'
+                joined = self._past()
+                self.user_created[user_id] = joined
+                users.append(User(
+                    id=user_id, username=username, email=f'{username}@example.com', password=password,
+                    date_joined=joined,
+                ))
+                profiles.append(UserProfile(
+                    id=self.profile_base + i, user_id=user_id, role='chapista' if is_chapista else 'company',
+                    phone=f'+346{self.rng.randrange(10 ** 8):08d}', is_verified=self.rng.random() < 0.6,
+                    created_at=joined, updated_at=joined,
+                ))
+                if is_chapista:
+                    chapistas.append(ChapistaProfile(
+                        id=self.chapista_base + i, user_id=user_id, display_name=f'Chapista {i}',
+                        bio=f'Especialista en {self.rng.choice(SERVICES)}',
+                        servicios_ofrecidos=self.rng.sample(SERVICES, self.rng.randint(1, 4)),
+                        precio_hora_estimado=self._money(15, 80) if self.rng.random() < 0.9 else None,
+                        rating_promedio=Decimal(f'{self.rng.uniform(2.5, 5.0):.2f}'),
+                        location_id=self._location_id(), disponibilidad=self.rng.random() < 0.75,
+                        created_at=joined, updated_at=joined,
+                    ))
+                else:
+                    j = i - self.chapistas
+                    companies.append(CompanyProfile(
+                        id=self.company_base + j, user_id=user_id, company_name=f'Empresa {j} SL',
+                        contact_person=f'Contacto {j}', address=f'Calle {self.rng.randrange(1, 200)}',
+                        location_id=self._location_id(), verified=self.rng.random() < 0.5,
+                        created_at=joined, updated_at=joined,
+                    ))
+            self._flush((User, users), (UserProfile, profiles), (ChapistaProfile, chapistas),
+                        (CompanyProfile, companies))
+
+    def _generate_portfolio(self):
+        item_id = self._next_id(PortfolioItem)
+        photo_id = self._next_id(Photo)
+        for chunk in self._chunks(self.chapistas):
+            items, photos = [], []
+            for i in chunk:
+                joined = self.user_created[self.user_base + i]
+                for _ in range(self.rng.randint(0, 4)):
+                    created = self._past(joined)
+                    items.append(PortfolioItem(
+                        id=item_id, chapista_profile_id=self.chapista_base + i,
+                        title=f'{self.rng.choice(PARTS).capitalize()} {self.rng.choice(SIDES)}',
+                        description=f'Reparación de {self.rng.choice(DAMAGE)}',
+                        tags=self.rng.sample(SERVICES, 2), date_completed=created.date(),
+                        created_at=created, updated_at=created,
+                    ))
+                    for _ in range(self.rng.randint(1, 3)):
+                        photos.append(Photo(
+                            id=photo_id, file=f'photos/synthetic/{photo_id}.jpg', portfolio_item_id=item_id,
+                            alt_text='Foto del trabajo', uploaded_at=created,
+                        ))
+                        photo_id += 1
+                    item_id += 1
+            self._flush((PortfolioItem, items), (Photo, photos))
+
+    def _generate_marketplace(self):
+        offer_id = self._next_id(JobOffer)
+        proposal_id = self._next_id(JobProposal)
+        contract_id = self._next_id(JobContract)
+        review_id = self._next_id(JobReview)
+        transaction_id = self._next_id(Transaction)
+        total_offers = self.companies * self.offers_per_company
+        offers_done = 0
+        for chunk in self._chunks(total_offers):
+            offers, proposals, contracts, reviews, payments = [], [], [], [], []
+            for _ in chunk:
+                company_index = self.rng.randrange(self.companies)
+                company_user = self.user_base + self.chapistas + company_index
+                created = self._past(self.user_created[company_user])
+                status = self._weighted(OFFER_STATUSES)
+                budget_min = self._money(50, 800)
+                offers.append(JobOffer(
+                    id=offer_id, company_id=self.company_base + company_index,
+                    title=f'{self.rng.choice(PARTS).capitalize()} {self.rng.choice(SIDES)}',
+                    description=' '.join(self.rng.choices(PARTS + DAMAGE + SIDES, k=12)),
+                    location_id=self._location_id(), budget_min=budget_min,
+                    budget_max=budget_min + self._money(0, 1500), estimated_time_hours=self.rng.randint(1, 40),
+                    status=status, tags=self.rng.sample(SERVICES, 2),
+                    deadline=created + datetime.timedelta(days=self.rng.randint(3, 60)),
+                    created_at=created, updated_at=created,
+                ))
+
+                bidders = self.rng.sample(range(self.chapistas), self.rng.randint(0, self.max_proposals))
+                if status in ('assigned', 'done') and not bidders and self.chapistas:
+                    bidders = [self.rng.randrange(self.chapistas)]
+                winner = bidders[0] if status in ('assigned', 'done') and bidders else None
+                for index in bidders:
+                    if winner is not None:
+                        proposal_status = 'accepted' if index == winner else 'rejected'
+                    elif status in ('closed', 'cancelled'):
+                        proposal_status = 'rejected'
+                    else:
+                        proposal_status = 'pending'
+                    proposed = self._past(created)
+                    proposals.append(JobProposal(
+                        id=proposal_id, job_id=offer_id, chapista_profile_id=self.chapista_base + index,
+                        message='Puedo hacerlo esta semana', proposed_price=budget_min + self._money(0, 300),
+                        proposed_time_hours=self.rng.randint(1, 40), status=proposal_status,
+                        created_at=proposed, updated_at=proposed,
+                    ))
+                    proposal_id += 1
+
+                if winner is not None:
+                    signed = self._past(created)
+                    finished = self._past(signed) if status == 'done' else None
+                    price = budget_min + self._money(0, 300)
+                    contracts.append(JobContract(
+                        id=contract_id, job_id=offer_id, chapista_profile_id=self.chapista_base + winner,
+                        company_id=self.company_base + company_index, agreed_price=price,
+                        agreed_time_hours=self.rng.randint(1, 40),
+                        status='finished' if status == 'done' else 'in_progress',
+                        started_at=signed, finished_at=finished, created_at=signed,
+                    ))
+                    if finished is not None:
+                        paid = self._past(finished)
+                        payments.append(Transaction(
+                            id=transaction_id, booking_id=contract_id, amount=price,
+                            status=self._weighted(TRANSACTION_STATUSES), provider_id=f'synth_{transaction_id}',
+                            created_at=paid, updated_at=paid,
+                        ))
+                        transaction_id += 1
+                        chapista_user = self.user_base + winner
+                        for from_user, to_user in ((company_user, chapista_user), (chapista_user, company_user)):
+                            if self.rng.random() < 0.7:
+                                reviews.append(JobReview(
+                                    id=review_id, job_id=contract_id, from_user_id=from_user, to_user_id=to_user,
+                                    rating=self.rng.choices(range(1, 6), weights=[3, 4, 10, 33, 50])[0],
+                                    comment='Buen trabajo', created_at=self._past(finished),
+                                ))
+                                review_id += 1
+                    contract_id += 1
+                offer_id += 1
+
+            self._flush((JobOffer, offers), (JobProposal, proposals), (JobContract, contracts),
+                        (Transaction, payments), (JobReview, reviews))
+            offers_done += len(chunk)
+            self.log(f'  offers {offers_done}/{total_offers}')
+
+    def _rebuild_derived(self):
+        from chapista_profile import dashboard
+        from company_profile import analytics
+        from job_offer import search
+        from job_proposal import submit
+        from job_review import feed
+
+        for label, rebuild in (
+            ('offer search documents', search.rebuild),
+            ('review histograms', feed.rebuild),
+            ('offer proposal counters', submit.rebuild),
+            ('chapista dashboard rollups', dashboard.rebuild),
+            ('company analytics rollups', analytics.rebuild),
+        ):
+            start = time.perf_counter()
+            rebuild()
+            self.seconds[label] += time.perf_counter() - start
+            self.log(f'  rebuilt {label} in {self.seconds[label]:.1f}s')
+
+    def run(self, derived=True):
+        """
+        Generate everything
+
+        Args:
+            derived (bool): Rebuild derived tables afterwards
+
+        Returns:
+            dict: rows and seconds per model label, plus totals
+        """
+        start = time.perf_counter()
+        models = [Location, User, UserProfile, ChapistaProfile, CompanyProfile, PortfolioItem, Photo,
+                JobOffer, JobProposal, JobContract, Transaction, JobReview]
+        with historical_timestamps(*models):
+            self.log('Generating locations')
+            self._generate_locations()
+            self.log('Generating users and profiles')
+            self._generate_users()
+            self.log('Generating portfolios')
+            self._generate_portfolio()
+            self.log('Generating offers, proposals, contracts, transactions and reviews')
+            self._generate_marketplace()
+        insert_seconds = time.perf_counter() - start
+        if derived:
+            self._rebuild_derived()
+        return {
+            'rows': dict(self.counts),
+            'seconds': dict(self.seconds),
+            'total_rows': sum(self.counts.values()),
+            'insert_seconds': insert_seconds,
+            'elapsed': time.perf_counter() - start,
+        }
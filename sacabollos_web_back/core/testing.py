@@ -0,0 +1,40 @@
+"""
+Test helpers shared across apps
+"""
+import json
+
+from django.db import connection
+
+
+class QueryPlanAssertionsMixin:
+    """
+    TestCase mixin asserting that a queryset is served by a given index
+    """
+
+    def _mysql_keys(self, plan):
+        keys = set()
+        if isinstance(plan, dict):
+            if 'key' in plan:
+                keys.add(plan['key'])
+            keys.update(plan.get('possible_keys') or [])
+            for value in plan.values():
+                keys |= self._mysql_keys(value)
+        elif isinstance(plan, list):
+            for value in plan:
+                keys |= self._mysql_keys(value)
+        return keys
+
+    def assertUsesIndex(self, queryset, index_name):
+        """
+        On SQLite the plan must SEARCH through the index. MySQL switches to
+        full scans on near-empty test tables, so there the index has to be
+        chosen or at least listed in possible_keys.
+        """
+        if connection.vendor == 'mysql':
+            plan = json.loads(queryset.explain(format='json'))
+            self.assertIn(index_name, self._mysql_keys(plan), plan)
+        elif connection.vendor == 'sqlite':
+            plan = queryset.explain()
+            self.assertIn(f'INDEX {index_name}', plan, plan)
+        else:
+            self.skipTest(f'No query plan assertions for {connection.vendor}')
@@ -0,0 +1,350 @@
+import datetime
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
+from django.contrib import admin
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from django.db.models import Count
+from job_offer.models import JobOffer
+from job_proposal.models import JobProposal
+from job_proposal.submit import offer_counters
+from job_review.models import JobReview
+from locations.models import Location
+from . import openapi, parsers, renderers
+from .admin import LargeTableAdmin
+from .cache import _build_key, cache_response, get_stats, invalidate_rows
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .synthetic import MarketplaceGenerator
+
+
+class FastJSONTests(TestCase):
+    DATA = {
+        'price': Decimal('120.50'),
+        'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc),
+        'local': timezone.make_aware(datetime.datetime(2026, 6, 1, 12, 0), timezone.get_fixed_timezone(120)),
+        'naive': datetime.datetime(2026, 1, 2, 3, 4, 5),
+        'day': datetime.date(2026, 1, 2),
+        'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Active'),
+        'text': 'Málaga \u2028 línea',
+        'items': [1, 2.5, None, True, {'nested': Decimal('0.10')}],
+    }
+
+    def test_output_matches_drf_renderer(self):
+        self.assertIsNotNone(renderers.orjson)
+        self.assertEqual(FastJSONRenderer().render(self.DATA), JSONRenderer().render(self.DATA))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None), mock.patch.object(parsers, 'orjson', None), \
+                mock.patch.object(JSONRenderer, 'render', autospec=True, return_value=b'{}') as render:
+            self.assertEqual(FastJSONRenderer().render(self.DATA), b'{}')
+            render.assert_called_once()
+            parsed = FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}'))
+        self.assertEqual(parsed, {'a': [1, 2]})
+
+    def test_indent_and_ascii_are_delegated(self):
+        indented = FastJSONRenderer().render(self.DATA, 'application/json; indent=2')
+        self.assertEqual(indented, JSONRenderer().render(self.DATA, 'application/json; indent=2'))
+        self.assertIn(b'\n  "price": 120.5,', indented)
+
+        class AsciiRenderer(FastJSONRenderer):
+            ensure_ascii = True
+
+        class AsciiDRFRenderer(JSONRenderer):
+            ensure_ascii = True
+
+        self.assertEqual(AsciiRenderer().render(self.DATA), AsciiDRFRenderer().render(self.DATA))
+        self.assertIn(b'M\\u00e1laga', AsciiRenderer().render(self.DATA))
+
+    def test_parser_matches_drf_and_rejects_malformed_json(self):
+        body = json.dumps({'price': '1.5', 'tags': ['chapa', 'pintura'], 'n': 3}).encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        for malformed in (b'{"a": ', b'{"a": NaN}', b"{'a': 1}", b''):
+            with self.subTest(body=malformed), self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(malformed))
+        with mock.patch.object(JSONParser, 'parse', autospec=True, return_value={}) as parse:
+            FastJSONParser().parse(io.BytesIO(b'{}'), parser_context={'encoding': 'latin-1'})
+        parse.assert_called_once()
+
+    def test_api_round_trip(self):
+        response = self.client.post('/api/users/login/', b'{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.location = Location.objects.create(city='Sevilla', province='Sevilla')
+
+    def get(self, url='/api/locations/', **extra):
+        return self.client.get(url, **extra)
+
+    def test_second_read_is_a_hit_without_queries(self):
+        miss = self.get()
+        self.assertEqual(miss['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            hit = self.get()
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertEqual(hit.content, miss.content)
+        self.assertIn('Accept-Language', hit['Vary'])
+        self.assertEqual(get_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+        # query params and varied headers are part of the key
+        self.assertEqual(self.get(data={'province': 'Sevilla'})['X-Cache'], 'MISS')
+        self.assertEqual(self.get(HTTP_ACCEPT_LANGUAGE='en')['X-Cache'], 'MISS')
+        with override_settings(RESPONSE_CACHE={'ENABLED': False}):
+            self.assertNotIn('X-Cache', self.get())
+
+    def test_etag_revalidation(self):
+        etag = self.get()['ETag']
+        for header in (etag, f'W/{etag}', '*', f'"other", {etag}'):
+            with self.subTest(header=header):
+                response = self.get(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_signals_invalidate(self):
+        etag = self.get()['ETag']
+        Location.objects.create(city='Cádiz', province='Cádiz')
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Cádiz')
+
+        self.location.delete()
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotContains(response, 'Sevilla')
+
+    def test_invalidate_rows_after_bulk_update(self):
+        self.get()
+        Location.objects.filter(pk=self.location.pk).update(city='Écija')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        invalidate_rows(Location, [self.location.pk])
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Écija')
+        # models without a rule are ignored
+        invalidate_rows(User, [1])
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+    def test_single_flight(self):
+        calls = []
+
+        @cache_response('flight')
+        def view(request):
+            calls.append(request)
+            time.sleep(0.2)
+            return HttpResponse(b'slow', content_type='text/plain')
+
+        outcomes = []
+
+        def read():
+            outcomes.append(view(RequestFactory().get('/flight/'))['X-Cache'])
+
+        threads = [threading.Thread(target=read) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(outcomes), ['HIT'] * 4 + ['MISS'])
+
+        # waiters give up on a holder that never finishes and compute it themselves
+        request = RequestFactory().get('/stuck/')
+        cache.add(f"{_build_key(request, ['flight'], ('Accept', 'Accept-Language'))}:lock", 1)
+        with override_settings(RESPONSE_CACHE={'LOCK_WAIT': 0.05}):
+            self.assertEqual(view(request)['X-Cache'], 'MISS')
+        self.assertEqual(len(calls), 2)
+
+    def test_only_successful_gets_are_cached(self):
+        self.assertNotIn('X-Cache', self.client.post('/api/locations/'))
+        for _ in range(2):
+            response = self.get('/api/offers/999999/')
+            self.assertEqual(response.status_code, 404)
+            self.assertNotIn('X-Cache', response)
+
+
+class OpenAPISchemaTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(OPENAPI_SCHEMA_DIR=self.tmp.name, DEBUG=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch.object(openapi, '_fingerprint', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **headers):
+        return self.client.get('/api/schema', **headers)
+
+    def test_serves_prebuilt_variants_with_etag(self):
+        plain = self.get()
+        self.assertEqual(plain.status_code, 200)
+        body = b''.join(plain.streaming_content)
+        self.assertNotIn('Content-Encoding', plain)
+
+        compressed = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(compressed.streaming_content)), body)
+        self.assertEqual(compressed['ETag'], plain['ETag'])
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=plain['ETag']).status_code, 304)
+
+    def test_pick_encoding_honours_zero_weights(self):
+        manifest = {'encodings': {'br': 'a.json.br', 'gzip': 'a.json.gz', 'identity': 'a.json'}}
+        for header, encoding in [
+            ('gzip, br', 'br'),
+            ('br;q=0.5, gzip;q=1', 'br'),
+            ('br;q=0, gzip', 'gzip'),
+            ('br;q=0.0, gzip;q=0.000', 'identity'),
+            ('BR; q=0.000 , gzip; Q=0.001', 'gzip'),
+            ('br;q=abc, gzip', 'gzip'),
+            ('deflate', 'identity'),
+            ('', 'identity'),
+        ]:
+            self.assertEqual(openapi.pick_encoding(manifest, header)[0], encoding, header)
+
+    def test_rebuilds_only_when_urlconf_changes(self):
+        self.get()
+        with mock.patch.object(openapi, 'build', wraps=openapi.build) as build:
+            self.get()
+            build.assert_not_called()
+            with mock.patch.object(openapi, '_fingerprint', 'changed'):
+                self.get()
+            build.assert_called_once()
+        names = os.listdir(self.tmp.name)
+        self.assertEqual(len([n for n in names if n.endswith('.json') and n != openapi.MANIFEST]), 1)
+
+    def test_live_schema_uses_spectacular_inspectors(self):
+        response = self.get(QUERY_STRING='format=json')
+        self.assertEqual(response.status_code, 200)
+        paths = json.loads(response.content)['paths']
+        self.assertIn('get', paths['/api/locations/'])
+        self.assertIn('post', paths['/api/users/login/'])
+
+    def test_urlconf_leaves_schema_generator_unimported(self):
+        code = (
+            'import django, json, sys; django.setup(); '
+            'from django.urls import get_resolver; get_resolver().url_patterns; '
+            'print(json.dumps(sorted(sys.modules)))'
+        )
+        proc = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        modules = set(json.loads(proc.stdout))
+        self.assertIn('users.views', modules)
+        for name in ['drf_spectacular.openapi', 'drf_spectacular.plumbing', 'rest_framework.test', 'core.schema']:
+            self.assertNotIn(name, modules)
+
+
+class MarketplaceGeneratorTests(TestCase):
+    def snapshot(self):
+        offers = list(JobOffer.objects.order_by('pk').values_list(
+            'company__user__username', 'title', 'status', 'budget_min', 'created_at', 'proposals__chapista_profile__display_name'
+        ))
+        reviews = list(JobReview.objects.order_by('pk').values_list('from_user__username', 'to_user__username', 'rating'))
+        return offers, reviews
+
+    def generate(self):
+        generator = MarketplaceGenerator(seed=7, chapistas=40, companies=10, locations=5, chunk_size=25)
+        stats = generator.run(derived=False)
+        return stats, self.snapshot()
+
+    def test_same_seed_same_data(self):
+        class Rollback(Exception):
+            pass
+
+        try:
+            with transaction.atomic():
+                first_stats, first = self.generate()
+                raise Rollback
+        except Rollback:
+            pass
+        second_stats, second = self.generate()
+        self.assertEqual(first_stats['rows'], second_stats['rows'])
+        self.assertEqual(first, second)
+        self.assertEqual(second_stats['rows']['job_offer.JobOffer'], 100)
+
+    def test_derived_tables_are_rebuilt(self):
+        MarketplaceGenerator(seed=7, chapistas=40, companies=10, locations=5, chunk_size=25).run()
+        offer_ids = list(JobOffer.objects.values_list('pk', flat=True))
+        proposals = dict(
+            JobProposal.objects.values('job_id').annotate(n=Count('id')).values_list('job_id', 'n')
+        )
+        self.assertTrue(proposals)
+        counters = offer_counters(offer_ids)
+        self.assertEqual({pk: counters[pk]['proposals'] for pk in offer_ids},
+                         {pk: proposals.get(pk, 0) for pk in offer_ids})
+
+
+class MiddlewareProfilesTests(TestCase):
+    def test_api_skips_session_csrf_and_frame_middleware(self):
+        response = self.client.get('/api/locations/', HTTP_HOST='localhost')
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+
+    def test_admin_keeps_full_stack(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.get('/admin/login/', HTTP_HOST='localhost')
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+        self.assertEqual(client.post('/admin/login/', HTTP_HOST='localhost').status_code, 403)
+
+    @override_settings(MIDDLEWARE_ROUTES=[('/', 'api')])
+    def test_check_rejects_slim_admin_profile(self):
+        self.assertIn('core.E001', [error.id for error in run_checks()])
+
+
+class AdminChangelistTests(TestCase):
+    # session, user, COUNT(*), page
+    QUERIES_PER_PAGE = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        MarketplaceGenerator(seed=3, chapistas=60, companies=10, locations=5, chunk_size=100).run(derived=False)
+        cls.admin = User.objects.create_superuser('root', 'root@example.com', 'secret')
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin)
+        for model, model_admin in admin.site._registry.items():
+            if not isinstance(model_admin, LargeTableAdmin):
+                continue
+            url = f'/admin/{model._meta.app_label}/{model._meta.model_name}/'
+            with self.subTest(model=model.__name__), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_HOST='localhost')
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(queries), self.QUERIES_PER_PAGE, [q['sql'] for q in queries])
+
+    def test_proposal_page_renders_full_page(self):
+        self.client.force_login(self.admin)
+        with self.assertNumQueries(self.QUERIES_PER_PAGE):
+            response = self.client.get('/admin/job_proposal/jobproposal/', HTTP_HOST='localhost')
+        self.assertEqual(len(response.context['cl'].result_list), LargeTableAdmin.list_per_page)
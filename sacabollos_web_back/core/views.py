@@ -0,0 +1,59 @@
+import os
+
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+from . import openapi
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    URLconf entry for a class-based view imported on its first request
+
+    Keeps heavy view modules (drf_spectacular pulls in DRF's test client,
+    yaml and the schema generator) out of the import graph of every process
+    that never serves them: workers, management commands, test runs.
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    dispatch.__name__ = dotted_path.rsplit('.', 1)[-1]
+    return dispatch
+
+
+_schema_view = lazy_view('drf_spectacular.views.SpectacularAPIView')
+
+
+def openapi_schema(request, *args, **kwargs):
+    """
+    Prebuilt OpenAPI document (see core/openapi.py) with ETag revalidation
+    and precompressed gzip/brotli variants
+
+    Requests with query parameters (?format=yaml, ?lang=...) and processes
+    without a built schema fall back to drf_spectacular's live view.
+    """
+    manifest = openapi.load_manifest() if not request.GET else None
+    if manifest is None:
+        return _schema_view(request, *args, **kwargs)
+
+    etag = f'"{manifest["version"]}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        encoding, name = openapi.pick_encoding(manifest, request.headers.get('Accept-Encoding', ''))
+        response = FileResponse(
+            open(os.path.join(openapi.schema_dir(), name), 'rb'),
+            content_type='application/vnd.oai.openapi+json',
+        )
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
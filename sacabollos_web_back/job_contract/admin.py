@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import ArchivedJobContract, JobContract
+
+
+@admin.register(JobContract)
+class JobContractAdmin(LargeTableAdmin):
+    list_display = ['id', 'job', 'chapista_profile', 'company', 'agreed_price', 'status', 'started_at', 'finished_at']
+    # JobOffer.__str__ reads the company
+    list_select_related = ['job__company', 'chapista_profile', 'company']
+    raw_id_fields = ['job', 'chapista_profile', 'company']
+
+
+@admin.register(ArchivedJobContract)
+class ArchivedJobContractAdmin(LargeTableAdmin):
+    list_display = ['id', 'job_id', 'chapista_profile_id', 'company_id', 'agreed_price', 'status', 'archived_at']
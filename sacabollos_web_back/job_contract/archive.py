@@ -0,0 +1,11 @@
+from core.archive import ArchivePolicy
+from .models import ArchivedJobContract, JobContract
+
+
+# Transactions and reviews reference their contract without a database
+# constraint, so they stay live and keep pointing at the archived row.
+contract_archive = ArchivePolicy(
+    JobContract,
+    ArchivedJobContract,
+    terminal_statuses=['finished', 'cancelled'],
+)
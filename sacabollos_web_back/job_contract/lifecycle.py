@@ -0,0 +1,104 @@
+"""
+JobContract lifecycle: in_progress -> finished | cancelled
+
+Transitions are compare-and-swap UPDATEs (WHERE status = <status read>), so
+concurrent finish/cancel requests can't both win and no row lock is held
+between the read and the write: the loser's UPDATE matches no row, it
+re-reads the status and fails with InvalidTransition. The offer follows its
+contract (assigned -> done | cancelled) in the same transaction.
+
+Bulk UPDATEs skip signals, so the side effects post_save would trigger
+(response cache, chapista dashboard and company analytics rollups) are
+queued with on_commit and never run for a rolled back transition.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from chapista_profile.dashboard import refresh_day as refresh_chapista_day
+from company_profile.analytics import refresh_day as refresh_company_day
+from core.cache import invalidate
+from job_offer.models import JobOffer
+from .models import JobContract
+
+
+TRANSITIONS = {
+    'in_progress': {'finished', 'cancelled'},
+    'finished': set(),
+    'cancelled': set(),
+}
+
+# Offer status that follows each terminal contract status
+OFFER_STATUS = {
+    'finished': 'done',
+    'cancelled': 'cancelled',
+}
+
+# A lost CAS re-reads the status; terminal states make the second read fail for good
+MAX_ATTEMPTS = 3
+
+
+class InvalidTransition(Exception):
+    def __init__(self, current, target):
+        self.current = current
+        self.target = target
+        super().__init__(f"Can't move a contract from '{current}' to '{target}'")
+
+
+def _after_commit(contract):
+    day = timezone.localdate(contract['created_at'])
+    invalidate('offers', f"offer:{contract['job_id']}")
+    refresh_chapista_day(contract['chapista_profile_id'], day)
+    refresh_company_day(contract['company_id'], day)
+
+
+def transition(contract_id, target, now=None):
+    """
+    Move a contract to a new status if the transition is allowed
+
+    Args:
+        contract_id (int): JobContract id
+        target (str): New status
+        now (datetime): finished_at for terminal states, default now
+
+    Returns:
+        str: The status the contract moved from
+
+    Raises:
+        JobContract.DoesNotExist: No such contract
+        InvalidTransition: The current status doesn't allow the move
+    """
+    now = now or timezone.now()
+    changes = {'status': target}
+    if target in TRANSITIONS and not TRANSITIONS[target]:
+        changes['finished_at'] = now
+
+    for _ in range(MAX_ATTEMPTS):
+        with transaction.atomic():
+            contract = (
+                JobContract.objects.filter(pk=contract_id)
+                .values('status', 'job_id', 'chapista_profile_id', 'company_id', 'created_at')
+                .first()
+            )
+            if contract is None:
+                raise JobContract.DoesNotExist(f'JobContract {contract_id} does not exist')
+            current = contract['status']
+            if target not in TRANSITIONS.get(current, ()):
+                raise InvalidTransition(current, target)
+            if not JobContract.objects.filter(pk=contract_id, status=current).update(**changes):
+                continue  # lost the race, re-read
+            if target in OFFER_STATUS:
+                JobOffer.objects.filter(pk=contract['job_id'], status='assigned').update(
+                    status=OFFER_STATUS[target], updated_at=now,
+                )
+            # a failing cache/rollup refresh must not make the committed transition look failed
+            transaction.on_commit(lambda: _after_commit(contract), robust=True)
+            return current
+    raise InvalidTransition(current, target)
+
+
+def finish(contract_id, now=None):
+    return transition(contract_id, 'finished', now)
+
+
+def cancel(contract_id, now=None):
+    return transition(contract_id, 'cancelled', now)
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_contract', '0002_jobcontract_job_contract_chapista_st_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJobContract',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('job_id', models.BigIntegerField(db_index=True)),
+                ('chapista_profile_id', models.BigIntegerField(db_index=True)),
+                ('company_id', models.BigIntegerField(db_index=True)),
+                ('agreed_price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('agreed_time_hours', models.IntegerField()),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('finished', 'Finished'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -20,5 +20,30 @@ class JobContract(models.Model):
     finished_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['chapista_profile', 'status'], name='job_contract_chapista_st_idx'),
+        ]
+
+    def __str__(self):
+        return f"Contract: {self.job.title}"
+
+
+class ArchivedJobContract(models.Model):
+    """
+    Finished/cancelled JobContract moved out of the live table (see job_contract/archive.py)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    job_id = models.BigIntegerField(db_index=True)
+    chapista_profile_id = models.BigIntegerField(db_index=True)
+    company_id = models.BigIntegerField(db_index=True)
+    agreed_price = models.DecimalField(max_digits=8, decimal_places=2)
+    agreed_time_hours = models.IntegerField()
+    status = models.CharField(max_length=20, choices=JobContract.STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"Contract: {self.job.title}"
\ No newline at end of file
+        return f"Archived contract {self.id}"
@@ -1,3 +1,189 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from unittest import skipIf
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.testing import QueryPlanAssertionsMixin
+from job_offer.archive import offer_archive
+from job_offer.models import ArchivedJobOffer, JobOffer
+from job_proposal.models import ArchivedJobProposal, JobProposal
+from job_review.models import JobReview
+from transaction.models import Transaction
+from . import lifecycle
+from .archive import contract_archive
+from .models import ArchivedJobContract, JobContract
 
-# Create your tests here.
+
+class JobContractIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_contracts_by_chapista_and_status_use_index(self):
+        self.assertUsesIndex(
+            JobContract.objects.filter(chapista_profile_id=1, status='in_progress'), 'job_contract_chapista_st_idx'
+        )
+
+
+def make_contracts(count):
+    company_user = User.objects.create(username='empresa', password='!')
+    chapista_user = User.objects.create(username='chapista', password='!')
+    company = CompanyProfile.objects.create(user=company_user, company_name='Talleres SL', contact_person='-', address='-')
+    chapista = ChapistaProfile.objects.create(user=chapista_user, display_name='Pepe')
+    contracts = []
+    for i in range(count):
+        offer = JobOffer.objects.create(company=company, title=f'Paragolpes {i}', description='-', status='assigned')
+        contracts.append(JobContract.objects.create(
+            job=offer, chapista_profile=chapista, company=company, agreed_price=Decimal('120'), agreed_time_hours=3,
+        ))
+    return company_user, chapista_user, contracts
+
+
+class ContractArchiveTests(TestCase):
+    def setUp(self):
+        self.company_user, self.chapista_user, self.contracts = make_contracts(4)
+        JobContract.objects.update(status='finished', created_at=timezone.now() - timezone.timedelta(days=400))
+        JobOffer.objects.update(status='done', created_at=timezone.now() - timezone.timedelta(days=400))
+
+    def test_copies_then_deletes_contracts_and_offers(self):
+        offer = self.contracts[0].job
+        JobProposal.objects.create(
+            job=offer, chapista_profile=self.contracts[0].chapista_profile, message='-',
+            proposed_price=Decimal('100'), proposed_time_hours=2, status='accepted',
+        )
+        self.assertEqual(contract_archive.run(180, batch_size=3)['moved'], 4)
+        self.assertFalse(JobContract.objects.exists())
+        archived = ArchivedJobContract.objects.get(pk=self.contracts[0].pk)
+        self.assertEqual((archived.job_id, archived.status), (offer.pk, 'finished'))
+
+        # offers only become eligible once their contract is gone, proposals move with them
+        self.assertEqual(offer_archive.run(180)['moved'], 5)
+        self.assertFalse(JobOffer.objects.exists())
+        self.assertEqual(ArchivedJobOffer.objects.count(), 4)
+        self.assertEqual(ArchivedJobProposal.objects.get().job_id, offer.pk)
+
+    def test_archives_paid_and_reviewed_contracts_keeping_their_rows(self):
+        paid, reviewed, recent, _ = self.contracts
+        Transaction.objects.create(booking=paid, amount=Decimal('120'), status='completed')
+        JobReview.objects.create(job=reviewed, from_user=self.company_user, to_user=self.chapista_user, rating=5, comment='-')
+        JobContract.objects.filter(pk=recent.pk).update(created_at=timezone.now())
+        self.assertEqual(contract_archive.run(180)['moved'], 3)
+        self.assertEqual(list(JobContract.objects.values_list('pk', flat=True)), [recent.pk])
+        # payments and reviews stay live and point at the archived contract
+        self.assertEqual(Transaction.objects.get().booking_id, paid.pk)
+        self.assertEqual(JobReview.objects.get().job_id, reviewed.pk)
+        self.assertEqual(ArchivedJobContract.objects.filter(pk__in=[paid.pk, reviewed.pk]).count(), 2)
+        # their done offers follow
+        self.assertEqual(offer_archive.run(180)['moved'], 3)
+        self.assertEqual(list(JobOffer.objects.values_list('pk', flat=True)), [recent.job_id])
+
+    def test_row_that_stops_being_eligible_mid_batch_stays_live(self):
+        contract_archive.run(180)
+        cutoff = timezone.now() - timezone.timedelta(days=180)
+        ids = list(offer_archive.candidates(cutoff).values_list('pk', flat=True))
+        self.assertEqual(len(ids), 4)
+        # a contract lands on an offer between listing the batch and archiving it
+        late = JobContract.objects.create(
+            job_id=ids[0], chapista_profile=self.contracts[0].chapista_profile, company=self.contracts[0].company,
+            agreed_price=Decimal('120'), agreed_time_hours=3,
+        )
+        with transaction.atomic():
+            self.assertEqual(offer_archive.archive_batch(ids, cutoff), 3)
+        self.assertEqual(list(JobOffer.objects.values_list('pk', flat=True)), [ids[0]])
+        self.assertTrue(JobContract.objects.filter(pk=late.pk).exists())
+        self.assertFalse(ArchivedJobOffer.objects.filter(pk=ids[0]).exists())
+
+    def test_history_reads_live_and_archived_rows(self):
+        JobContract.objects.filter(pk=self.contracts[3].pk).update(status='in_progress')
+        for days, contract in zip((500, 300, 200, 100), self.contracts):
+            JobContract.objects.filter(pk=contract.pk).update(created_at=timezone.now() - timezone.timedelta(days=days))
+        self.assertEqual(contract_archive.run(250)['moved'], 2)
+        company_id = self.contracts[0].company_id
+        newest_first = [c.pk for c in reversed(self.contracts)]
+
+        rows = contract_archive.history('status', company_id=company_id, limit=3)
+        self.assertEqual([row['id'] for row in rows], newest_first[:3])
+        self.assertEqual([row['status'] for row in rows], ['in_progress', 'finished', 'finished'])
+        last = rows[-1]
+        rows = contract_archive.history('status', company_id=company_id, before=(last['created_at'], last['id']))
+        self.assertEqual([row['id'] for row in rows], newest_first[3:])
+        self.assertTrue(ArchivedJobContract.objects.filter(pk=rows[0]['id']).exists())
+        self.assertEqual(contract_archive.history(company_id=0), [])
+
+
+class ContractLifecycleTests(TestCase):
+    def setUp(self):
+        self.company_user, self.chapista_user, (self.contract,) = make_contracts(1)
+        self.client = APIClient()
+
+    def test_finish_updates_offer_and_defers_side_effects(self):
+        with mock.patch.object(lifecycle, '_after_commit') as after_commit:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.assertEqual(lifecycle.finish(self.contract.pk), 'in_progress')
+            after_commit.assert_not_called()
+            for callback in callbacks:
+                callback()
+            after_commit.assert_called_once()
+        self.contract.refresh_from_db()
+        self.assertEqual(self.contract.status, 'finished')
+        self.assertIsNotNone(self.contract.finished_at)
+        self.assertEqual(JobOffer.objects.get().status, 'done')
+
+        with self.assertRaises(lifecycle.InvalidTransition) as error:
+            lifecycle.cancel(self.contract.pk)
+        self.assertEqual(error.exception.current, 'finished')
+
+    def test_endpoints_check_parties(self):
+        url = f'/api/contracts/{self.contract.pk}/'
+        self.client.force_authenticate(self.chapista_user)
+        self.assertEqual(self.client.post(url + 'finish/').status_code, 403)
+        self.assertEqual(self.client.post(url + 'cancel/').status_code, 200)
+        self.client.force_authenticate(self.company_user)
+        response = self.client.post(url + 'finish/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'cancelled')
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite locks whole tables, concurrent writers fail instead of waiting')
+class ContractLifecycleConcurrencyTests(TransactionTestCase):
+    CONTRACTS = 20
+    THREADS = 8
+
+    def test_concurrent_finish_and_cancel_have_one_winner(self):
+        _, _, contracts = make_contracts(self.CONTRACTS)
+        barrier = threading.Barrier(self.THREADS)
+        wins = []
+        errors = []
+
+        def worker(index):
+            target = 'finished' if index % 2 else 'cancelled'
+            try:
+                barrier.wait()
+                for contract in contracts:
+                    try:
+                        lifecycle.transition(contract.pk, target)
+                        wins.append((contract.pk, target))
+                    except lifecycle.InvalidTransition:
+                        pass
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(pk for pk, _ in wins), sorted(c.pk for c in contracts))
+        final = dict(JobContract.objects.values_list('pk', 'status'))
+        offers = dict(JobContract.objects.values_list('pk', 'job__status'))
+        for pk, target in wins:
+            self.assertEqual(final[pk], target)
+            self.assertEqual(offers[pk], lifecycle.OFFER_STATUS[target])
+        self.assertFalse(JobContract.objects.filter(status='cancelled', finished_at__isnull=True).exists())
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'job_contract'
+
+urlpatterns = [
+    path('<int:contract_id>/finish/', views.finish_contract, name='contract_finish'),
+    path('<int:contract_id>/cancel/', views.cancel_contract, name='contract_cancel'),
+]
@@ -1,3 +1,56 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from . import lifecycle
+from .models import JobContract
 
-# Create your views here.
+
+def _parties(contract_id):
+    return (
+        JobContract.objects.filter(pk=contract_id)
+        .values_list('company__user_id', 'chapista_profile__user_id')
+        .first()
+    )
+
+
+def _transition(request, contract_id, target, allowed):
+    parties = _parties(contract_id)
+    if parties is None:
+        return Response({
+            'error': 'Contract not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if not request.user.is_staff and request.user.id not in allowed(*parties):
+        return Response({
+            'error': 'You are not allowed to change this contract'
+        }, status=status.HTTP_403_FORBIDDEN)
+    try:
+        previous = lifecycle.transition(contract_id, target)
+    except lifecycle.InvalidTransition as e:
+        return Response({
+            'error': str(e),
+            'status': e.current,
+        }, status=status.HTTP_409_CONFLICT)
+    return Response({
+        'id': contract_id,
+        'status': target,
+        'previous_status': previous,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finish_contract(request, contract_id):
+    """
+    Mark an in-progress contract as finished (the hiring company or staff)
+    """
+    return _transition(request, contract_id, 'finished', lambda company, chapista: {company})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def cancel_contract(request, contract_id):
+    """
+    Cancel an in-progress contract (either party or staff)
+    """
+    return _transition(request, contract_id, 'cancelled', lambda company, chapista: {company, chapista})
@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import ArchivedJobOffer, JobOffer
+
+
+@admin.register(JobOffer)
+class JobOfferAdmin(LargeTableAdmin):
+    list_display = ['title', 'company', 'location', 'status', 'budget_min', 'budget_max', 'deadline', 'created_at']
+    list_select_related = ['company', 'location']
+    list_filter = ['status']  # job_offer_status_created_idx
+    raw_id_fields = ['company']
+    autocomplete_fields = ['location']
+
+
+@admin.register(ArchivedJobOffer)
+class ArchivedJobOfferAdmin(LargeTableAdmin):
+    list_display = ['id', 'title', 'company_id', 'status', 'created_at', 'archived_at']
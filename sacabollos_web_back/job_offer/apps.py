@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JobOfferConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_offer'
+
+    def ready(self):
+        from . import search
+        search.connect_signals()
@@ -0,0 +1,15 @@
+from django.db.models import Q
+from core.archive import ArchivePolicy
+from job_proposal.archive import proposal_archive
+from .models import ArchivedJobOffer, JobOffer
+
+
+# Offers cascade to their contract and proposals: an offer is archived once its
+# contract is gone (archived), and its proposals move with it whatever their status.
+offer_archive = ArchivePolicy(
+    JobOffer,
+    ArchivedJobOffer,
+    terminal_statuses=['closed', 'done', 'cancelled'],
+    exclude=Q(jobcontract__isnull=False),
+    children=[(proposal_archive, 'job_id')],
+)
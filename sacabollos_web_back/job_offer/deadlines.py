@@ -0,0 +1,119 @@
+"""
+Expiry of open JobOffers whose deadline has passed
+
+Due offers are found through the (status, deadline) index and handled in
+bounded batches, one transaction per batch: the offers move to 'closed' and
+their pending proposals to 'rejected', each with a single UPDATE. Batches are
+claimed with SELECT ... FOR UPDATE SKIP LOCKED where the backend supports it,
+and the UPDATEs re-check the current status, so several workers can run at
+once without blocking each other or touching a row twice.
+
+Bulk UPDATEs skip signals, so the side effects those would trigger (response
+cache invalidation, chapista dashboard rollups) are scheduled explicitly
+after commit.
+"""
+import time
+
+from django.db import connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from chapista_profile.dashboard import refresh_day
+from core.cache import invalidate
+from job_proposal.models import JobProposal
+from .models import JobOffer
+
+
+def due_offers(now=None):
+    """
+    Open offers whose deadline has passed
+    """
+    return JobOffer.objects.filter(status='open', deadline__lte=now or timezone.now())
+
+
+def _claim(now, batch_size):
+    queryset = due_offers(now).order_by('deadline', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.values_list('pk', flat=True)[:batch_size])
+
+
+def _after_commit(offer_ids, dashboard_days):
+    invalidate('offers', *(f'offer:{pk}' for pk in offer_ids))
+    for chapista_id, day in dashboard_days:
+        refresh_day(chapista_id, day)
+
+
+def expire_batch(now=None, batch_size=500):
+    """
+    Close one batch of due offers and reject their pending proposals
+
+    Returns:
+        tuple: (offers closed, proposals rejected)
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = _claim(now, batch_size)
+        if not ids:
+            return 0, 0
+        closed = JobOffer.objects.filter(pk__in=ids, status='open').update(status='closed', updated_at=now)
+        pending = JobProposal.objects.filter(job_id__in=ids, status='pending')
+        dashboard_days = {
+            (chapista_id, timezone.localdate(created_at))
+            for chapista_id, created_at in pending.values_list('chapista_profile_id', 'created_at')
+        }
+        rejected = pending.update(status='rejected', updated_at=now)
+        transaction.on_commit(lambda: _after_commit(ids, dashboard_days))
+    return closed, rejected
+
+
+def expire_due(now=None, batch_size=500, max_batches=None):
+    """
+    Expire due offers in batches until none are left
+
+    Args:
+        now (datetime): Deadline cutoff (defaults to now)
+        batch_size (int): Offers per batch/transaction
+        max_batches (int): Stop after this many batches (None = until done)
+
+    Returns:
+        dict: offers closed, proposals rejected, batches and elapsed seconds
+    """
+    now = now or timezone.now()
+    closed = rejected = batches = 0
+    start = time.perf_counter()
+    while max_batches is None or batches < max_batches:
+        batch_closed, batch_rejected = expire_batch(now, batch_size)
+        if not batch_closed:
+            break
+        closed += batch_closed
+        rejected += batch_rejected
+        batches += 1
+        if batch_closed < batch_size:
+            # Short batch: nothing else is due (or other workers hold it)
+            break
+    return {
+        'closed': closed,
+        'rejected': rejected,
+        'batches': batches,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def backlog(now=None):
+    """
+    How far behind expiry is
+
+    Returns:
+        dict: due offers, pending proposals on them, and the age in seconds
+        of the oldest missed deadline (0 when nothing is due)
+    """
+    now = now or timezone.now()
+    offers = due_offers(now).aggregate(count=Count('id'), oldest=Min('deadline'))
+    return {
+        'due_offers': offers['count'],
+        'pending_proposals': JobProposal.objects.filter(
+            job__status='open', job__deadline__lte=now, status='pending'
+        ).count(),
+        'oldest_due_seconds': (now - offers['oldest']).total_seconds() if offers['oldest'] else 0,
+    }
@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from company_profile.models import CompanyProfile
+from job_offer.models import JobOffer, JobOfferSearchDocument
+from job_offer.search import rebuild, search_offers
+from locations.models import Location
+
+
+WORDS = [
+    'paragolpes', 'trasero', 'delantero', 'puerta', 'capo', 'aleta', 'granizo', 'pintura', 'arañazo',
+    'abolladura', 'retrovisor', 'faro', 'luces', 'techo', 'maletero', 'lateral', 'pulido', 'chapa',
+    'soldadura', 'parachoques', 'furgoneta', 'turismo', 'moto', 'urgente', 'rayadas', 'llanta',
+]
+TAGS = ['granizo', 'pintura', 'chapa', 'pulido', 'lunas', 'electricidad']
+QUERIES = ['paragolpes trasero', 'granizo capó', 'pintura puerta lateral', 'abolladura aleta', 'faro luces']
+
+
+class Command(BaseCommand):
+    help = 'Measure offer full-text search latency (p50/p95) over synthetic offers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=1000000)
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _populate(self, offers, rng):
+        locations = Location.objects.bulk_create(
+            Location(city=f'Bench {i}', province='Bench', lat=Decimal(f'{36 + i * 0.1:.4f}'),
+                    lng=Decimal(f'{-6 + i * 0.1:.4f}'))
+            for i in range(50)
+        )
+        user = User.objects.create(username='bench_search', password='!')
+        company = CompanyProfile.objects.create(
+            user=user, company_name='Bench SL', contact_person='Bench', address='-', location=locations[0]
+        )
+        for start in range(0, offers, 10000):
+            JobOffer.objects.bulk_create(
+                JobOffer(
+                    company=company,
+                    title=' '.join(rng.sample(WORDS, 3)),
+                    description=' '.join(rng.choices(WORDS, k=20)),
+                    location=rng.choice(locations),
+                    budget_min=Decimal(rng.randrange(50, 500)),
+                    budget_max=Decimal(rng.randrange(500, 3000)),
+                    tags=rng.sample(TAGS, 2),
+                )
+                for _ in range(min(10000, offers - start))
+            )
+        return rebuild(batch_size=10000)
+
+    def _cleanup(self):
+        offers = JobOffer._meta.db_table
+        documents = JobOfferSearchDocument._meta.db_table
+        company_ids = list(
+            CompanyProfile.objects.filter(user__username='bench_search').values_list('pk', flat=True)
+        )
+        # plain DELETEs: the ORM would load every offer and fire its delete signals
+        with connection.cursor() as cursor:
+            for company_id in company_ids:
+                cursor.execute(
+                    f'DELETE FROM {documents} WHERE offer_id IN (SELECT id FROM {offers} WHERE company_id = %s)',
+                    [company_id],
+                )
+                cursor.execute(f'DELETE FROM {offers} WHERE company_id = %s', [company_id])
+        User.objects.filter(username='bench_search').delete()
+        Location.objects.filter(province='Bench', city__startswith='Bench ').delete()
+
+    def _measure(self, label, runs, **kwargs):
+        timings = []
+        hits = 0
+        for i in range(runs):
+            start = time.perf_counter()
+            hits += len(search_offers(QUERIES[i % len(QUERIES)], **kwargs))
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f'{label:<22} p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms   '
+            f'{hits / runs:5.1f} hits/query'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        runs = options['runs']
+        # InnoDB FULLTEXT only indexes committed rows, so the data is committed (and removed afterwards)
+        try:
+            start = time.perf_counter()
+            indexed = self._populate(options['offers'], rng)
+            self.stdout.write(f'Indexed {indexed} offers in {time.perf_counter() - start:.1f}s')
+            self._measure('text', runs)
+            self._measure('text + tags', runs, tags=['granizo'])
+            self._measure('text + budget', runs, budget_min=Decimal('200'), budget_max=Decimal('800'))
+            self._measure('text + radius 50km', runs, near=(36.5, -5.5, 50))
+        finally:
+            self._cleanup()
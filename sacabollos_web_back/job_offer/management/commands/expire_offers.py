@@ -0,0 +1,39 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from job_offer.deadlines import backlog, expire_due
+
+
+class Command(BaseCommand):
+    help = 'Close open offers past their deadline and reject their pending proposals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-batches', type=int, default=None, help='Per run, default until done')
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running as a worker, sleeping N seconds between runs (several workers may run at once)',
+        )
+        parser.add_argument('--backlog', action='store_true', help='Only print backlog metrics as JSON')
+
+    def _run_once(self, options):
+        stats = expire_due(batch_size=options['batch_size'], max_batches=options['max_batches'])
+        pending = backlog()
+        self.stdout.write(
+            f"Closed {stats['closed']} offers, rejected {stats['rejected']} proposals "
+            f"in {stats['batches']} batches ({stats['elapsed']:.2f}s); "
+            f"backlog {pending['due_offers']} offers, oldest {pending['oldest_due_seconds']:.0f}s overdue"
+        )
+
+    def handle(self, *args, **options):
+        if options['backlog']:
+            self.stdout.write(json.dumps(backlog()))
+            return
+        if options['interval'] is None:
+            self._run_once(options)
+            return
+        while True:
+            self._run_once(options)
+            time.sleep(options['interval'])
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_offer.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every job offer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {written} offers'))
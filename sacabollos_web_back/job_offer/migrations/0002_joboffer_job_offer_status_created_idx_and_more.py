@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['status', '-created_at'], name='job_offer_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['location', 'status', '-created_at'], name='job_offer_location_status_idx'),
+        ),
+    ]
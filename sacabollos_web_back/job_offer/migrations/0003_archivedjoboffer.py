@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0002_joboffer_job_offer_status_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJobOffer',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('company_id', models.BigIntegerField(db_index=True)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('location_id', models.BigIntegerField(blank=True, null=True)),
+                ('budget_min', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('budget_max', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('estimated_time_hours', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed'), ('assigned', 'Assigned'), ('done', 'Done'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('tags', models.JSONField(default=list)),
+                ('deadline', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
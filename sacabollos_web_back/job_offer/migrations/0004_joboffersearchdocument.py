@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0003_archivedjoboffer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobOfferSearchDocument',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='job_offer.joboffer')),
+                ('title', models.TextField()),
+                ('body', models.TextField()),
+                ('tags', models.TextField(blank=True)),
+            ],
+        ),
+    ]
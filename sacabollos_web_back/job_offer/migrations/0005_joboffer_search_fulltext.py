@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+DOC_TABLE = 'job_offer_joboffersearchdocument'
+FTS_TABLE = 'job_offer_search_fts'
+
+SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, body, tags, content='{DOC_TABLE}', "
+    f"content_rowid='offer_id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOC_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body, tags) VALUES (new.offer_id, new.title, new.body, new.tags); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOC_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body, tags) "
+    f"VALUES ('delete', old.offer_id, old.title, old.body, old.tags); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOC_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body, tags) "
+    f"VALUES ('delete', old.offer_id, old.title, old.body, old.tags); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body, tags) VALUES (new.offer_id, new.title, new.body, new.tags); END",
+]
+
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+MYSQL_CREATE = [
+    f"CREATE FULLTEXT INDEX job_offer_search_text_ft ON {DOC_TABLE} (title, body)",
+    f"CREATE FULLTEXT INDEX job_offer_search_title_ft ON {DOC_TABLE} (title)",
+    f"CREATE FULLTEXT INDEX job_offer_search_tags_ft ON {DOC_TABLE} (tags)",
+]
+
+MYSQL_DROP = [
+    f"DROP INDEX job_offer_search_text_ft ON {DOC_TABLE}",
+    f"DROP INDEX job_offer_search_title_ft ON {DOC_TABLE}",
+    f"DROP INDEX job_offer_search_tags_ft ON {DOC_TABLE}",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0004_joboffersearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_CREATE, 'mysql': MYSQL_CREATE}),
+            _run({'sqlite': SQLITE_DROP, 'mysql': MYSQL_DROP}),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0005_joboffer_search_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['status', 'deadline'], name='job_offer_status_deadline_idx'),
+        ),
+    ]
@@ -27,6 +27,51 @@ class JobOffer(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='job_offer_status_created_idx'),
+            models.Index(fields=['location', 'status', '-created_at'], name='job_offer_location_status_idx'),
+            models.Index(fields=['status', 'deadline'], name='job_offer_status_deadline_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.company.company_name}"
\ No newline at end of file
+        return f"{self.title} - {self.company.company_name}"
+
+
+class ArchivedJobOffer(models.Model):
+    """
+    Terminal-state JobOffer moved out of the live table (see job_offer/archive.py)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    company_id = models.BigIntegerField(db_index=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    location_id = models.BigIntegerField(null=True, blank=True)
+    budget_min = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    budget_max = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    estimated_time_hours = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=JobOffer.STATUS_CHOICES)
+    tags = models.JSONField(default=list)
+    deadline = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Archived offer {self.id}: {self.title}"
+
+
+class JobOfferSearchDocument(models.Model):
+    """
+    Analyzed (folded, stemmed) text of a JobOffer, indexed by MySQL FULLTEXT
+    or a SQLite FTS5 table (see job_offer/search.py)
+    """
+    offer = models.OneToOneField(JobOffer, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.TextField()
+    body = models.TextField()
+    tags = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"Search document {self.offer_id}"
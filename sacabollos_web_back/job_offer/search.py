@@ -0,0 +1,215 @@
+"""
+Full-text search over JobOffer title/description
+
+Offers are analyzed in Python (accent folding, Spanish stopwords, light
+Spanish stemming) into a JobOfferSearchDocument row on save, and the database
+indexes those documents: an FTS5 table ranked with bm25() on SQLite, FULLTEXT
+indexes ranked with MATCH() relevance on MySQL. Queries go through the same
+analyzer, so "Paragolpes traseros" matches "paragolpe trasero".
+"""
+import math
+import re
+
+from django.db import connection
+from django.db.models.signals import post_save
+
+from locations.autocomplete import fold
+from .models import JobOffer, JobOfferSearchDocument
+
+
+FTS_TABLE = 'job_offer_search_fts'
+
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes como con contra cual cuando de del desde donde
+durante e el ella ellas ellos en entre era es esa esas ese eso esos esta estas este esto estos fue ha hay
+la las le les lo los mas me mi mis muy nada ni no nos o os otra otro para pero poco por porque que se
+sea segun ser si sin sobre son su sus tambien te tiene todo todos tu tus un una unas uno unos y ya
+""".split())
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def stem(word):
+    """
+    Light Spanish stemmer: drops plural and gender endings
+    ("paragolpes" -> "paragolp", "traseras" -> "traser", "luces" -> "luz")
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith('ces') and len(word) > 4:
+        return word[:-3] + 'z'
+    if word.endswith('es') and len(word) > 4 and word[-3] not in 'aeiou':
+        word = word[:-2]
+    elif word.endswith('s'):
+        word = word[:-1]
+    if len(word) > 4 and word[-1] in 'aeo':
+        word = word[:-1]
+    return word
+
+
+def analyze(text):
+    """
+    Split text into folded, stemmed, stopword-free terms
+    """
+    return [stem(token) for token in TOKEN_RE.findall(fold(text or '')) if token not in STOPWORDS]
+
+
+def tag_term(tag):
+    """
+    Single index term for a tag ("Chapa y pintura" -> "chapaypintura")
+    """
+    return ''.join(TOKEN_RE.findall(fold(str(tag))))
+
+
+def build_document(offer):
+    """
+    Unsaved search document for an offer
+    """
+    return JobOfferSearchDocument(
+        offer_id=offer.pk,
+        title=' '.join(analyze(offer.title)),
+        body=' '.join(analyze(offer.description)),
+        tags=' '.join(filter(None, (tag_term(tag) for tag in offer.tags or []))),
+    )
+
+
+def index_offer(offer):
+    """
+    Create or refresh the search document of an offer
+    """
+    document = build_document(offer)
+    JobOfferSearchDocument.objects.update_or_create(
+        offer_id=offer.pk,
+        defaults={'title': document.title, 'body': document.body, 'tags': document.tags},
+    )
+
+
+def rebuild(batch_size=1000):
+    """
+    Re-analyze every offer (after analyzer changes or bulk_create imports)
+
+    Returns:
+        int: Documents written
+    """
+    JobOfferSearchDocument.objects.all().delete()
+    written = 0
+    offers = JobOffer.objects.only('id', 'title', 'description', 'tags').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(offers.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return written
+        JobOfferSearchDocument.objects.bulk_create(build_document(offer) for offer in batch)
+        written += len(batch)
+        last_pk = batch[-1].pk
+
+
+def _offer_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'description', 'tags'} & set(update_fields):
+        return
+    index_offer(instance)
+
+
+def connect_signals():
+    post_save.connect(_offer_saved, sender=JobOffer, dispatch_uid='job-offer-search-index')
+
+
+def _filters(status, budget_min, budget_max, near):
+    """
+    SQL conditions on the offer (o) and its location (l)
+    """
+    where, params = [], []
+    if status:
+        where.append('o.status = %s')
+        params.append(status)
+    if budget_min is not None:
+        where.append('o.budget_max >= %s')
+        params.append(budget_min)
+    if budget_max is not None:
+        where.append('o.budget_min <= %s')
+        params.append(budget_max)
+    if near is not None:
+        lat, lng, radius_km = near
+        # Index friendly bounding box first, then the exact haversine distance
+        dlat = radius_km / 111.045
+        dlng = radius_km / (111.045 * max(math.cos(math.radians(lat)), 0.01))
+        where.append('l.lat BETWEEN %s AND %s AND l.lng BETWEEN %s AND %s')
+        params += [lat - dlat, lat + dlat, lng - dlng, lng + dlng]
+        where.append(
+            '2 * %s * ASIN(SQRT(POWER(SIN((RADIANS(l.lat) - %s) / 2), 2) + '
+            '%s * COS(RADIANS(l.lat)) * POWER(SIN((RADIANS(l.lng) - %s) / 2), 2))) <= %s'
+        )
+        params += [EARTH_RADIUS_KM, math.radians(lat), math.cos(math.radians(lat)), math.radians(lng), radius_km]
+    return where, params
+
+
+def _sqlite_query(terms, tags, where, params, limit, offset):
+    match = ' '.join(f'"{term}"' for term in terms)
+    if tags:
+        match = f"({match}) AND " + ' AND '.join(f'tags : "{tag}"' for tag in tags)
+    doc = JobOfferSearchDocument._meta.db_table
+    sql = (
+        f'SELECT d.offer_id, bm25({FTS_TABLE}, 3.0, 1.0, 0.5) AS score '
+        f'FROM {FTS_TABLE} JOIN {doc} d ON d.offer_id = {FTS_TABLE}.rowid '
+        f'JOIN {JobOffer._meta.db_table} o ON o.id = d.offer_id '
+        f'LEFT JOIN locations_location l ON l.id = o.location_id '
+        f'WHERE {FTS_TABLE} MATCH %s' + ''.join(f' AND {w}' for w in where) +
+        ' ORDER BY score LIMIT %s OFFSET %s'
+    )
+    # bm25() is lower-is-better, flip it so callers always sort descending
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *params, limit, offset])
+        return [(offer_id, -score) for offer_id, score in cursor.fetchall()]
+
+
+def _mysql_query(terms, tags, where, params, limit, offset):
+    natural = ' '.join(terms)
+    required = ' '.join(f'+{term}' for term in terms)
+    doc = JobOfferSearchDocument._meta.db_table
+    conditions = ['MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE)']
+    match_params = [required]
+    if tags:
+        conditions.append('MATCH(d.tags) AGAINST (%s IN BOOLEAN MODE)')
+        match_params.append(' '.join(f'+{tag}' for tag in tags))
+    sql = (
+        'SELECT d.offer_id, MATCH(d.title, d.body) AGAINST (%s) + MATCH(d.title) AGAINST (%s) AS score '
+        f'FROM {doc} d JOIN {JobOffer._meta.db_table} o ON o.id = d.offer_id '
+        'LEFT JOIN locations_location l ON l.id = o.location_id '
+        'WHERE ' + ' AND '.join(conditions + where) +
+        ' ORDER BY score DESC LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [natural, natural, *match_params, *params, limit, offset])
+        return list(cursor.fetchall())
+
+
+def search_offers(query, status='open', tags=None, near=None, budget_min=None, budget_max=None,
+                limit=20, offset=0):
+    """
+    Rank offers matching every term of a free text query
+
+    Args:
+        query (str): Free text, e.g. "paragolpes trasero"
+        status (str): Offer status filter (None = any)
+        tags (list): Tags the offer must have
+        near (tuple): (lat, lng, radius_km) around the offer location
+        budget_min (Decimal): Offer budget_max must reach this
+        budget_max (Decimal): Offer budget_min must not exceed this
+        limit (int): Page size
+        offset (int): Page offset
+
+    Returns:
+        list: (offer_id, score) tuples, best first
+    """
+    terms = analyze(query)
+    if not terms:
+        return []
+    tags = [t for t in (tag_term(tag) for tag in tags or []) if t]
+    where, params = _filters(status, budget_min, budget_max, near)
+    if connection.vendor == 'sqlite':
+        return _sqlite_query(terms, tags, where, params, limit, offset)
+    if connection.vendor == 'mysql':
+        return _mysql_query(terms, tags, where, params, limit, offset)
+    raise NotImplementedError(f'Offer search is not supported on {connection.vendor}')
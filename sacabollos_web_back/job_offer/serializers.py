@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from locations.serializers import LocationSerializer
+from .models import JobOffer
+
+
+class JobOfferSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading job offer data
+    """
+    company_name = serializers.CharField(source='company.company_name', read_only=True)
+    location = LocationSerializer(read_only=True)
+
+    class Meta:
+        model = JobOffer
+        fields = ['id', 'company', 'company_name', 'title', 'description', 'location', 'budget_min',
+                'budget_max', 'estimated_time_hours', 'status', 'tags', 'deadline',
+                'created_at', 'updated_at']
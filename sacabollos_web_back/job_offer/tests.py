@@ -1,3 +1,183 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.serializers import FlatSerializer
+from core.testing import QueryPlanAssertionsMixin
+from job_proposal.models import JobProposal
+from locations.models import Location
+from users.moderation import verify_companies
+from .deadlines import backlog, expire_due
+from .models import JobOffer
+from .search import analyze, search_offers
+from .serializers import JobOfferSerializer
 
-# Create your tests here.
+
+class FlatJobOfferSerializerTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('autofix', 'autofix@example.com', 'pass')
+        company = CompanyProfile.objects.create(
+            user=user, company_name='AutoFix', contact_person='Ana', address='Calle 1'
+        )
+        location = Location.objects.create(city='Sevilla', province='Sevilla', lat=Decimal('37.38'))
+        JobOffer.objects.create(
+            company=company, title='Paragolpes', description='Trasero', location=location,
+            budget_min=Decimal('100'), budget_max=Decimal('200.5'), tags=['granizo'],
+        )
+        JobOffer.objects.create(company=company, title='Puerta', description='Abollón')
+
+    def test_output_matches_model_serializer(self):
+        queryset = JobOffer.objects.all()
+        expected = [dict(row) for row in JobOfferSerializer(queryset, many=True).data]
+        self.assertEqual(FlatSerializer(JobOfferSerializer).serialize(queryset), expected)
+
+
+class JobOfferResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('autofix', 'autofix@example.com', 'pass')
+        self.company = CompanyProfile.objects.create(
+            user=self.user, company_name='AutoFix', contact_person='Ana', address='Calle 1'
+        )
+        self.offer = JobOffer.objects.create(company=self.company, title='Paragolpes', description='Trasero')
+        self.urls = ['/api/offers/', f'/api/offers/{self.offer.pk}/']
+
+    def assertCached(self, outcome, company_name):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], outcome, url)
+            self.assertContains(response, company_name)
+
+    def test_company_changes_invalidate_list_and_detail(self):
+        self.assertCached('MISS', 'AutoFix')
+        self.assertCached('HIT', 'AutoFix')
+
+        self.company.company_name = 'AutoFix Norte'
+        self.company.save()
+        self.assertCached('MISS', 'AutoFix Norte')
+
+        # bulk moderation goes through invalidate_rows instead of post_save
+        with self.captureOnCommitCallbacks(execute=True):
+            verify_companies([self.user.pk])
+        self.assertCached('MISS', 'AutoFix Norte')
+        self.assertCached('HIT', 'AutoFix Norte')
+
+    def test_offer_changes_invalidate_its_detail(self):
+        self.assertCached('MISS', 'AutoFix')
+        self.offer.title = 'Paragolpes trasero'
+        self.offer.save()
+        self.assertCached('MISS', 'AutoFix')
+
+
+class JobOfferIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_open_offers_feed_uses_status_index(self):
+        self.assertUsesIndex(JobOffer.objects.filter(status='open'), 'job_offer_status_created_idx')
+
+    def test_offers_by_location_use_location_status_index(self):
+        self.assertUsesIndex(
+            JobOffer.objects.filter(location_id=1, status='open'), 'job_offer_location_status_idx'
+        )
+
+    def test_due_offers_use_deadline_index(self):
+        self.assertUsesIndex(
+            JobOffer.objects.filter(status='open', deadline__lte=timezone.now()), 'job_offer_status_deadline_idx'
+        )
+
+
+# InnoDB FULLTEXT only sees committed rows, so these tests can't run inside a rolled back transaction
+class JobOfferSearchTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user('carroceria', 'carroceria@example.com', 'pass')
+        company = CompanyProfile.objects.create(
+            user=user, company_name='Carrocería Sur', contact_person='Luis', address='Calle 2'
+        )
+        sevilla = Location.objects.create(city='Sevilla', province='Sevilla', lat=Decimal('37.38'), lng=Decimal('-5.98'))
+        madrid = Location.objects.create(city='Madrid', province='Madrid', lat=Decimal('40.42'), lng=Decimal('-3.70'))
+        self.bumper = JobOffer.objects.create(
+            company=company, title='Paragolpes trasero', description='Golpe en el paragolpes, pintura incluida',
+            location=sevilla, budget_min=Decimal('100'), budget_max=Decimal('300'), tags=['Chapa', 'Pintura'],
+        )
+        self.door = JobOffer.objects.create(
+            company=company, title='Puerta lateral', description='Arañazo en paragolpes traseros y puerta',
+            location=madrid, budget_min=Decimal('500'), budget_max=Decimal('900'), tags=['Pintura'],
+        )
+        self.closed = JobOffer.objects.create(
+            company=company, title='Paragolpes trasero', description='Ya resuelto', status='closed',
+        )
+
+    def ids(self, query, **kwargs):
+        return [offer_id for offer_id, _ in search_offers(query, **kwargs)]
+
+    def test_analyzer_folds_and_stems(self):
+        self.assertEqual(analyze('Paragolpes TRASEROS del capó'), analyze('paragolpe trasero capo'))
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.ids('paragolpes traseros'), [self.bumper.pk, self.door.pk])
+
+    def test_filters(self):
+        self.assertEqual(self.ids('paragolpes', tags=['chapa']), [self.bumper.pk])
+        self.assertEqual(self.ids('paragolpes', budget_min=Decimal('400')), [self.door.pk])
+        self.assertEqual(self.ids('paragolpes', near=(37.4, -6.0, 50)), [self.bumper.pk])
+        self.assertEqual(self.ids('paragolpes', status=None, tags=['chapa']), [self.bumper.pk])
+
+    def test_document_follows_offer_updates(self):
+        self.door.title = 'Capó abollado'
+        self.door.save()
+        self.assertEqual(self.ids('capo'), [self.door.pk])
+
+    def test_endpoint_status_filter(self):
+        def ids(**params):
+            response = self.client.get('/api/offers/search/', {'q': 'paragolpes trasero', **params})
+            self.assertEqual(response.status_code, 200)
+            return [offer['id'] for offer in response.json()['results']]
+
+        self.assertEqual(ids(), [self.bumper.pk, self.door.pk])
+        self.assertEqual(ids(status='closed'), [self.closed.pk])
+        self.assertEqual(ids(status='assigned'), [])
+        response = self.client.get('/api/offers/search/', {'q': 'paragolpes', 'status': 'borrado'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.json())
+
+
+class JobOfferDeadlineTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('talleres', 'talleres@example.com', 'pass')
+        company = CompanyProfile.objects.create(
+            user=user, company_name='Talleres Norte', contact_person='Eva', address='Calle 3'
+        )
+        chapista = ChapistaProfile.objects.create(
+            user=User.objects.create_user('pepe', 'pepe@example.com', 'pass'), display_name='Pepe'
+        )
+        now = timezone.now()
+        self.expired = [
+            JobOffer.objects.create(company=company, title=f'Vencida {i}', description='-',
+                                    deadline=now - timezone.timedelta(hours=i + 1))
+            for i in range(3)
+        ]
+        self.future = JobOffer.objects.create(company=company, title='Futura', description='-',
+                                            deadline=now + timezone.timedelta(days=1))
+        self.assigned = JobOffer.objects.create(company=company, title='Asignada', description='-',
+                                                status='assigned', deadline=now - timezone.timedelta(days=1))
+        for offer in (*self.expired, self.future, self.assigned):
+            JobProposal.objects.create(job=offer, chapista_profile=chapista, message='-',
+                                    proposed_price=Decimal('100'), proposed_time_hours=2)
+
+    def test_expires_due_offers_in_batches(self):
+        self.assertEqual(backlog()['due_offers'], 3)
+        self.assertEqual(backlog()['pending_proposals'], 3)
+        with CaptureQueriesContext(connection) as queries:
+            stats = expire_due(batch_size=2)
+        # One UPDATE per table and batch, however many rows each batch holds
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 4)
+        self.assertEqual((stats['closed'], stats['rejected'], stats['batches']), (3, 3, 2))
+        self.assertEqual(set(JobOffer.objects.filter(status='closed')), set(self.expired))
+        self.assertEqual(JobProposal.objects.filter(status='rejected').count(), 3)
+        self.assertEqual(JobProposal.objects.filter(status='pending').count(), 2)
+        self.assertEqual(backlog()['due_offers'], 0)
+        self.assertEqual(expire_due()['closed'], 0)
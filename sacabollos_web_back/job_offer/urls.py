@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'job_offer'
+
+urlpatterns = [
+    path('', views.OpenJobOfferListView.as_view(), name='offer_list'),
+    path('search/', views.search_job_offers, name='offer_search'),
+    path('<int:pk>/', views.JobOfferDetailView.as_view(), name='offer_detail'),
+]
@@ -1,3 +1,74 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from decimal import Decimal, InvalidOperation
+from rest_framework import generics
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from core.cache import cache_response
+from core.mixins import FlatListMixin
+from .models import JobOffer
+from .search import search_offers
+from .serializers import JobOfferSerializer
 
-# Create your views here.
+
+@method_decorator(cache_response('offers', 'locations'), name='dispatch')
+class OpenJobOfferListView(FlatListMixin, generics.ListAPIView):
+    """
+    List open job offers (public)
+    """
+    queryset = JobOffer.objects.filter(status='open').select_related('company', 'location')
+    serializer_class = JobOfferSerializer
+    permission_classes = [AllowAny]
+
+
+@method_decorator(cache_response('offer:{pk}', 'companies', 'locations'), name='dispatch')
+class JobOfferDetailView(generics.RetrieveAPIView):
+    """
+    Retrieve a single job offer (public)
+    """
+    queryset = JobOffer.objects.select_related('company', 'location')
+    serializer_class = JobOfferSerializer
+    permission_classes = [AllowAny]
+
+
+def _param(request, name, cast):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (ValueError, InvalidOperation):
+        raise ValidationError({name: f'Invalid value: {value}'})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_job_offers(request):
+    """
+    Full-text search of offers, open ones unless ?status= asks for another status
+    (?q=&status=&tags=a,b&lat=&lng=&radius_km=&budget_min=&budget_max=&limit=&offset=)
+    """
+    query = request.query_params.get('q', '')
+    offer_status = request.query_params.get('status') or 'open'
+    if offer_status not in dict(JobOffer.STATUS_CHOICES):
+        raise ValidationError({'status': f'Invalid value: {offer_status}'})
+    tags = [tag for tag in request.query_params.get('tags', '').split(',') if tag.strip()]
+    lat, lng = _param(request, 'lat', float), _param(request, 'lng', float)
+    near = None
+    if lat is not None and lng is not None:
+        near = (lat, lng, _param(request, 'radius_km', float) or 25.0)
+    limit = max(1, min(_param(request, 'limit', int) or 20, 100))
+    offset = max(0, _param(request, 'offset', int) or 0)
+
+    hits = search_offers(
+        query, status=offer_status, tags=tags, near=near,
+        budget_min=_param(request, 'budget_min', Decimal), budget_max=_param(request, 'budget_max', Decimal),
+        limit=limit, offset=offset,
+    )
+    offers = JobOffer.objects.select_related('company', 'location').in_bulk([offer_id for offer_id, _ in hits])
+    results = []
+    for offer_id, score in hits:
+        if offer_id in offers:
+            results.append({**JobOfferSerializer(offers[offer_id]).data, 'score': round(score, 4)})
+    return Response({'results': results, 'limit': limit, 'offset': offset})
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import ArchivedJobProposal, JobProposal
+
+
+@admin.register(JobProposal)
+class JobProposalAdmin(LargeTableAdmin):
+    list_display = ['id', 'job', 'chapista_profile', 'proposed_price', 'proposed_time_hours', 'status', 'created_at']
+    # JobOffer.__str__ reads the company
+    list_select_related = ['job__company', 'chapista_profile']
+    raw_id_fields = ['job', 'chapista_profile']
+
+
+@admin.register(ArchivedJobProposal)
+class ArchivedJobProposalAdmin(LargeTableAdmin):
+    list_display = ['id', 'job_id', 'chapista_profile_id', 'proposed_price', 'status', 'created_at', 'archived_at']
@@ -0,0 +1,5 @@
+from core.archive import ArchivePolicy
+from .models import ArchivedJobProposal, JobProposal
+
+
+proposal_archive = ArchivePolicy(JobProposal, ArchivedJobProposal, terminal_statuses=['rejected'])
@@ -0,0 +1,88 @@
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from job_offer.models import JobOffer
+from job_proposal.submit import offer_counters, submit_proposal
+
+
+class Command(BaseCommand):
+    help = 'Measure sustained proposal submissions/sec against a single hot offer from concurrent threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proposals', type=int, default=2000, help='Distinct chapistas proposing')
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--duplicates', type=float, default=0.2,
+                            help='Share of extra retried submissions (same chapista again)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _populate(self, proposals):
+        User.objects.bulk_create(User(username=f'bench_proposal_{i}', password='!') for i in range(proposals + 1))
+        users = list(User.objects.filter(username__startswith='bench_proposal_').order_by('pk'))
+        company = CompanyProfile.objects.create(user=users[0], company_name='Bench SL', contact_person='-', address='-')
+        ChapistaProfile.objects.bulk_create(
+            ChapistaProfile(user=user, display_name=user.username) for user in users[1:]
+        )
+        chapista_ids = list(ChapistaProfile.objects.filter(user__in=users[1:]).values_list('pk', flat=True))
+        offer = JobOffer.objects.create(company=company, title='Bench hot offer', description='-')
+        return offer, chapista_ids
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # threads use their own connections, so the data has to be committed (and is removed afterwards)
+        offer, chapista_ids = self._populate(options['proposals'])
+        try:
+            work = chapista_ids + rng.sample(chapista_ids, int(len(chapista_ids) * options['duplicates']))
+            rng.shuffle(work)
+            lock = threading.Lock()
+            outcome = {'created': 0, 'duplicate': 0, 'error': 0}
+            latencies = []
+
+            def worker():
+                try:
+                    while True:
+                        with lock:
+                            if not work:
+                                return
+                            chapista_id = work.pop()
+                        started = time.perf_counter()
+                        try:
+                            _, created = submit_proposal(chapista_id, offer.pk, 'Bench', Decimal('150.00'), 4)
+                            result = 'created' if created else 'duplicate'
+                        except Exception:
+                            result = 'error'
+                        with lock:
+                            outcome[result] += 1
+                            latencies.append(time.perf_counter() - started)
+                finally:
+                    connection.close()
+
+            total = len(work)
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            latencies.sort()
+            counted = offer_counters([offer.pk])[offer.pk]['proposals']
+            self.stdout.write(
+                f"{total} submissions from {options['threads']} threads in {elapsed:.2f}s: "
+                f"{total / elapsed:.0f} submissions/s, {outcome['created'] / elapsed:.0f} new proposals/s"
+            )
+            self.stdout.write(
+                f"created {outcome['created']}  duplicates {outcome['duplicate']}  errors {outcome['error']}  "
+                f"counter {counted}  p50 {latencies[len(latencies) // 2] * 1000:.1f} ms  "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms"
+            )
+        finally:
+            User.objects.filter(username__startswith='bench_proposal_').delete()
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from job_proposal.submit import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the sharded per-offer proposal counters from the live and archived proposals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('offer_ids', nargs='*', type=int, help='Only these offers (default: all)')
+
+    def handle(self, *args, **options):
+        written = rebuild(options['offer_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote counters of {written} offers'))
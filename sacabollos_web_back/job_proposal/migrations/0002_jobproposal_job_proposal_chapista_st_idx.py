@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_proposal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobproposal',
+            index=models.Index(fields=['chapista_profile', 'status'], name='job_proposal_chapista_st_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_proposal', '0002_jobproposal_job_proposal_chapista_st_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJobProposal',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('job_id', models.BigIntegerField(db_index=True)),
+                ('chapista_profile_id', models.BigIntegerField(db_index=True)),
+                ('message', models.TextField()),
+                ('proposed_price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('proposed_time_hours', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], max_length=20)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer', '0006_joboffer_status_deadline_idx'),
+        ('job_proposal', '0003_archivedjobproposal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferProposalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('proposals', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proposal_counters', to='job_offer.joboffer')),
+            ],
+            options={
+                'unique_together': {('offer', 'shard')},
+            },
+        ),
+    ]
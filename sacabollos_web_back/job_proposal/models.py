@@ -19,6 +19,48 @@ class JobProposal(models.Model):
 
     class Meta:
         unique_together = ['job', 'chapista_profile']
+        indexes = [
+            models.Index(fields=['chapista_profile', 'status'], name='job_proposal_chapista_st_idx'),
+        ]
 
     def __str__(self):
-        return f"Proposal by {self.chapista_profile.display_name} for {self.job.title}"
\ No newline at end of file
+        return f"Proposal by {self.chapista_profile.display_name} for {self.job.title}"
+
+
+class ArchivedJobProposal(models.Model):
+    """
+    Terminal-state JobProposal moved out of the live table (see job_proposal/archive.py)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    job_id = models.BigIntegerField(db_index=True)
+    chapista_profile_id = models.BigIntegerField(db_index=True)
+    message = models.TextField()
+    proposed_price = models.DecimalField(max_digits=8, decimal_places=2)
+    proposed_time_hours = models.IntegerField()
+    status = models.CharField(max_length=20, choices=JobProposal.STATUS_CHOICES)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived proposal {self.id}"
+
+
+class OfferProposalCounter(models.Model):
+    """
+    One shard of an offer's proposal counters (see job_proposal/submit.py)
+
+    Submissions increment a random shard instead of a column on JobOffer, so
+    a burst of proposals on one offer neither locks the offer row nor queues
+    on a single counter row. Totals are the sum over the offer's shards.
+    """
+    offer = models.ForeignKey('job_offer.JobOffer', on_delete=models.CASCADE, related_name='proposal_counters')
+    shard = models.PositiveSmallIntegerField()
+    proposals = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ['offer', 'shard']
+
+    def __str__(self):
+        return f"Proposal counter {self.offer_id}/{self.shard}"
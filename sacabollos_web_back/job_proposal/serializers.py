@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from .models import JobProposal
+
+
+class JobProposalSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading job proposal data
+    """
+    chapista_display_name = serializers.CharField(source='chapista_profile.display_name', read_only=True)
+
+    class Meta:
+        model = JobProposal
+        fields = ['id', 'job', 'chapista_profile', 'chapista_display_name', 'message', 'proposed_price',
+                'proposed_time_hours', 'status', 'created_at', 'updated_at']
+
+
+class JobProposalSubmitSerializer(serializers.Serializer):
+    """
+    Input of a chapista's proposal for an offer
+    """
+    message = serializers.CharField()
+    proposed_price = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0)
+    proposed_time_hours = serializers.IntegerField(min_value=1)
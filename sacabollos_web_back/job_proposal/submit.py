@@ -0,0 +1,135 @@
+"""
+Proposal submission for hot offers
+
+A popular offer can receive hundreds of proposals within seconds. Instead of
+checking for an existing proposal and then inserting (which races) or locking
+the offer row (which serializes every submission), the insert relies on the
+(job, chapista_profile) unique constraint: a duplicate fails with
+IntegrityError inside its savepoint and the existing proposal is returned.
+
+The offer's counters live in SHARDS rows of OfferProposalCounter; each
+submission increments a random shard in the same transaction, so concurrent
+submissions mostly touch different rows and never the JobOffer row. They
+count every proposal the offer received: archiving rejected proposals
+(job_proposal/archive.py) moves rows without touching the counters, and
+rebuild() counts the live and the archived ones.
+"""
+import random
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from job_offer.models import JobOffer
+from .models import ArchivedJobProposal, JobProposal, OfferProposalCounter
+
+
+SHARDS = 16
+
+
+class OfferClosed(Exception):
+    pass
+
+
+def _bump(offer_id, price):
+    shard = random.randrange(SHARDS)
+    counter = OfferProposalCounter.objects.filter(offer_id=offer_id, shard=shard)
+    increments = {'proposals': F('proposals') + 1, 'price_sum': F('price_sum') + price}
+    if not counter.update(**increments):
+        # first hit on this shard; a concurrent first hit may win the insert, then both just update
+        OfferProposalCounter.objects.bulk_create(
+            [OfferProposalCounter(offer_id=offer_id, shard=shard)], ignore_conflicts=True
+        )
+        counter.update(**increments)
+
+
+def submit_proposal(chapista_profile_id, offer_id, message, proposed_price, proposed_time_hours):
+    """
+    Create a chapista's proposal for an open offer, at most once
+
+    Args:
+        chapista_profile_id (int): Proposing chapista
+        offer_id (int): JobOffer id
+
+    Returns:
+        tuple: (JobProposal, created); created is False when the chapista had
+        already proposed, in which case the stored proposal is returned as is
+
+    Raises:
+        OfferClosed: The offer doesn't exist or no longer accepts proposals
+    """
+    # a plain read turns away closed offers before inserting; the re-check below closes the race
+    if not JobOffer.objects.filter(pk=offer_id, status='open').exists():
+        raise OfferClosed(offer_id)
+    try:
+        with transaction.atomic():
+            proposal = JobProposal.objects.create(
+                job_id=offer_id, chapista_profile_id=chapista_profile_id, message=message,
+                proposed_price=proposed_price, proposed_time_hours=proposed_time_hours,
+            )
+            # The insert's foreign key check holds a shared lock on the offer row until commit,
+            # so a status read after it can't be overtaken by expiry or assignment
+            if not JobOffer.objects.filter(pk=offer_id, status='open').exists():
+                raise OfferClosed(offer_id)
+            _bump(offer_id, proposed_price)
+    except IntegrityError:
+        existing = JobProposal.objects.filter(job_id=offer_id, chapista_profile_id=chapista_profile_id).first()
+        if existing is None:
+            raise  # not the unique constraint (e.g. the offer was deleted meanwhile)
+        return existing, False
+    return proposal, True
+
+
+def offer_counters(offer_ids):
+    """
+    Summed proposal counters of several offers
+
+    Returns:
+        dict: offer id -> {'proposals': int, 'average_price': Decimal or None}
+    """
+    rows = (
+        OfferProposalCounter.objects.filter(offer_id__in=offer_ids)
+        .values('offer_id').annotate(proposals=Sum('proposals'), price_sum=Sum('price_sum'))
+    )
+    counters = {offer_id: {'proposals': 0, 'average_price': None} for offer_id in offer_ids}
+    for row in rows:
+        counters[row['offer_id']] = {
+            'proposals': row['proposals'],
+            'average_price': (row['price_sum'] / row['proposals']).quantize(Decimal('0.01')) if row['proposals'] else None,
+        }
+    return counters
+
+
+def rebuild(offer_ids=None):
+    """
+    Recompute the counters from the live and archived proposals into shard 0
+
+    Args:
+        offer_ids (list): Only these offers (default: all)
+
+    Returns:
+        int: Offers written
+    """
+    live = JobProposal.objects.all()
+    # archived proposals of offers that were archived themselves have no counters to restore
+    archived = ArchivedJobProposal.objects.filter(job_id__in=JobOffer.objects.values('pk'))
+    if offer_ids is not None:
+        live = live.filter(job_id__in=offer_ids)
+        archived = archived.filter(job_id__in=offer_ids)
+    totals = {}
+    for proposals in (live, archived):
+        rows = proposals.values('job_id').annotate(count=Count('id'), price_sum=Sum('proposed_price'))
+        for row in rows:
+            count, price_sum = totals.get(row['job_id'], (0, 0))
+            totals[row['job_id']] = (count + row['count'], price_sum + row['price_sum'])
+    with transaction.atomic():
+        stale = OfferProposalCounter.objects.all()
+        if offer_ids is not None:
+            stale = stale.filter(offer_id__in=offer_ids)
+        stale.delete()
+        OfferProposalCounter.objects.bulk_create(
+            [OfferProposalCounter(offer_id=offer_id, shard=0, proposals=count, price_sum=price_sum)
+             for offer_id, (count, price_sum) in totals.items()],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -1,3 +1,131 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from unittest import mock, skipIf
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.testing import QueryPlanAssertionsMixin
+from job_offer.models import JobOffer
+from . import submit
+from .archive import proposal_archive
+from .models import ArchivedJobProposal, JobProposal, OfferProposalCounter
 
-# Create your tests here.
+
+class JobProposalIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_proposals_by_chapista_and_status_use_index(self):
+        self.assertUsesIndex(
+            JobProposal.objects.filter(chapista_profile_id=1, status='pending'), 'job_proposal_chapista_st_idx'
+        )
+
+
+def make_offer(chapistas):
+    company_user = User.objects.create(username='empresa', password='!')
+    company = CompanyProfile.objects.create(user=company_user, company_name='Talleres SL', contact_person='-', address='-')
+    offer = JobOffer.objects.create(company=company, title='Granizo techo', description='-')
+    users = [User.objects.create(username=f'chapista{i}', password='!') for i in range(chapistas)]
+    profiles = [ChapistaProfile.objects.create(user=user, display_name=user.username) for user in users]
+    return offer, users, profiles
+
+
+class ProposalSubmitTests(TestCase):
+    def setUp(self):
+        self.offer, self.users, self.profiles = make_offer(3)
+        self.client = APIClient()
+        self.url = f'/api/proposals/offers/{self.offer.pk}/'
+        self.data = {'message': 'Lo dejo como nuevo', 'proposed_price': '300.00', 'proposed_time_hours': 6}
+
+    def test_resubmitting_returns_the_stored_proposal(self):
+        self.client.force_authenticate(self.users[0])
+        first = self.client.post(self.url, self.data, format='json')
+        again = self.client.post(self.url, {**self.data, 'proposed_price': '10.00'}, format='json')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data['id'], first.data['id'])
+        self.assertEqual(again.data['proposed_price'], '300.00')
+        self.assertEqual(again.data['offer_proposals'], {'proposals': 1, 'average_price': Decimal('300.00')})
+
+    def test_counters_spread_over_shards_without_touching_the_offer(self):
+        updated_at = self.offer.updated_at
+        with mock.patch('random.randrange', side_effect=[0, 1, 1]):
+            for profile, price in zip(self.profiles, ('100', '200', '600')):
+                submit.submit_proposal(profile.pk, self.offer.pk, '-', Decimal(price), 2)
+        self.assertEqual(sorted(OfferProposalCounter.objects.values_list('shard', 'proposals')), [(0, 1), (1, 2)])
+        self.assertEqual(submit.offer_counters([self.offer.pk])[self.offer.pk]['average_price'], Decimal('300.00'))
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.updated_at, updated_at)
+
+        OfferProposalCounter.objects.all().delete()
+        self.assertEqual(submit.rebuild(), 1)
+        self.assertEqual(submit.offer_counters([self.offer.pk])[self.offer.pk]['proposals'], 3)
+
+    def test_closed_offers_and_non_chapistas_are_rejected(self):
+        self.client.force_authenticate(User.objects.get(username='empresa'))
+        self.assertEqual(self.client.post(self.url, self.data, format='json').status_code, 403)
+        JobOffer.objects.update(status='closed')
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.post(self.url, self.data, format='json').status_code, 409)
+
+    def test_offer_closing_during_submission_rolls_back(self):
+        create = JobProposal.objects.create
+
+        def create_after_expiry(**kwargs):
+            # expiry commits between the open check and the insert
+            JobOffer.objects.filter(pk=self.offer.pk).update(status='closed')
+            return create(**kwargs)
+
+        with mock.patch.object(JobProposal.objects, 'create', side_effect=create_after_expiry):
+            with self.assertRaises(submit.OfferClosed):
+                submit.submit_proposal(self.profiles[0].pk, self.offer.pk, '-', Decimal('100'), 2)
+        self.assertFalse(JobProposal.objects.exists())
+        self.assertFalse(OfferProposalCounter.objects.exists())
+
+    def test_counters_and_rebuild_agree_after_archiving(self):
+        for profile, price in zip(self.profiles, ('100', '200', '600')):
+            submit.submit_proposal(profile.pk, self.offer.pk, '-', Decimal(price), 2)
+        JobProposal.objects.filter(chapista_profile=self.profiles[0]).update(
+            status='rejected', created_at=timezone.now() - timezone.timedelta(days=400),
+        )
+        self.assertEqual(proposal_archive.run(180)['moved'], 1)
+        self.assertEqual(ArchivedJobProposal.objects.count(), 1)
+        expected = {'proposals': 3, 'average_price': Decimal('300.00')}
+        self.assertEqual(submit.offer_counters([self.offer.pk])[self.offer.pk], expected)
+        submit.rebuild()
+        self.assertEqual(submit.offer_counters([self.offer.pk])[self.offer.pk], expected)
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite locks whole tables, concurrent writers fail instead of waiting')
+class ProposalSubmitConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+
+    def test_concurrent_submissions_to_one_offer(self):
+        offer, _, profiles = make_offer(40)
+        work = [profile.pk for profile in profiles] * 2  # every chapista submits twice
+        lock = threading.Lock()
+        created = []
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if not work:
+                            return
+                        chapista_id = work.pop()
+                    _, was_created = submit.submit_proposal(chapista_id, offer.pk, '-', Decimal('100'), 1)
+                    with lock:
+                        created.append(was_created)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(created.count(True), len(profiles))
+        self.assertEqual(JobProposal.objects.filter(job=offer).count(), len(profiles))
+        self.assertEqual(submit.offer_counters([offer.pk])[offer.pk]['proposals'], len(profiles))
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'job_proposal'
+
+urlpatterns = [
+    path('offers/<int:offer_id>/', views.submit_proposal, name='proposal_submit'),
+]
@@ -1,3 +1,33 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from users.identity import get_identity
+from users.permissions import IsChapista
+from . import submit
+from .serializers import JobProposalSerializer, JobProposalSubmitSerializer
 
-# Create your views here.
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsChapista])
+def submit_proposal(request, offer_id):
+    """
+    Submit the current chapista's proposal for an open offer
+
+    Submitting again returns the stored proposal with 200 instead of 201.
+    """
+    serializer = JobProposalSubmitSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        proposal, created = submit.submit_proposal(get_identity(request).chapista.pk, offer_id, **serializer.validated_data)
+    except submit.OfferClosed:
+        return Response({
+            'error': 'This offer is not open for proposals'
+        }, status=status.HTTP_409_CONFLICT)
+    data = {
+        **JobProposalSerializer(proposal).data,
+        'offer_proposals': submit.offer_counters([offer_id])[offer_id],
+    }
+    return Response(data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
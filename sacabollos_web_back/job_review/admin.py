@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import JobReview
+
+
+@admin.register(JobReview)
+class JobReviewAdmin(LargeTableAdmin):
+    # job_id: the contract may be archived already
+    list_display = ['id', 'job_id', 'from_user', 'to_user', 'rating', 'created_at']
+    list_select_related = ['from_user', 'to_user']
+    raw_id_fields = ['job', 'from_user', 'to_user']
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JobReviewConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_review'
+
+    def ready(self):
+        from . import feed
+        feed.connect_signals()
@@ -0,0 +1,203 @@
+"""
+Per-user review feed with a precomputed star histogram
+
+UserReviewStats holds one counter per star value for every reviewed user.
+Single review writes adjust it through signals, and bulk submissions adjust
+it explicitly (bulk_create sends no signals), always with F() increments so
+concurrent reviews of the same user don't overwrite each other. Reading a
+profile's review block is then one primary key lookup for the histogram and
+one keyset query for the page of reviews.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from chapista_profile.dashboard import refresh_day
+from core.pagination import decode_cursor, encode_cursor
+from .models import JobReview, UserReviewStats
+
+
+def _star_field(rating):
+    return f'stars_{rating}'
+
+
+def apply_ratings(deltas):
+    """
+    Adjust histograms by rating deltas
+
+    Args:
+        deltas (dict): (to_user_id, rating) -> count to add (negative to remove)
+    """
+    by_user = defaultdict(Counter)
+    for (user_id, rating), delta in deltas.items():
+        if delta:
+            by_user[user_id][_star_field(rating)] += delta
+    if not by_user:
+        return
+    # Only additions create rows: a removal may come from the user's own
+    # cascade delete, after their stats row is already gone
+    new_rows = [user_id for user_id, fields in by_user.items() if any(d > 0 for d in fields.values())]
+    if new_rows:
+        UserReviewStats.objects.bulk_create(
+            [UserReviewStats(user_id=user_id) for user_id in new_rows], ignore_conflicts=True
+        )
+    for user_id, fields in by_user.items():
+        UserReviewStats.objects.filter(user_id=user_id).update(
+            **{name: F(name) + delta for name, delta in fields.items() if delta}
+        )
+
+
+def rebuild(user_ids=None):
+    """
+    Recompute histograms from the reviews table
+
+    Args:
+        user_ids (list): Only these reviewed users (default every user)
+
+    Returns:
+        int: Histogram rows written
+    """
+    reviews = JobReview.objects.all()
+    stats = UserReviewStats.objects.all()
+    if user_ids is not None:
+        reviews = reviews.filter(to_user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+    rows = defaultdict(dict)
+    for user_id, rating, n in reviews.values_list('to_user', 'rating').annotate(n=Count('id')).order_by():
+        rows[user_id][_star_field(rating)] = n
+    with transaction.atomic():
+        stats.delete()
+        UserReviewStats.objects.bulk_create(UserReviewStats(user_id=user_id, **fields) for user_id, fields in rows.items())
+    return len(rows)
+
+
+def empty_histogram():
+    return {str(stars): 0 for stars in range(1, 6)}
+
+
+def summarize(histogram):
+    count = sum(histogram.values())
+    total = sum(int(stars) * n for stars, n in histogram.items())
+    return {'count': count, 'average': round(total / count, 2) if count else None, 'histogram': histogram}
+
+
+def _decode_after(cursor):
+    """
+    Returns:
+        tuple: (created_at, review id) to resume after, or None if the cursor
+        is malformed or its values were tampered with
+    """
+    values = decode_cursor(cursor, 2)
+    if values is None or not isinstance(values[0], str):
+        return None
+    try:
+        created_at = parse_datetime(values[0])
+        review_id = int(values[1])
+    except (ValueError, TypeError):
+        return None
+    if created_at is None or timezone.is_naive(created_at):
+        return None
+    return created_at, review_id
+
+
+def review_feed(user_id, cursor=None, limit=20):
+    """
+    Histogram and newest-first page of the reviews a user received
+
+    Args:
+        user_id (int): Reviewed user
+        cursor (str): 'next' value of the previous page
+        limit (int): Page size
+
+    Returns:
+        dict: count, average, histogram, reviews (JobReview list with
+        from_user loaded) and next (cursor or None)
+    """
+    stats = UserReviewStats.objects.filter(user_id=user_id).first()
+    summary = summarize(stats.histogram() if stats else empty_histogram())
+
+    reviews = (
+        JobReview.objects.filter(to_user_id=user_id)
+        .select_related('from_user').order_by('-created_at', '-id')
+    )
+    after = _decode_after(cursor) if cursor else None
+    if after is not None:
+        created_at, review_id = after
+        reviews = reviews.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=review_id))
+    page = list(reviews[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    return {
+        **summary,
+        'reviews': page,
+        'next': encode_cursor(page[-1].created_at.isoformat(), page[-1].pk) if has_more else None,
+    }
+
+
+def submit_contract_reviews(contract, reviews):
+    """
+    Store one or both sides' reviews of a contract in one transaction
+
+    Args:
+        contract (JobContract): With company__user and chapista_profile__user loaded
+        reviews (list): Dicts with from_user (a party of the contract), rating and comment
+
+    Returns:
+        list: Created JobReview objects
+
+    Raises:
+        IntegrityError: A side already reviewed this contract
+    """
+    company_user_id = contract.company.user_id
+    chapista_user_id = contract.chapista_profile.user_id
+    other_party = {company_user_id: chapista_user_id, chapista_user_id: company_user_id}
+    objs = [
+        JobReview(job=contract, from_user_id=review['from_user'], to_user_id=other_party[review['from_user']],
+                  rating=review['rating'], comment=review['comment'])
+        for review in reviews
+    ]
+    with transaction.atomic():
+        JobReview.objects.bulk_create(objs)
+        # MySQL doesn't return the ids of bulk inserted rows; (job, from_user) is unique per contract
+        created = list(
+            JobReview.objects.filter(job=contract, from_user_id__in=[review.from_user_id for review in objs])
+            .select_related('from_user').order_by('id')
+        )
+        apply_ratings(Counter((review.to_user_id, review.rating) for review in created))
+        if any(review.to_user_id == chapista_user_id for review in created):
+            day = timezone.localdate(created[0].created_at)
+            transaction.on_commit(lambda: refresh_day(contract.chapista_profile_id, day))
+    return created
+
+
+def _review_pre_save(sender, instance, **kwargs):
+    instance._stats_previous = None
+    if instance.pk is not None:
+        instance._stats_previous = (
+            JobReview.objects.filter(pk=instance.pk).values_list('to_user_id', 'rating').first()
+        )
+
+
+def _review_saved(sender, instance, created, **kwargs):
+    deltas = Counter({(instance.to_user_id, instance.rating): 1})
+    previous = getattr(instance, '_stats_previous', None)
+    if not created and previous is not None:
+        deltas[previous] -= 1
+    apply_ratings(deltas)
+
+
+def _review_deleted(sender, instance, **kwargs):
+    apply_ratings({(instance.to_user_id, instance.rating): -1})
+
+
+def connect_signals():
+    """
+    Keep histograms in sync with single review writes
+    """
+    pre_save.connect(_review_pre_save, sender=JobReview, dispatch_uid='review-stats-pre-save')
+    post_save.connect(_review_saved, sender=JobReview, dispatch_uid='review-stats-save')
+    post_delete.connect(_review_deleted, sender=JobReview, dispatch_uid='review-stats-delete')
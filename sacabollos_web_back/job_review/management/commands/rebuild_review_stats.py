@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from job_review.feed import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the UserReviewStats star histograms from the reviews table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='Only these reviewed users (default: all)')
+
+    def handle(self, *args, **options):
+        written = rebuild(options['user_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} histogram rows'))
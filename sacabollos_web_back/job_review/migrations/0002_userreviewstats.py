@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('job_review', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReviewStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('stars_1', models.IntegerField(default=0)),
+                ('stars_2', models.IntegerField(default=0)),
+                ('stars_3', models.IntegerField(default=0)),
+                ('stars_4', models.IntegerField(default=0)),
+                ('stars_5', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='jobreview',
+            index=models.Index(fields=['to_user', '-created_at', '-id'], name='job_review_to_user_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_contract', '0003_archivedjobcontract'),
+        ('job_review', '0002_userreviewstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobreview',
+            name='job',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='job_contract.jobcontract'),
+        ),
+    ]
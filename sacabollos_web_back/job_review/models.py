@@ -5,7 +5,9 @@ from django.db import models
 from django.contrib.auth.models import User
 
 class JobReview(models.Model):
-    job = models.ForeignKey('job_contract.JobContract', on_delete=models.CASCADE)
+    # No database constraint: the contract may move to ArchivedJobContract (job_contract/archive.py)
+    # while its reviews stay here, so job_id can point at either table
+    job = models.ForeignKey('job_contract.JobContract', on_delete=models.DO_NOTHING, db_constraint=False)
     from_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews_given')
     to_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews_received')
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])  # 1-5 stars
@@ -14,6 +16,28 @@ class JobReview(models.Model):
 
     class Meta:
         unique_together = ['job', 'from_user', 'to_user']
+        indexes = [
+            models.Index(fields=['to_user', '-created_at', '-id'], name='job_review_to_user_feed_idx'),
+        ]
 
     def __str__(self):
-        return f"Review: {self.rating}★ from {self.from_user.username} to {self.to_user.username}"
\ No newline at end of file
+        return f"Review: {self.rating}★ from {self.from_user.username} to {self.to_user.username}"
+
+
+class UserReviewStats(models.Model):
+    """
+    Star histogram of the reviews a user received, kept up to date by
+    job_review/feed.py
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='review_stats')
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+
+    def histogram(self):
+        return {str(stars): getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+
+    def __str__(self):
+        return f"Review stats {self.user_id}"
@@ -0,0 +1,42 @@
+from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+from users.identity import get_identity
+from .models import JobReview
+
+
+class JobReviewSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading reviews in a user's feed
+    """
+    from_username = serializers.CharField(source='from_user.username', read_only=True)
+
+    class Meta:
+        model = JobReview
+        fields = ['id', 'job', 'from_user', 'from_username', 'to_user', 'rating', 'comment', 'created_at']
+
+
+class ContractReviewSerializer(serializers.Serializer):
+    """
+    One side's review of a contract; the reviewed user is the other party
+    """
+    from_user = serializers.IntegerField()
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    comment = serializers.CharField(allow_blank=True)
+
+
+class ContractReviewsSerializer(serializers.Serializer):
+    """
+    Reviews of one contract, at most one per side
+
+    Admins may submit either side; anyone else only their own review, which
+    needs the request in the serializer context.
+    """
+    reviews = ContractReviewSerializer(many=True, allow_empty=False)
+
+    def validate_reviews(self, reviews):
+        if len({review['from_user'] for review in reviews}) != len(reviews):
+            raise serializers.ValidationError('Each side can only submit one review')
+        identity = get_identity(self.context['request'])
+        if not identity.is_admin and any(review['from_user'] != identity.user.pk for review in reviews):
+            raise PermissionDenied('You can only submit your own review')
+        return reviews
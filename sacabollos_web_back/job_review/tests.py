@@ -1,3 +1,121 @@
+from decimal import Decimal
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.pagination import encode_cursor
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from .feed import rebuild, review_feed
+from .models import JobReview, UserReviewStats
 
-# Create your tests here.
+
+class ReviewFeedTests(TestCase):
+    def setUp(self):
+        self.company_user = User.objects.create_user('empresa', 'empresa@example.com', 'pass')
+        self.chapista_user = User.objects.create_user('chapista', 'chapista@example.com', 'pass')
+        company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Flota SL', contact_person='Marta', address='Calle 4'
+        )
+        chapista = ChapistaProfile.objects.create(user=self.chapista_user, display_name='Chapista')
+        self.contracts = []
+        for i in range(4):
+            offer = JobOffer.objects.create(company=company, title=f'Trabajo {i}', description='-')
+            self.contracts.append(JobContract.objects.create(
+                job=offer, chapista_profile=chapista, company=company,
+                agreed_price=Decimal('100'), agreed_time_hours=2, status='finished',
+            ))
+        self.client = APIClient()
+
+    def review(self, contract, rating):
+        return JobReview.objects.create(
+            job=contract, from_user=self.company_user, to_user=self.chapista_user, rating=rating, comment='-'
+        )
+
+    def histogram(self, user):
+        return UserReviewStats.objects.get(user=user).histogram()
+
+    def test_histogram_follows_single_writes(self):
+        for contract, rating in zip(self.contracts, [5, 5, 4, 1]):
+            self.review(contract, rating)
+        review = JobReview.objects.get(job=self.contracts[3])
+        review.rating = 3
+        review.save()
+        JobReview.objects.get(job=self.contracts[2]).delete()
+        self.assertEqual(self.histogram(self.chapista_user), {'1': 0, '2': 0, '3': 1, '4': 0, '5': 2})
+        rebuild()
+        self.assertEqual(self.histogram(self.chapista_user), {'1': 0, '2': 0, '3': 1, '4': 0, '5': 2})
+
+    def test_feed_pages_with_keyset_in_two_queries(self):
+        for contract, rating in zip(self.contracts, [5, 4, 3, 2]):
+            self.review(contract, rating)
+        with self.assertNumQueries(2):
+            first = review_feed(self.chapista_user.pk, limit=3)
+            usernames = [review.from_user.username for review in first['reviews']]
+        self.assertEqual(usernames, ['empresa'] * 3)
+        self.assertEqual((first['count'], first['average']), (4, 3.5))
+        second = review_feed(self.chapista_user.pk, cursor=first['next'], limit=3)
+        seen = [r.pk for r in first['reviews'] + second['reviews']]
+        self.assertEqual(seen, list(JobReview.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+        self.assertIsNone(second['next'])
+
+    def test_bad_cursor_restarts_from_the_first_page(self):
+        for contract, rating in zip(self.contracts, [5, 4, 3, 2]):
+            self.review(contract, rating)
+        first = [r.pk for r in review_feed(self.chapista_user.pk, limit=3)['reviews']]
+        for cursor in (
+            'not a cursor',
+            encode_cursor('2026-01-01T00:00:00+00:00', 'x'),
+            encode_cursor('2026-13-45T00:00:00+00:00', 1),
+            encode_cursor('2026-01-01T00:00:00', 1),
+            encode_cursor('ayer', 1),
+            encode_cursor(1, 2),
+            encode_cursor('2026-01-01T00:00:00+00:00', None),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([r.pk for r in review_feed(self.chapista_user.pk, cursor, limit=3)['reviews']], first)
+        response = self.client.get(
+            f'/api/reviews/users/{self.chapista_user.pk}/', {'cursor': encode_cursor('2026-13-45T00:00:00', 'x')}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_submit_both_sides(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.client.force_authenticate(admin)
+        url = f'/api/reviews/contracts/{self.contracts[0].pk}/'
+        payload = {'reviews': [
+            {'from_user': self.company_user.pk, 'rating': 5, 'comment': 'Impecable'},
+            {'from_user': self.chapista_user.pk, 'rating': 4, 'comment': 'Buen cliente'},
+        ]}
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [review['id'] for review in response.data],
+            list(JobReview.objects.order_by('id').values_list('pk', flat=True)),
+        )
+        self.assertEqual(response.data[0]['from_username'], 'empresa')
+        self.assertEqual(self.histogram(self.chapista_user)['5'], 1)
+        self.assertEqual(self.histogram(self.company_user)['4'], 1)
+
+        # All or nothing: a duplicate side rolls back the whole submission
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(JobReview.objects.count(), 2)
+        self.assertEqual(self.histogram(self.chapista_user)['5'], 1)
+
+    def test_party_can_only_submit_own_side(self):
+        self.client.force_authenticate(self.company_user)
+        response = self.client.post(f'/api/reviews/contracts/{self.contracts[0].pk}/', {'reviews': [
+            {'from_user': self.chapista_user.pk, 'rating': 1, 'comment': '-'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_only_finished_contracts_can_be_reviewed(self):
+        self.client.force_authenticate(self.company_user)
+        payload = {'reviews': [{'from_user': self.company_user.pk, 'rating': 5, 'comment': '-'}]}
+        for contract, contract_status in zip(self.contracts, ['in_progress', 'cancelled']):
+            JobContract.objects.filter(pk=contract.pk).update(status=contract_status)
+            response = self.client.post(f'/api/reviews/contracts/{contract.pk}/', payload, format='json')
+            self.assertEqual(response.status_code, 409)
+        self.assertFalse(JobReview.objects.exists())
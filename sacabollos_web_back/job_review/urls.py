@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'job_review'
+
+urlpatterns = [
+    path('users/<int:user_id>/', views.user_review_feed, name='user_review_feed'),
+    path('contracts/<int:contract_id>/', views.submit_contract_reviews_view, name='contract_reviews'),
+]
@@ -1,3 +1,61 @@
-from django.shortcuts import render
+from django.db import IntegrityError
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from job_contract.models import JobContract
+from .feed import review_feed, submit_contract_reviews
+from .serializers import ContractReviewsSerializer, JobReviewSerializer
 
-# Create your views here.
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def user_review_feed(request, user_id):
+    """
+    Get the star histogram and newest reviews a user received (?cursor=&limit=)
+    """
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+    feed = review_feed(user_id, request.query_params.get('cursor'), limit)
+    feed['reviews'] = JobReviewSerializer(feed['reviews'], many=True).data
+    return Response(feed)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_contract_reviews_view(request, contract_id):
+    """
+    Submit one or both sides' reviews of a contract in one transaction
+
+    Only finished contracts can be reviewed. Admins may submit either side; a
+    party may only submit its own review.
+    """
+    contract = get_object_or_404(
+        JobContract.objects.select_related('company', 'chapista_profile'), pk=contract_id
+    )
+    if contract.status != 'finished':
+        return Response({
+            'error': 'Only finished contracts can be reviewed'
+        }, status=status.HTTP_409_CONFLICT)
+    serializer = ContractReviewsSerializer(data=request.data, context={'request': request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    reviews = serializer.validated_data['reviews']
+    parties = {contract.company.user_id, contract.chapista_profile.user_id}
+    for review in reviews:
+        if review['from_user'] not in parties:
+            return Response({
+                'error': f"User {review['from_user']} is not a party of this contract"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        created = submit_contract_reviews(contract, reviews)
+    except IntegrityError:
+        return Response({
+            'error': 'This contract was already reviewed by one of these users'
+        }, status=status.HTTP_409_CONFLICT)
+    return Response(JobReviewSerializer(created, many=True).data, status=status.HTTP_201_CREATED)
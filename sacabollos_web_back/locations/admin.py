@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Location
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['city', 'province', 'country', 'postal_code']
+    # also backs the location autocomplete widgets of the other admins
+    search_fields = ['^city', '^province', '=postal_code']
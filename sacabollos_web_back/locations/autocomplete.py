@@ -0,0 +1,239 @@
+"""
+Process-local prefix index for location autocomplete
+
+Locations are kept sorted by accent-folded city name, so a prefix lookup is
+a bisect plus a top-N pick by usage (how many chapistas and job offers
+reference the location). The index is built lazily on first use,
+updated incrementally by Location/ChapistaProfile/JobOffer signals in this
+process, and fully rebuilt every REBUILD_INTERVAL seconds to pick up writes
+made by other processes. Only the first build runs on a request thread; a
+stale index starts one background rebuild and keeps serving the old
+snapshot until the new one is swapped in.
+"""
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+
+def fold(text):
+    """
+    Lowercase and strip accents ("Málaga" -> "malaga")
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+def _setting(name, default):
+    return getattr(settings, 'LOCATION_AUTOCOMPLETE', {}).get(name, default)
+
+
+class LocationIndex:
+    """
+    Sorted prefix index over Location rows
+
+    Two sorted lists are kept: by folded city (for prefix ranges) and by
+    usage (for prefixes matching most of the table). A search scans whichever
+    is expected to be shorter, so it stays around sqrt(limit * rows) steps.
+    Writers copy the lists, so readers never need the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # held by whoever is (re)building
+        self._keys = []        # sorted (folded_city, location_id)
+        self._ranked = []      # sorted (-usage, folded_city, location_id)
+        self._locations = {}   # location_id -> serialized location
+        self._usage = Counter()
+        self._built_at = None
+
+    def build(self):
+        """
+        (Re)load every location and its usage counts from the database
+        """
+        Location = apps.get_model('locations', 'Location')
+        usage = Counter()
+        for model in ('chapista_profile.ChapistaProfile', 'job_offer.JobOffer'):
+            rows = (
+                apps.get_model(model).objects.filter(location__isnull=False)
+                .values('location').annotate(n=Count('id')).values_list('location', 'n')
+            )
+            usage.update(dict(rows))
+
+        locations = {}
+        for row in Location.objects.values('id', 'city', 'province', 'country', 'postal_code'):
+            row['folded'] = fold(row['city'])
+            locations[row['id']] = row
+        keys = sorted((row['folded'], pk) for pk, row in locations.items())
+        ranked = sorted((-usage[pk], row['folded'], pk) for pk, row in locations.items())
+
+        with self._lock:
+            self._keys = keys
+            self._ranked = ranked
+            self._locations = locations
+            self._usage = usage
+            self._built_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        finally:
+            self._build_lock.release()
+            connection.close()
+
+    def _ensure_fresh(self):
+        if self._built_at is None:
+            # Nothing to serve yet: concurrent first searches wait for a single build
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+            return
+        interval = _setting('REBUILD_INTERVAL', 600)
+        if time.monotonic() - self._built_at > interval and self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild, name='location-index-rebuild', daemon=True).start()
+
+    @staticmethod
+    def _discard(items, item):
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    def _replace(self, location_id, row):
+        # Copy on write so concurrent searches never see a half-updated list
+        keys, ranked = list(self._keys), list(self._ranked)
+        usage = self._usage[location_id]
+        old = self._locations.get(location_id)
+        if old is not None:
+            self._discard(keys, (old['folded'], location_id))
+            self._discard(ranked, (-usage, old['folded'], location_id))
+        if row is not None:
+            bisect.insort(keys, (row['folded'], location_id))
+            bisect.insort(ranked, (-usage, row['folded'], location_id))
+            self._locations[location_id] = row
+        else:
+            self._locations.pop(location_id, None)
+        self._keys, self._ranked = keys, ranked
+
+    def upsert(self, location):
+        """
+        Add or refresh a single location
+        """
+        if self._built_at is None:
+            return
+        row = {
+            'id': location.pk,
+            'city': location.city,
+            'province': location.province,
+            'country': location.country,
+            'postal_code': location.postal_code,
+            'folded': fold(location.city),
+        }
+        with self._lock:
+            self._replace(location.pk, row)
+
+    def remove(self, location_id):
+        """
+        Drop a single location
+        """
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._replace(location_id, None)
+            self._usage.pop(location_id, None)
+
+    def add_usage(self, location_id, delta=1):
+        """
+        Adjust the usage count of a location
+        """
+        if self._built_at is None or location_id is None:
+            return
+        with self._lock:
+            row = self._locations.get(location_id)
+            self._replace(location_id, None)
+            self._usage[location_id] += delta
+            if row is not None:
+                self._replace(location_id, row)
+
+    def search(self, query, limit=10):
+        """
+        Find locations whose city starts with query, most used first
+
+        Args:
+            query (str): Prefix typed by the user (accents/case ignored)
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Location dicts (id, city, province, country, postal_code)
+        """
+        self._ensure_fresh()
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        keys, ranked, locations, usage = self._keys, self._ranked, self._locations, self._usage
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + '\uffff',), start)
+        matches = end - start
+        if not matches:
+            return []
+
+        if matches * matches <= limit * len(keys):
+            # Narrow prefix: rank the matching range
+            get_usage = usage.get
+            candidates = [(-get_usage(key[1], 0), key) for key in keys[start:end]]
+            ids = [key[1] for _, key in heapq.nsmallest(limit, candidates)]
+        else:
+            # Wide prefix: walk the usage ranking until enough rows match
+            ids = []
+            for _, folded, location_id in ranked:
+                if folded.startswith(prefix):
+                    ids.append(location_id)
+                    if len(ids) == limit:
+                        break
+
+        return [
+            {k: v for k, v in locations[location_id].items() if k != 'folded'}
+            for location_id in ids
+            if location_id in locations
+        ]
+
+
+location_index = LocationIndex()
+
+
+def _location_saved(sender, instance, **kwargs):
+    location_index.upsert(instance)
+
+
+def _location_deleted(sender, instance, **kwargs):
+    location_index.remove(instance.pk)
+
+
+def _reference_saved(sender, instance, created, **kwargs):
+    if created:
+        location_index.add_usage(instance.location_id)
+
+
+def _reference_deleted(sender, instance, **kwargs):
+    location_index.add_usage(instance.location_id, -1)
+
+
+def connect_signals():
+    """
+    Keep the index in sync with Location writes and usage changes
+    """
+    Location = apps.get_model('locations', 'Location')
+    post_save.connect(_location_saved, sender=Location, dispatch_uid='autocomplete-location-save')
+    post_delete.connect(_location_deleted, sender=Location, dispatch_uid='autocomplete-location-delete')
+    for label in ('chapista_profile.ChapistaProfile', 'job_offer.JobOffer'):
+        model = apps.get_model(label)
+        post_save.connect(_reference_saved, sender=model, dispatch_uid=f'autocomplete-save-{label}')
+        post_delete.connect(_reference_deleted, sender=model, dispatch_uid=f'autocomplete-delete-{label}')
@@ -0,0 +1,124 @@
+"""
+Compact in-memory gazetteer for resolving Location coordinates
+
+Reads a GeoNames postal code dump (tab separated: country code, postal code,
+place name, admin1 name, admin1 code, admin2 name, admin2 code, admin3 name,
+admin3 code, latitude, longitude, accuracy), e.g. ES.txt from
+https://download.geonames.org/export/zip/. Coordinates live in two float
+arrays and lookups go through dicts of folded keys -> row index, which keeps
+a full country in a few MB. Every key starts with the row's country code, so
+a file with several countries never answers with another country's place.
+"""
+import csv
+from array import array
+
+from .autocomplete import fold
+
+
+# Folded Location.country values -> ISO code used by GeoNames
+COUNTRY_CODES = {
+    'spain': 'ES', 'espana': 'ES',
+    'portugal': 'PT',
+    'france': 'FR', 'francia': 'FR',
+    'andorra': 'AD',
+    'italy': 'IT', 'italia': 'IT',
+    'germany': 'DE', 'alemania': 'DE',
+    'united kingdom': 'GB', 'reino unido': 'GB',
+    'morocco': 'MA', 'marruecos': 'MA',
+}
+
+
+def country_code(country):
+    """
+    ISO code of a Location.country value ("España" -> "ES"), None if unknown
+    """
+    folded = fold(country or '')
+    if len(folded) == 2 and folded.isalpha():
+        return folded.upper()
+    return COUNTRY_CODES.get(folded)
+
+
+class Gazetteer:
+    """
+    Resolve (postal_code, city, province, country) to (lat, lng)
+    """
+
+    def __init__(self):
+        self.lat = array('d')
+        self.lng = array('d')
+        self.countries = set()
+        self._by_postal_city = {}
+        self._by_postal = {}
+        self._by_city_province = {}
+        self._by_city = {}
+
+    def __len__(self):
+        return len(self.lat)
+
+    @classmethod
+    def load(cls, path, country_code=None):
+        """
+        Load a GeoNames postal code file
+
+        Args:
+            path (str): Path to the tab separated gazetteer file
+            country_code (str): Only keep rows for this ISO country code
+
+        Returns:
+            Gazetteer: Loaded gazetteer
+        """
+        gazetteer = cls()
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                if len(row) < 11 or (country_code and row[0] != country_code):
+                    continue
+                try:
+                    lat, lng = float(row[9]), float(row[10])
+                except ValueError:
+                    continue
+                gazetteer._add(row[0], row[1], row[2], row[3], row[5], lat, lng)
+        return gazetteer
+
+    def _add(self, country, postal_code, city, admin1, admin2, lat, lng):
+        index = len(self.lat)
+        self.lat.append(lat)
+        self.lng.append(lng)
+        self.countries.add(country)
+        postal_code, city = postal_code.strip(), fold(city)
+        # First row wins, GeoNames lists the main place of a postal code first
+        self._by_postal_city.setdefault((country, postal_code, city), index)
+        self._by_postal.setdefault((country, postal_code), index)
+        for province in {fold(admin1), fold(admin2)}:
+            self._by_city_province.setdefault((country, city, province), index)
+        self._by_city.setdefault((country, city), index)
+
+    def resolve(self, postal_code, city, province, country=None):
+        """
+        Find coordinates, from the most to the least specific key
+
+        Args:
+            country (str): Location.country; may be omitted when the
+                gazetteer holds a single country
+
+        Returns:
+            tuple or None: (lat, lng)
+        """
+        code = country_code(country)
+        if code is None and len(self.countries) == 1:
+            code = next(iter(self.countries))
+        if code is None:
+            return None
+        postal_code = (postal_code or '').strip()
+        city, province = fold(city or ''), fold(province or '')
+        index = None
+        if postal_code:
+            index = self._by_postal_city.get((code, postal_code, city))
+        if index is None and city:
+            index = self._by_city_province.get((code, city, province))
+        if index is None and postal_code:
+            index = self._by_postal.get((code, postal_code))
+        if index is None and city:
+            index = self._by_city.get((code, city))
+        if index is None:
+            return None
+        return self.lat[index], self.lng[index]
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import invalidate
+from locations.gazetteer import Gazetteer
+from locations.models import Location
+
+
+LAT_QUANT = Decimal('0.00000001')
+
+
+class Command(BaseCommand):
+    help = 'Fill missing Location lat/lng from a local GeoNames postal code gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('gazetteer', help='Path to a GeoNames postal code file (e.g. ES.txt)')
+        parser.add_argument('--country-code', help='Only load gazetteer rows for this ISO code (e.g. ES)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--cache', default=os.path.join(settings.BASE_DIR, '.geocode_cache.json'),
+            help='Persistent cache of lookups that found no coordinates',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Resolve but do not write')
+
+    def _load_cache(self, path, fingerprint):
+        try:
+            with open(path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        # A different gazetteer file may resolve previous misses
+        if cache.get('gazetteer') != fingerprint:
+            return set()
+        return {tuple(key) for key in cache.get('misses', [])}
+
+    def _save_cache(self, path, fingerprint, misses):
+        with open(path, 'w') as f:
+            json.dump({'gazetteer': fingerprint, 'misses': sorted(misses)}, f)
+
+    def handle(self, *args, **options):
+        path = options['gazetteer']
+        if not os.path.exists(path):
+            raise CommandError(f"Gazetteer file '{path}' not found")
+        stat = os.stat(path)
+        fingerprint = f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}:{options['country_code']}"
+        misses = self._load_cache(options['cache'], fingerprint)
+
+        pending = Location.objects.filter(lat__isnull=True).order_by('id')
+        todo = [
+            row for row in pending.values_list('id', 'postal_code', 'city', 'province', 'country')
+            if (row[1] or '', row[2], row[3], row[4]) not in misses
+        ]
+        if not todo:
+            self.stdout.write(self.style.SUCCESS('Nothing to geocode'))
+            return
+
+        start = time.perf_counter()
+        gazetteer = Gazetteer.load(path, options['country_code'])
+        self.stdout.write(f'Loaded {len(gazetteer)} gazetteer rows in {time.perf_counter() - start:.2f}s')
+
+        start = time.perf_counter()
+        resolved = 0
+        batch_size = options['batch_size']
+        for offset in range(0, len(todo), batch_size):
+            updates = []
+            for pk, postal_code, city, province, country in todo[offset:offset + batch_size]:
+                coords = gazetteer.resolve(postal_code, city, province, country)
+                if coords is None:
+                    misses.add((postal_code or '', city, province, country))
+                    continue
+                updates.append(Location(
+                    pk=pk,
+                    lat=Decimal(coords[0]).quantize(LAT_QUANT),
+                    lng=Decimal(coords[1]).quantize(LAT_QUANT),
+                ))
+            if updates and not options['dry_run']:
+                Location.objects.bulk_update(updates, ['lat', 'lng'])
+            resolved += len(updates)
+
+        elapsed = time.perf_counter() - start
+        if not options['dry_run']:
+            self._save_cache(options['cache'], fingerprint, misses)
+            if resolved:
+                # bulk_update skips post_save, so drop cached location responses once
+                invalidate('locations')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Resolved {resolved}/{len(todo)} locations in {elapsed:.2f}s '
+            f'({len(todo) / elapsed if elapsed else 0:,.0f} rows/s), {len(todo) - resolved} unresolved'
+        ))
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import Location
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading location data
+    """
+    class Meta:
+        model = Location
+        fields = ['id', 'city', 'province', 'country', 'postal_code', 'lat', 'lng']
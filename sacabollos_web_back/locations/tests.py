@@ -1,3 +1,129 @@
+import os
+import tempfile
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
+from chapista_profile.models import ChapistaProfile
+from .autocomplete import LocationIndex, fold, location_index
+from .gazetteer import Gazetteer
+from .models import Location
 
-# Create your tests here.
+
+class LocationAutocompleteTests(TestCase):
+    def setUp(self):
+        for city, province in [('Málaga', 'Málaga'), ('Madrid', 'Madrid'), ('Majadahonda', 'Madrid'),
+                               ('Ávila', 'Ávila'), ('Sevilla', 'Sevilla')]:
+            Location.objects.create(city=city, province=province)
+        madrid = Location.objects.get(city='Madrid')
+        for i in range(2):
+            ChapistaProfile.objects.create(
+                user=User.objects.create(username=f'chapista{i}', password='!'), display_name='-', location=madrid,
+            )
+        self.index = LocationIndex()
+
+    def cities(self, query, limit=10, index=None):
+        return [row['city'] for row in (index or self.index).search(query, limit)]
+
+    def test_prefix_search_ranks_by_usage(self):
+        self.assertEqual(self.cities('ma')[0], 'Madrid')
+        self.assertEqual(sorted(self.cities('ma')), ['Madrid', 'Majadahonda', 'Málaga'])
+        self.assertEqual(self.cities('ma', limit=1), ['Madrid'])
+        self.assertEqual(self.cities('maj'), ['Majadahonda'])
+        self.assertEqual(self.cities('x'), [])
+        self.assertEqual(self.cities('  '), [])
+
+    def test_accents_and_case_are_folded(self):
+        self.assertEqual(fold(' Ávila '), 'avila')
+        self.assertEqual(self.cities('AVI'), ['Ávila'])
+        self.assertEqual(self.cities('mála'), ['Málaga'])
+
+    def test_signals_upsert_and_remove(self):
+        location_index.build()
+        location = Location.objects.create(city='Marbella', province='Málaga')
+        self.assertEqual(self.cities('marb', index=location_index), ['Marbella'])
+        location.city = 'Mijas'
+        location.save()
+        self.assertEqual(self.cities('marb', index=location_index), [])
+        self.assertEqual(self.cities('mij', index=location_index), ['Mijas'])
+        location.delete()
+        self.assertEqual(self.cities('mij', index=location_index), [])
+
+    def test_stale_index_is_rebuilt_in_the_background(self):
+        self.assertEqual(self.cities('sev'), ['Sevilla'])
+        Location.objects.create(city='Segovia', province='Segovia')
+        self.index._built_at = time.monotonic() - 3600
+        with mock.patch('locations.autocomplete.threading.Thread') as thread:
+            # the old snapshot is served while one rebuild is pending
+            self.assertEqual(self.cities('se'), ['Sevilla'])
+            self.assertEqual(self.cities('se'), ['Sevilla'])
+        thread.assert_called_once()
+        with mock.patch('locations.autocomplete.connection'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual(sorted(self.cities('se')), ['Segovia', 'Sevilla'])
+
+
+GAZETTEER_ROWS = [
+    # country, postal code, place, admin1, admin1 code, admin2, admin2 code, admin3, admin3 code, lat, lng, accuracy
+    ['ES', '28001', 'Madrid', 'Comunidad de Madrid', 'MD', 'Madrid', 'M', '', '', '40.4250', '-3.6840', '4'],
+    ['ES', '29001', 'Málaga', 'Andalucía', 'AN', 'Málaga', 'MA', '', '', '36.7196', '-4.4200', '4'],
+    ['ES', '41001', 'Sevilla', 'Andalucía', 'AN', 'Sevilla', 'SE', '', '', '37.3891', '-5.9845', '4'],
+    ['PT', '1000-001', 'Lisboa', 'Lisboa', '11', 'Lisboa', '1106', '', '', '38.7223', '-9.1393', '4'],
+    ['PT', '29001', 'Tavira', 'Faro', '08', 'Tavira', '0814', '', '', '37.1270', '-7.6500', '4'],
+    ['CO', '050001', 'Medellín', 'Antioquia', '02', 'Medellín', '001', '', '', '6.2442', '-75.5812', '4'],
+    ['US', '91101', 'Madrid', 'New Mexico', 'NM', 'Santa Fe', '049', '', '', '35.4070', '-106.1530', '4'],
+]
+
+
+class GazetteerTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'allCountries.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(''.join('\t'.join(row) + '\n' for row in GAZETTEER_ROWS))
+        self.cache = os.path.join(tmp.name, 'geocode_cache.json')
+
+    def test_resolve_from_most_to_least_specific_key(self):
+        gazetteer = Gazetteer.load(self.path)
+        self.assertEqual(len(gazetteer), len(GAZETTEER_ROWS))
+        self.assertEqual(gazetteer.resolve('29001', 'malaga', 'Malaga', 'Spain'), (36.7196, -4.42))
+        self.assertEqual(gazetteer.resolve(None, 'Sevilla', 'Andalucia', 'España'), (37.3891, -5.9845))
+        self.assertEqual(gazetteer.resolve('41001', 'Triana', '', 'ES'), (37.3891, -5.9845))
+        self.assertIsNone(gazetteer.resolve('99999', 'Atlantis', '', 'Spain'))
+
+    def test_fallbacks_stay_within_the_country(self):
+        gazetteer = Gazetteer.load(self.path)
+        self.assertEqual(gazetteer.resolve(None, 'Madrid', 'Madrid', 'Spain'), (40.425, -3.684))
+        self.assertEqual(gazetteer.resolve(None, 'Madrid', '', 'US'), (35.407, -106.153))
+        # postal code only: 29001 exists in Spain and Portugal
+        self.assertEqual(gazetteer.resolve('29001', 'Aldea', '', 'Portugal'), (37.127, -7.65))
+        self.assertIsNone(gazetteer.resolve(None, 'Lisboa', '', 'Spain'))
+        # unknown country with several loaded: no guess
+        self.assertIsNone(gazetteer.resolve(None, 'Sevilla', '', 'Narnia'))
+        spain = Gazetteer.load(self.path, 'ES')
+        self.assertEqual(spain.resolve(None, 'Sevilla', '', 'Narnia'), (37.3891, -5.9845))
+
+    def test_command_fills_missing_coordinates(self):
+        sevilla = Location.objects.create(city='Sevilla', province='Sevilla', postal_code='41001')
+        lisboa = Location.objects.create(city='Lisboa', province='Lisboa', country='Portugal')
+        lost = Location.objects.create(city='Lisboa', province='Lisboa')
+        kept = Location.objects.create(city='Málaga', province='Málaga', lat=Decimal('1'), lng=Decimal('2'))
+
+        out = StringIO()
+        call_command('geocode_locations', self.path, '--cache', self.cache, stdout=out)
+        self.assertIn('Resolved 2/3', out.getvalue())
+        for location in (sevilla, lisboa, lost, kept):
+            location.refresh_from_db()
+        self.assertEqual((sevilla.lat, sevilla.lng), (Decimal('37.38910000'), Decimal('-5.98450000')))
+        self.assertEqual(lisboa.lat, Decimal('38.72230000'))
+        self.assertIsNone(lost.lat)
+        self.assertEqual(kept.lat, Decimal('1'))
+
+        # the miss is cached for this gazetteer file
+        out = StringIO()
+        call_command('geocode_locations', self.path, '--cache', self.cache, stdout=out)
+        self.assertIn('Nothing to geocode', out.getvalue())
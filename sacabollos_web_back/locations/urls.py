@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'locations'
+
+urlpatterns = [
+    path('', views.LocationListView.as_view(), name='location_list'),
+    path('autocomplete/', views.autocomplete_locations, name='location_autocomplete'),
+]
@@ -1,3 +1,41 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from rest_framework import generics
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from core.cache import cache_response
+from .autocomplete import location_index
+from .models import Location
+from .serializers import LocationSerializer
 
-# Create your views here.
+
+@method_decorator(cache_response('locations'), name='dispatch')
+class LocationListView(generics.ListAPIView):
+    """
+    List all locations (public)
+    """
+    serializer_class = LocationSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        queryset = Location.objects.order_by('country', 'province', 'city')
+        country = self.request.query_params.get('country')
+        if country:
+            queryset = queryset.filter(country=country)
+        province = self.request.query_params.get('province')
+        if province:
+            queryset = queryset.filter(province=province)
+        return queryset
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete_locations(request):
+    """
+    Suggest locations whose city starts with ?q=, most used first
+    """
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    return Response(location_index.search(request.query_params.get('q', ''), limit))
@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import Photo
+
+
+@admin.register(Photo)
+class PhotoAdmin(LargeTableAdmin):
+    list_display = ['id', 'portfolio_item', 'alt_text', 'uploaded_at']
+    # PortfolioItem.__str__ reads the chapista's display name
+    list_select_related = ['portfolio_item__chapista_profile']
+    raw_id_fields = ['portfolio_item']
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from .models import Photo
+
+
+class PhotoSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading photo data
+    """
+    class Meta:
+        model = Photo
+        fields = ['id', 'file', 'alt_text', 'uploaded_at']
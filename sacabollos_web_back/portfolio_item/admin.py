@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import PortfolioItem
+
+
+@admin.register(PortfolioItem)
+class PortfolioItemAdmin(LargeTableAdmin):
+    list_display = ['title', 'chapista_profile', 'date_completed', 'created_at']
+    list_select_related = ['chapista_profile']
+    raw_id_fields = ['chapista_profile']
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from photo.serializers import PhotoSerializer
+from .models import PortfolioItem
+
+
+class PortfolioItemSerializer(serializers.ModelSerializer):
+    """
+    Serializer for reading portfolio items with their photos
+    """
+    photos = PhotoSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PortfolioItem
+        fields = ['id', 'chapista_profile', 'title', 'description', 'tags', 'date_completed',
+                'photos', 'created_at', 'updated_at']
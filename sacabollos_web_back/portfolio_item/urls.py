@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'portfolio_item'
+
+urlpatterns = [
+    path('chapista/<int:chapista_id>/', views.ChapistaPortfolioView.as_view(), name='chapista_portfolio'),
+]
@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+from core.cache import cache_response
+from .models import PortfolioItem
+from .serializers import PortfolioItemSerializer
 
-# Create your views here.
+
+@method_decorator(cache_response('portfolio:{chapista_id}'), name='dispatch')
+class ChapistaPortfolioView(generics.ListAPIView):
+    """
+    List the portfolio of a chapista (public)
+    """
+    serializer_class = PortfolioItemSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        return PortfolioItem.objects.filter(
+            chapista_profile_id=self.kwargs['chapista_id']
+        ).prefetch_related('photos')
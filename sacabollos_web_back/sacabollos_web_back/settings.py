@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'core',
 	'users',
     'chapista_profile',
     'company_profile',
@@ -55,15 +56,35 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # dispatches to one of MIDDLEWARE_PROFILES by URL prefix (core/middleware.py)
+    'core.middleware.MiddlewareProfiles',
 ]
 
+MIDDLEWARE_PROFILES = {
+    # admin, docs and anything not routed below
+    'full': [
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ],
+    # token-authenticated JSON API: no session, CSRF, messages or frame headers
+    'api': [
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ],
+}
+
+MIDDLEWARE_ROUTES = [
+    ('/api/', 'api'),
+]
+
+# admin.E408-E410 only inspect MIDDLEWARE; core.E001 checks the profile serving /admin/ instead
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'sacabollos_web_back.urls'
 
 TEMPLATES = [
@@ -88,20 +109,75 @@ WSGI_APPLICATION = 'sacabollos_web_back.wsgi.application'
 # REST FRAMEWORK ----
 
 REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # No DEFAULT_SCHEMA_CLASS: drf_spectacular's AutoSchema is applied by core.schema.SchemaGenerator
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
+        # /api/ runs without SessionMiddleware (MIDDLEWARE_ROUTES), so session auth could never succeed there
+        'users.authentication.ExpiringTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson backed when installed, stdlib json otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'SB_BACK_API',
     'DESCRIPTION': 'Documentation for API endpoints',
-    'VERSION': '1.0.0'
+    'VERSION': '1.0.0',
+    'DEFAULT_GENERATOR_CLASS': 'core.schema.SchemaGenerator',
+}
+
+# Prebuilt OpenAPI document served by /api/schema (python manage.py build_openapi,
+# see core/openapi.py). Rebuilt automatically in DEBUG when the URLconf changes.
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+
+# Expiring API tokens (see users/tokens.py), in seconds
+AUTH_TOKENS = {
+    'TTL': 14 * 24 * 3600,
+    'REFRESH_INTERVAL': 15 * 60,
+    'MAX_PER_USER': 10,
+}
+
+# Contract payments (see transaction/payments.py); IDEMPOTENCY_TTL in seconds
+PAYMENTS = {
+    'PROVIDER': 'transaction.payments.StubProvider',
+    'IDEMPOTENCY_TTL': 24 * 3600,
+}
+
+# CACHE ----
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'sacabollos'),
+    }
+}
+
+# Public read endpoint response cache (see core/cache.py)
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2.0,
+}
+
+# In-memory location autocomplete index (see locations/autocomplete.py)
+LOCATION_AUTOCOMPLETE = {
+    'REBUILD_INTERVAL': 600,
+}
+
+# In-memory chapista directory snapshot (see chapista_profile/directory.py)
+CHAPISTA_DIRECTORY = {
+    'REBUILD_INTERVAL': 600,
 }
 
 # Database
@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from .models import Transaction
+
+
+@admin.register(Transaction)
+class TransactionAdmin(LargeTableAdmin):
+    # booking_id: the contract may be archived already
+    list_display = ['id', 'booking_id', 'amount', 'status', 'provider_id', 'created_at']
+    list_filter = ['status']  # transaction_status_created_idx
+    search_fields = ['=provider_id']  # transaction_provider_idx
+    raw_id_fields = ['booking']
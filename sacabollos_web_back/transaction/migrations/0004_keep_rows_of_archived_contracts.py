@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-19 15:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_contract', '0003_archivedjobcontract'),
+        ('transaction', '0003_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='booking',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='job_contract.jobcontract'),
+        ),
+    ]
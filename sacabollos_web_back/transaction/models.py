@@ -11,12 +11,43 @@ class Transaction(models.Model):
         ('refunded', 'Refunded'),
     ]
 
-    booking = models.ForeignKey('job_contract.JobContract', on_delete=models.CASCADE)
+    # No database constraint: the contract may move to ArchivedJobContract (job_contract/archive.py)
+    # while its payments stay here, so booking_id can point at either table
+    booking = models.ForeignKey('job_contract.JobContract', on_delete=models.DO_NOTHING, db_constraint=False)
     amount = models.DecimalField(max_digits=8, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     provider_id = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='transaction_status_created_idx'),
+            models.Index(fields=['provider_id'], name='transaction_provider_idx'),
+        ]
+
+    def __str__(self):
+        return f"Transaction {self.id}: {self.amount}€ - {self.status}"
+
+class IdempotencyRecord(models.Model):
+    """
+    Stored outcome of a payment request, keyed by the client's Idempotency-Key
+    (see transaction/payments.py)
+
+    response_status is null while the first request with the key is still
+    being processed.
+    """
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, help_text="SHA-256 of method, path and body")
+    transaction = models.ForeignKey(Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    response_status = models.IntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ['user', 'key']
+
     def __str__(self):
-        return f"Transaction {self.id}: {self.amount}€ - {self.status}"
\ No newline at end of file
+        return f"Idempotency key {self.key} of user {self.user_id}"
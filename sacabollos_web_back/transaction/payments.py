@@ -0,0 +1,177 @@
+"""
+Idempotent contract payments
+
+A client retrying a payment sends the same Idempotency-Key header. The first
+request claims the key by inserting an IdempotencyRecord, relying on the
+(user, key) unique constraint rather than a lock, so claiming a key never
+waits on other requests. Later requests with the key get the stored
+response back without reaching the provider again, or a 409 while the first
+one is still running. Reusing a key for a different request is a 422.
+
+Keys only deduplicate retries of one request; a second device or a retry
+with a new key is stopped by the contract itself: the payment row is created
+as pending while the contract row is locked, and any pending or completed
+payment makes later attempts a 409. The lock is released before the
+provider is called.
+
+Records expire after PAYMENTS['IDEMPOTENCY_TTL'] and are removed in batches
+by purge_expired().
+"""
+import datetime
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from job_contract.models import JobContract
+from .models import IdempotencyRecord, Transaction
+from .serializers import TransactionSerializer
+
+
+class PaymentDeclined(Exception):
+    pass
+
+
+class StubProvider:
+    """
+    Local stand-in for the payment provider: approves every positive amount
+    """
+
+    def charge(self, amount, reference):
+        """
+        Args:
+            amount (Decimal): Amount in euros
+            reference (str): Idempotency reference forwarded to the provider
+
+        Returns:
+            str: Provider charge id
+
+        Raises:
+            PaymentDeclined: The provider refused the charge
+        """
+        if amount <= 0:
+            raise PaymentDeclined('Amount must be positive')
+        return f'stub_{uuid.uuid4().hex}'
+
+
+def _setting(name, default):
+    return getattr(settings, 'PAYMENTS', {}).get(name, default)
+
+
+def provider():
+    return import_string(_setting('PROVIDER', 'transaction.payments.StubProvider'))()
+
+
+def fingerprint(method, path, data):
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{method} {path}\n{payload}'.encode()).hexdigest()
+
+
+def _claim(user, key, request_fingerprint):
+    now = timezone.now()
+    # an expired record no longer protects its key; drop it so the key can be claimed again
+    IdempotencyRecord.objects.filter(user=user, key=key, expires_at__lte=now).delete()
+    try:
+        return IdempotencyRecord.objects.get_or_create(
+            user=user, key=key,
+            defaults={
+                'fingerprint': request_fingerprint,
+                'expires_at': now + datetime.timedelta(seconds=_setting('IDEMPOTENCY_TTL', 24 * 3600)),
+            },
+        )
+    except IntegrityError:
+        # lost the insert race to a concurrent purge/claim cycle; treat as in flight
+        return IdempotencyRecord.objects.filter(user=user, key=key).first(), False
+
+
+# Payments that block another attempt on the same contract
+LIVE_STATUSES = ['pending', 'completed']
+
+
+def _start_payment(contract):
+    with transaction.atomic():
+        status = JobContract.objects.select_for_update().filter(pk=contract.pk).values_list('status', flat=True).first()
+        if status is None:
+            return 404, {'error': 'Contract not found'}, None
+        if status == 'cancelled':
+            return 409, {'error': 'Contract was cancelled'}, None
+        if Transaction.objects.filter(booking_id=contract.pk, status__in=LIVE_STATUSES).exists():
+            return 409, {'error': 'Contract is already paid or a payment is in progress'}, None
+        return None, None, Transaction.objects.create(booking=contract, amount=contract.agreed_price)
+
+
+def _charge(contract, reference):
+    status, body, payment = _start_payment(contract)
+    if payment is None:
+        return status, body, None
+    try:
+        payment.provider_id = provider().charge(payment.amount, reference)
+        payment.status = 'completed'
+        status = 201
+    except PaymentDeclined:
+        payment.status = 'failed'
+        status = 402
+    except Exception:
+        # the provider deduplicates on the reference, so a retry with the same key can't charge twice
+        payment.status = 'failed'
+        payment.save(update_fields=['status', 'updated_at'])
+        raise
+    payment.save(update_fields=['status', 'provider_id', 'updated_at'])
+    return status, TransactionSerializer(payment).data, payment
+
+
+def pay_contract(user, contract, key, request_fingerprint):
+    """
+    Charge a contract's agreed price once per Idempotency-Key
+
+    Args:
+        user (User): Paying user, the scope of the key
+        contract (JobContract): Contract to pay
+        key (str): Client supplied Idempotency-Key
+        request_fingerprint (str): fingerprint() of the request
+
+    Returns:
+        tuple: (HTTP status, response body, whether the response is a replay)
+    """
+    record, created = _claim(user, key, request_fingerprint)
+    if not created:
+        if record is not None and record.fingerprint != request_fingerprint:
+            return 422, {'error': 'Idempotency-Key was already used for a different request'}, False
+        if record is None or record.response_status is None:
+            return 409, {'error': 'A request with this Idempotency-Key is still in progress'}, False
+        return record.response_status, record.response_body, True
+
+    try:
+        status, body, payment = _charge(contract, f'{user.pk}:{key}')
+    except Exception:
+        # nothing was stored for the key, so the client may retry it
+        record.delete()
+        raise
+    IdempotencyRecord.objects.filter(pk=record.pk).update(
+        response_status=status, response_body=body, transaction=payment,
+    )
+    return status, body, False
+
+
+def purge_expired(batch_size=1000, max_batches=None):
+    """
+    Delete expired idempotency records in batches, one short transaction each
+
+    Returns:
+        dict: deleted rows, batches and elapsed seconds
+    """
+    now = timezone.now()
+    deleted = batches = 0
+    start = time.perf_counter()
+    while max_batches is None or batches < max_batches:
+        ids = list(IdempotencyRecord.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += IdempotencyRecord.objects.filter(pk__in=ids).delete()[0]
+        batches += 1
+    return {'deleted': deleted, 'batches': batches, 'elapsed': time.perf_counter() - start}
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import Transaction
+
+
+class TransactionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for payment responses
+    """
+
+    class Meta:
+        model = Transaction
+        fields = ['id', 'booking', 'amount', 'status', 'provider_id', 'created_at']
@@ -1,3 +1,145 @@
-from django.test import TestCase
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.testing import QueryPlanAssertionsMixin
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from . import payments
+from .models import IdempotencyRecord, Transaction
 
-# Create your tests here.
+
+class TransactionIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_transactions_by_status_and_date_use_index(self):
+        since = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.assertUsesIndex(
+            Transaction.objects.filter(status='completed', created_at__gte=since), 'transaction_status_created_idx'
+        )
+
+    def test_transactions_by_provider_id_use_index(self):
+        self.assertUsesIndex(Transaction.objects.filter(provider_id='ch_123'), 'transaction_provider_idx')
+
+
+def make_contract():
+    company_user = User.objects.create(username='empresa', password='!')
+    company = CompanyProfile.objects.create(user=company_user, company_name='Talleres SL', contact_person='-', address='-')
+    chapista = ChapistaProfile.objects.create(user=User.objects.create(username='chapista', password='!'), display_name='Pepe')
+    offer = JobOffer.objects.create(company=company, title='Aleta', description='-', status='assigned')
+    contract = JobContract.objects.create(
+        job=offer, chapista_profile=chapista, company=company, agreed_price=Decimal('250.00'), agreed_time_hours=5,
+    )
+    return company_user, contract
+
+
+class PaymentIdempotencyTests(TestCase):
+    def setUp(self):
+        self.user, self.contract = make_contract()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/payments/contracts/{self.contract.pk}/'
+        self.real_charge = payments.StubProvider.charge
+        patcher = mock.patch.object(payments.StubProvider, 'charge', autospec=True, side_effect=self.real_charge)
+        self.charge = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pay(self, key, data=None):
+        return self.client.post(self.url, data or {'note': 'paragolpes'}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_response_without_charging_again(self):
+        first = self.pay('k1')
+        second = self.pay('k1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.charge.call_count, 1)
+        self.assertEqual(Transaction.objects.get().status, 'completed')
+
+        self.assertEqual(self.pay('k1', {'note': 'otra cosa'}).status_code, 422)
+        self.assertEqual(self.pay('k2').status_code, 409)
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, 400)
+
+    def test_duplicate_during_first_request_is_rejected(self):
+        nested = []
+
+        def charge(provider, amount, reference):
+            nested.append(self.pay('k1').status_code)
+            return 'stub_nested'
+
+        self.charge.side_effect = charge
+        self.assertEqual(self.pay('k1').status_code, 201)
+        self.assertEqual(nested, [409])
+
+    def test_second_key_cannot_pay_the_same_contract(self):
+        nested = []
+
+        def charge(provider, amount, reference):
+            # another device pays with its own key while the first charge is pending
+            nested.append(self.pay('other-device').status_code)
+            return 'stub_nested'
+
+        self.charge.side_effect = charge
+        self.assertEqual(self.pay('k1').status_code, 201)
+        self.assertEqual(nested, [409])
+        self.assertEqual(self.charge.call_count, 1)
+        self.assertEqual(list(Transaction.objects.values_list('status', flat=True)), ['completed'])
+
+    def test_provider_error_releases_key_and_expired_keys_are_purged(self):
+        self.charge.side_effect = ConnectionError
+        with self.assertRaises(ConnectionError):
+            self.pay('k1')
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        self.assertEqual(Transaction.objects.get().status, 'failed')
+
+        self.charge.side_effect = self.real_charge
+        self.assertEqual(self.pay('k1').status_code, 201)
+        IdempotencyRecord.objects.update(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        self.assertEqual(payments.purge_expired(batch_size=10)['deleted'], 1)
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite locks whole tables, concurrent writers fail instead of waiting')
+class PaymentConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+
+    def _pay_concurrently(self, key_for):
+        user, contract = make_contract()
+        barrier = threading.Barrier(self.THREADS)
+        codes = []
+
+        def worker(index):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                response = client.post(f'/api/payments/contracts/{contract.pk}/', {}, format='json',
+                                       HTTP_IDEMPOTENCY_KEY=key_for(index))
+                codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        with mock.patch.object(payments.StubProvider, 'charge', autospec=True,
+                               side_effect=payments.StubProvider.charge) as charge:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(charge.call_count, 1)
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertLessEqual(set(codes), {201, 409})
+        return codes
+
+    def test_concurrent_duplicates_charge_once(self):
+        codes = self._pay_concurrently(lambda index: 'same-key')
+        self.assertGreaterEqual(codes.count(201), 1)
+
+    def test_concurrent_keys_charge_once(self):
+        codes = self._pay_concurrently(lambda index: f'device-{index}')
+        self.assertEqual(codes.count(201), 1)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'transaction'
+
+urlpatterns = [
+    path('contracts/<int:contract_id>/', views.pay_contract, name='contract_payment'),
+]
@@ -1,3 +1,37 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from job_contract.models import JobContract
+from . import payments
 
-# Create your views here.
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def pay_contract(request, contract_id):
+    """
+    Pay a contract's agreed price (the hiring company or staff)
+
+    Requires an Idempotency-Key header: retries with the same key and body
+    get the first response back (Idempotent-Replayed: true) instead of a
+    second charge.
+    """
+    key = request.headers.get('Idempotency-Key', '').strip()
+    if not key or len(key) > 255:
+        return Response({
+            'error': 'An Idempotency-Key header of at most 255 characters is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    contract = get_object_or_404(JobContract.objects.select_related('company'), pk=contract_id)
+    if not request.user.is_staff and contract.company.user_id != request.user.id:
+        return Response({
+            'error': 'Only the hiring company can pay this contract'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    request_fingerprint = payments.fingerprint(request.method, request.path, request.data)
+    code, body, replayed = payments.pay_contract(request.user, contract, key, request_fingerprint)
+    response = Response(body, status=code)
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
@@ -1,3 +1,65 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from core.admin import LargeTableAdmin
+from . import moderation
+from .models import AuthToken, ModerationEvent, UserProfile
+
+
+def _done(modeladmin, request, changed, what):
+    modeladmin.message_user(request, f'{changed} {what}.', messages.SUCCESS)
+
+
+@admin.register(UserProfile)
+class UserProfileAdmin(LargeTableAdmin):
+    list_display = ['user', 'role', 'is_verified', 'phone', 'created_at']
+    list_select_related = ['user']
+    list_filter = ['role']
+    search_fields = ['^user__username', '=user__email']
+    raw_id_fields = ['user']
+    actions = ['verify', 'unverify', 'make_chapista', 'make_company', 'suspend', 'reactivate']
+
+    def _user_ids(self, queryset):
+        return queryset.values_list('user_id', flat=True)
+
+    @admin.action(description='Verify selected users')
+    def verify(self, request, queryset):
+        _done(self, request, moderation.verify_users(self._user_ids(queryset), actor=request.user), 'users verified')
+
+    @admin.action(description='Remove verification of selected users')
+    def unverify(self, request, queryset):
+        changed = moderation.verify_users(self._user_ids(queryset), verified=False, actor=request.user)
+        _done(self, request, changed, 'users unverified')
+
+    @admin.action(description='Change role of selected users to chapista')
+    def make_chapista(self, request, queryset):
+        _done(self, request, moderation.change_roles(self._user_ids(queryset), 'chapista', actor=request.user), 'roles changed')
+
+    @admin.action(description='Change role of selected users to company')
+    def make_company(self, request, queryset):
+        _done(self, request, moderation.change_roles(self._user_ids(queryset), 'company', actor=request.user), 'roles changed')
+
+    @admin.action(description='Suspend selected users and revoke their tokens')
+    def suspend(self, request, queryset):
+        _done(self, request, moderation.set_active(self._user_ids(queryset), False, actor=request.user), 'users suspended')
+
+    @admin.action(description='Reactivate selected users')
+    def reactivate(self, request, queryset):
+        _done(self, request, moderation.set_active(self._user_ids(queryset), True, actor=request.user), 'users reactivated')
+
+
+@admin.register(AuthToken)
+class AuthTokenAdmin(LargeTableAdmin):
+    list_display = ['id', 'user', 'device', 'created_at', 'last_used_at', 'expires_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    readonly_fields = ['key_hash', 'created_at', 'last_used_at']
+
+
+@admin.register(ModerationEvent)
+class ModerationEventAdmin(LargeTableAdmin):
+    list_display = ['created_at', 'action', 'user', 'old_value', 'new_value', 'actor', 'reason']
+    list_select_related = ['user', 'actor']
+    raw_id_fields = ['user', 'actor']
+
+    def has_change_permission(self, request, obj=None):
+        return False
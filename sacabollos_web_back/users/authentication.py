@@ -0,0 +1,18 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from . import tokens
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """
+    `Authorization: Token <key>` backed by hashed, expiring AuthTokens
+    """
+
+    def authenticate_credentials(self, key):
+        token = tokens.authenticate(key)
+        if token is None:
+            raise exceptions.AuthenticationFailed(_('Invalid or expired token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
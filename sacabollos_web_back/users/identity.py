@@ -0,0 +1,68 @@
+"""
+Request-scoped identity: the current user with their UserProfile and
+role-specific profile (ChapistaProfile / CompanyProfile)
+
+get_identity() loads all three with a single select_related query the first
+time it's called for a request and memoizes the result on the underlying
+HttpRequest, so views, permission classes and serializers (through
+context['request'], e.g. ContractReviewsSerializer) share it instead of each
+re-fetching the profile. Token
+authentication joins the same relations into its token lookup (see
+users/tokens.py), in which case the identity is built without a query.
+"""
+from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+
+
+# Reverse one-to-ones of User making up an identity, for select_related
+RELATED = ('userprofile', 'chapistaprofile', 'companyprofile')
+
+
+class Identity:
+    def __init__(self, user):
+        self.user = user
+        self.profile = _related(user, 'userprofile')
+        self.chapista = _related(user, 'chapistaprofile')
+        self.company = _related(user, 'companyprofile')
+
+    @property
+    def role(self):
+        return self.profile.role if self.profile is not None else None
+
+    @property
+    def is_admin(self):
+        return self.user.is_staff or self.role == 'admin'
+
+
+def _related(user, name):
+    # select_related caches a missing reverse one-to-one, accessing it still raises
+    try:
+        return getattr(user, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def _load(user):
+    if all(User._meta.get_field(name).is_cached(user) for name in RELATED):
+        return Identity(user)
+    return Identity(User.objects.select_related(*RELATED).get(pk=user.pk))
+
+
+def get_identity(request):
+    """
+    Identity of the request's user, loaded once per request
+
+    Args:
+        request (Request): DRF Request or Django HttpRequest
+
+    Returns:
+        Identity or None: None for anonymous requests
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    http_request = getattr(request, '_request', request)
+    identity = getattr(http_request, '_identity', None)
+    if identity is None or identity.user.pk != user.pk:
+        identity = http_request._identity = _load(user)
+    return identity
@@ -0,0 +1,68 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from users import moderation
+
+
+ACTIONS = {
+    'verify': lambda ids, o: moderation.verify_users(ids, True, **o),
+    'unverify': lambda ids, o: moderation.verify_users(ids, False, **o),
+    'suspend': lambda ids, o: moderation.set_active(ids, False, **o),
+    'reactivate': lambda ids, o: moderation.set_active(ids, True, **o),
+    'verify-company': lambda ids, o: moderation.verify_companies(ids, True, **o),
+    'unverify-company': lambda ids, o: moderation.verify_companies(ids, False, **o),
+}
+
+
+class Command(BaseCommand):
+    help = 'Apply a moderation action to many users in batched UPDATEs, with audit rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=sorted(ACTIONS) + ['role'])
+        parser.add_argument('--role', help="Target role for the 'role' action")
+        parser.add_argument('--ids', help='Comma separated user ids')
+        parser.add_argument('--ids-file', help="File with one user id per line, '-' for stdin")
+        parser.add_argument('--usernames', help='Comma separated usernames')
+        parser.add_argument('--actor', help='Username recorded as the author of the change')
+        parser.add_argument('--reason', default='')
+        parser.add_argument('--batch-size', type=int, default=moderation.BATCH_SIZE)
+
+    def _user_ids(self, options):
+        ids = []
+        if options['ids']:
+            ids += options['ids'].split(',')
+        if options['ids_file']:
+            stream = sys.stdin if options['ids_file'] == '-' else open(options['ids_file'])
+            with stream:
+                ids += [line.strip() for line in stream if line.strip()]
+        try:
+            ids = [int(user_id) for user_id in ids]
+        except ValueError as e:
+            raise CommandError(f'Invalid user id: {e}')
+        if options['usernames']:
+            ids += User.objects.filter(username__in=options['usernames'].split(',')).values_list('pk', flat=True)
+        if not ids:
+            raise CommandError('Pass --ids, --ids-file or --usernames')
+        return ids
+
+    def handle(self, *args, **options):
+        actor = None
+        if options['actor']:
+            actor = User.objects.filter(username=options['actor']).first()
+            if actor is None:
+                raise CommandError(f"Unknown actor '{options['actor']}'")
+        ids = self._user_ids(options)
+        kwargs = {'actor': actor, 'reason': options['reason'], 'batch_size': options['batch_size']}
+        try:
+            if options['action'] == 'role':
+                if not options['role']:
+                    raise CommandError("The 'role' action needs --role")
+                changed = moderation.change_roles(ids, options['role'], **kwargs)
+            else:
+                changed = ACTIONS[options['action']](ids, kwargs)
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+        self.stdout.write(f"{options['action']}: {changed} of {len(set(ids))} users changed")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.tokens import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired API tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=None, help='Per run, default until done')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running as a worker, sleeping N seconds between runs')
+
+    def _run_once(self, options):
+        stats = purge_expired(options['batch_size'], options['max_batches'])
+        self.stdout.write(
+            f"Deleted {stats['deleted']} expired tokens in {stats['batches']} batches ({stats['elapsed']:.2f}s)"
+        )
+
+    def handle(self, *args, **options):
+        if options['interval'] is None:
+            self._run_once(options)
+            return
+        while True:
+            self._run_once(options)
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+import datetime
+import hashlib
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def copy_legacy_tokens(apps, schema_editor):
+    """
+    Keep clients holding a rest_framework.authtoken key logged in: store the
+    hash of each key as an AuthToken with a fresh expiry, then drop the
+    plaintext keys
+    """
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('users', 'AuthToken')
+    now = timezone.now()
+    expires_at = now + datetime.timedelta(days=14)
+    AuthToken.objects.bulk_create(
+        (
+            AuthToken(user_id=token.user_id, key_hash=hashlib.sha256(token.key.encode()).hexdigest(),
+                    device='legacy', last_used_at=now, expires_at=expires_at)
+            for token in Token.objects.all().iterator()
+        ),
+        batch_size=1000,
+    )
+    Token.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('users', '0004_authtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_legacy_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0005_migrate_legacy_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('verify', 'Verify'), ('unverify', 'Unverify'), ('role', 'Change role'), ('suspend', 'Suspend'), ('reactivate', 'Reactivate'), ('verify_company', 'Verify company'), ('unverify_company', 'Unverify company')], max_length=20)),
+                ('old_value', models.CharField(blank=True, max_length=50)),
+                ('new_value', models.CharField(blank=True, max_length=50)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moderation_events', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
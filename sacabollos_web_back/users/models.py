@@ -15,5 +15,54 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['role'], name='users_profile_role_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} ({self.role})"
+
+
+class AuthToken(models.Model):
+    """
+    Expiring API token, one per device/login (see users/tokens.py)
+
+    Only the SHA-256 of the key is stored; the key itself is returned once,
+    when the token is issued.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    key_hash = models.CharField(max_length=64, unique=True)
+    device = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Token {self.pk} of user {self.user_id} ({self.device or 'unknown device'})"
+
+
+class ModerationEvent(models.Model):
+    """
+    Audit row for one account change made through users/moderation.py
+    """
+    ACTION_CHOICES = [
+        ('verify', 'Verify'),
+        ('unverify', 'Unverify'),
+        ('role', 'Change role'),
+        ('suspend', 'Suspend'),
+        ('reactivate', 'Reactivate'),
+        ('verify_company', 'Verify company'),
+        ('unverify_company', 'Unverify company'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='moderation_events')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    old_value = models.CharField(max_length=50, blank=True)
+    new_value = models.CharField(max_length=50, blank=True)
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.action} user {self.user_id}: {self.old_value} -> {self.new_value}"
@@ -0,0 +1,117 @@
+"""
+Bulk account moderation: verification, roles, suspension
+
+Every operation takes user ids, works through them in batches and, per
+batch, locks the rows still needing the change, applies it with a single
+UPDATE, writes one ModerationEvent per changed row with bulk_create and,
+after commit, runs the cache invalidation post_save would have run once per
+row. Rows already in the target state are skipped and not audited, so
+re-running an operation is a no-op.
+"""
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from company_profile.models import CompanyProfile
+from core import cache
+from .models import AuthToken, ModerationEvent, UserProfile
+
+
+BATCH_SIZE = 500
+
+
+def _batches(user_ids, batch_size):
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), batch_size):
+        yield user_ids[start:start + batch_size]
+
+
+def _apply(model, user_field, field, value, action, user_ids, actor, reason, batch_size, after=None):
+    changed = 0
+    extra = {'updated_at': timezone.now()} if any(f.name == 'updated_at' for f in model._meta.fields) else {}
+    for batch in _batches(user_ids, batch_size):
+        with transaction.atomic():
+            rows = list(
+                model.objects.select_for_update()
+                .filter(**{f'{user_field}__in': batch})
+                .exclude(**{field: value})
+                .values_list('pk', user_field, field)
+            )
+            if not rows:
+                continue
+            pks = [pk for pk, _, _ in rows]
+            model.objects.filter(pk__in=pks).update(**{field: value}, **extra)
+            ModerationEvent.objects.bulk_create(
+                ModerationEvent(
+                    user_id=user_id, actor=actor, action=action,
+                    old_value=str(old), new_value=str(value), reason=reason[:200],
+                )
+                for _, user_id, old in rows
+            )
+            if after is not None:
+                after([user_id for _, user_id, _ in rows])
+            transaction.on_commit(lambda pks=pks: cache.invalidate_rows(model, pks))
+        changed += len(rows)
+    return changed
+
+
+def verify_users(user_ids, verified=True, actor=None, reason='', batch_size=BATCH_SIZE):
+    """
+    Set UserProfile.is_verified for many users
+
+    Args:
+        user_ids (iterable): Ids of the users to change
+        verified (bool): Target value
+        actor (User): Staff member making the change, recorded in the audit rows
+        reason (str): Free text recorded in the audit rows
+
+    Returns:
+        int: Profiles actually changed
+    """
+    action = 'verify' if verified else 'unverify'
+    return _apply(UserProfile, 'user_id', 'is_verified', verified, action, user_ids, actor, reason, batch_size)
+
+
+def change_roles(user_ids, role, actor=None, reason='', batch_size=BATCH_SIZE):
+    """
+    Set UserProfile.role for many users
+
+    Returns:
+        int: Profiles actually changed
+
+    Raises:
+        ValidationError: If role is invalid
+    """
+    valid_roles = [choice[0] for choice in UserProfile.ROLE_CHOICES]
+    if role not in valid_roles:
+        raise ValidationError(f"Invalid role '{role}'. Valid roles: {valid_roles}")
+    return _apply(UserProfile, 'user_id', 'role', role, 'role', user_ids, actor, reason, batch_size)
+
+
+def _revoke_tokens(user_ids):
+    AuthToken.objects.filter(user_id__in=user_ids).delete()
+
+
+def set_active(user_ids, active, actor=None, reason='', batch_size=BATCH_SIZE):
+    """
+    Suspend (active=False) or reactivate accounts; suspension also revokes
+    every API token of the user in the same transaction
+
+    Returns:
+        int: Users actually changed
+    """
+    action = 'reactivate' if active else 'suspend'
+    after = None if active else _revoke_tokens
+    return _apply(User, 'id', 'is_active', active, action, user_ids, actor, reason, batch_size, after=after)
+
+
+def verify_companies(user_ids, verified=True, actor=None, reason='', batch_size=BATCH_SIZE):
+    """
+    Set CompanyProfile.verified for the companies of many users
+
+    Returns:
+        int: Company profiles actually changed
+    """
+    action = 'verify_company' if verified else 'unverify_company'
+    return _apply(CompanyProfile, 'user_id', 'verified', verified, action, user_ids, actor, reason, batch_size)
@@ -0,0 +1,24 @@
+from rest_framework.permissions import BasePermission
+from .identity import get_identity
+
+
+class IsChapista(BasePermission):
+    """
+    The request's user has a chapista profile
+    """
+    message = 'Only chapistas can do this'
+
+    def has_permission(self, request, view):
+        identity = get_identity(request)
+        return identity is not None and identity.chapista is not None
+
+
+class IsCompany(BasePermission):
+    """
+    The request's user has a company profile
+    """
+    message = 'Only companies can do this'
+
+    def has_permission(self, request, view):
+        identity = get_identity(request)
+        return identity is not None and identity.company is not None
@@ -1,3 +1,256 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpRequest
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from chapista_profile.models import ChapistaProfile
+from company_profile.models import CompanyProfile
+from core.serializers import FlatSerializer
+from core.testing import QueryPlanAssertionsMixin
+from job_contract.models import JobContract
+from job_offer.models import JobOffer
+from job_review.serializers import ContractReviewsSerializer
+from . import moderation, tokens
+from .identity import get_identity
+from .models import AuthToken, ModerationEvent, UserProfile
+from .serializers import UserProfileSerializer
+from .utils import update_profile
 
-# Create your tests here.
+
+class FlatUserProfileSerializerTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('maria', 'maria@example.com', 'pass', first_name='María')
+        UserProfile.objects.create(user=user, role='company', phone='+34600000000')
+        user = User.objects.create_user('juan', 'juan@example.com', 'pass')
+        UserProfile.objects.create(user=user, phone=None, is_verified=True)
+
+    def test_output_matches_model_serializer(self):
+        queryset = UserProfile.objects.order_by('id')
+        expected = [dict(row) for row in UserProfileSerializer(queryset, many=True).data]
+        self.assertEqual(FlatSerializer(UserProfileSerializer).serialize(queryset), expected)
+
+
+class UserIndexTests(QueryPlanAssertionsMixin, TestCase):
+    def test_profiles_by_role_use_index(self):
+        self.assertUsesIndex(UserProfile.objects.filter(role='company'), 'users_profile_role_idx')
+
+    def test_user_by_email_uses_index(self):
+        self.assertUsesIndex(User.objects.filter(email='maria@example.com'), 'auth_user_email_idx')
+
+
+class AuthTokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('lucia', 'lucia@example.com', 'secret')
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def login(self, device):
+        response = self.client.post('/api/users/login/', {'username': 'lucia', 'password': 'secret', 'device': device})
+        return response.data['token']
+
+    def profile(self, key):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        return self.client.get('/api/users/profile/').status_code
+
+    def test_one_hashed_token_per_device(self):
+        phone, laptop = self.login('phone'), self.login('laptop')
+        self.assertNotEqual(phone, laptop)
+        self.assertFalse(AuthToken.objects.filter(key_hash__in=[phone, laptop]).exists())
+        self.assertEqual(self.profile(phone), 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {phone}')
+        self.client.post('/api/users/logout/')
+        self.assertEqual(self.profile(phone), 401)
+        self.assertEqual(self.profile(laptop), 200)
+
+    def test_sliding_expiry_writes_at_most_once_per_interval(self):
+        key = self.login('phone')
+        token = AuthToken.objects.get()
+        with self.assertNumQueries(1):
+            tokens.authenticate(key)
+
+        later = timezone.now() + tokens.refresh_interval()
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            with self.assertNumQueries(2):
+                refreshed = tokens.authenticate(key)
+        self.assertEqual(refreshed.expires_at, later + tokens.ttl())
+        self.assertGreater(AuthToken.objects.get().expires_at, token.expires_at)
+
+    def test_expired_tokens_are_rejected_and_purged(self):
+        key = self.login('phone')
+        self.login('laptop')
+        AuthToken.objects.filter(device='phone').update(expires_at=timezone.now())
+        self.assertEqual(self.profile(key), 401)
+        self.assertEqual(tokens.purge_expired(batch_size=1)['deleted'], 1)
+        self.assertEqual(list(AuthToken.objects.values_list('device', flat=True)), ['laptop'])
+
+
+class ModerationTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f'user{i}', password='!') for i in range(25)]
+        UserProfile.objects.bulk_create(UserProfile(user=user) for user in self.users)
+        self.ids = [user.pk for user in self.users]
+
+    def statements(self, queries, verb):
+        return [q['sql'] for q in queries if q['sql'].startswith(verb)]
+
+    def test_batched_updates_and_audit_rows(self):
+        UserProfile.objects.filter(user_id=self.ids[0]).update(is_verified=True)
+        with CaptureQueriesContext(connection) as queries:
+            changed = moderation.verify_users(self.ids, batch_size=10)
+        self.assertEqual(changed, 24)
+        self.assertEqual(len(self.statements(queries, 'UPDATE')), 3)
+        self.assertEqual(len(self.statements(queries, 'INSERT')), 3)
+        self.assertEqual(UserProfile.objects.filter(is_verified=True).count(), 25)
+        self.assertEqual(ModerationEvent.objects.filter(action='verify', old_value='False').count(), 24)
+        self.assertEqual(moderation.verify_users(self.ids), 0)
+
+    def test_company_invalidation_runs_once_per_batch(self):
+        companies = CompanyProfile.objects.bulk_create(
+            CompanyProfile(user=user, company_name=user.username, contact_person='-', address='-')
+            for user in self.users
+        )
+        with mock.patch('core.cache.invalidate') as invalidate, self.captureOnCommitCallbacks(execute=True):
+            changed = moderation.verify_companies(self.ids, batch_size=20)
+        self.assertEqual(changed, len(companies))
+        self.assertEqual(invalidate.call_count, 2)
+        self.assertFalse(CompanyProfile.objects.filter(verified=False).exists())
+
+    def test_suspend_revokes_tokens(self):
+        tokens.issue(self.users[0], device='phone')
+        tokens.issue(self.users[1], device='phone')
+        moderation.set_active(self.ids[:1], False, reason='spam')
+        self.assertEqual(list(AuthToken.objects.values_list('user_id', flat=True)), [self.ids[1]])
+        self.assertFalse(User.objects.get(pk=self.ids[0]).is_active)
+        self.assertEqual(ModerationEvent.objects.get().reason, 'spam')
+
+    def test_command_changes_roles(self):
+        call_command('moderate_users', 'role', '--role', 'company', '--usernames', 'user1,user2', stdout=StringIO())
+        self.assertEqual(UserProfile.objects.filter(role='company').count(), 2)
+        with self.assertRaises(CommandError):
+            call_command('moderate_users', 'role', '--role', 'pirate', '--ids', '1', stdout=StringIO())
+
+
+class ProfileUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('marta', 'marta@example.com', 'secret', first_name='Marta')
+        self.profile = UserProfile.objects.create(user=self.user, phone='600000000')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def patch(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch('/api/users/profile/update/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+
+    def test_no_op_update_writes_nothing(self):
+        updated_at = self.profile.updated_at
+        self.assertEqual(self.patch({'email': 'marta@example.com', 'first_name': 'Marta', 'phone': '600000000'}), [])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.updated_at, updated_at)
+
+    def test_only_changed_columns_are_written(self):
+        updates = self.patch({'first_name': 'Marta', 'phone': '611111111'})
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"users_userprofile" SET "phone" = ', updates[0])
+        self.assertNotIn('"role"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+
+    def test_user_and_profile_changes_share_a_transaction(self):
+        other = User.objects.create_user('otra', 'otra@example.com', 'secret')
+        with mock.patch.object(UserProfile, 'save', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                update_profile(self.profile, {'first_name': 'Mar', 'phone': '622222222'})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Marta')
+        response = self.client.patch('/api/users/profile/update/', {'email': other.email}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class IdentityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'secret')
+        UserProfile.objects.create(user=self.user, role='chapista')
+        self.chapista = ChapistaProfile.objects.create(user=self.user, display_name='Ana')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def identity_queries(self, queries):
+        return [q['sql'] for q in queries if q['sql'].startswith('SELECT') and '"users_userprofile"' in q['sql']]
+
+    def test_profile_endpoint_loads_identity_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/profile/')
+        self.assertEqual(response.data['username'], 'ana')
+
+    def test_token_lookup_loads_the_identity(self):
+        key, _ = tokens.issue(self.user, device='phone')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/users/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'ana')
+        self.assertEqual(len(queries), 1, [q['sql'] for q in queries])
+        self.assertIn('"users_authtoken"', queries[0]['sql'])
+
+    def test_permission_and_view_share_the_identity(self):
+        company = CompanyProfile.objects.create(
+            user=User.objects.create(username='empresa', password='!'), company_name='Talleres SL',
+            contact_person='-', address='-',
+        )
+        offer = JobOffer.objects.create(company=company, title='Capó', description='-')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/proposals/offers/{offer.pk}/', {
+                'message': '-', 'proposed_price': '90.00', 'proposed_time_hours': 2,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['chapista_profile'], self.chapista.pk)
+        self.assertEqual(len(self.identity_queries(queries)), 1)
+
+    def test_serializer_shares_the_identity(self):
+        company = CompanyProfile.objects.create(
+            user=User.objects.create(username='empresa', password='!'), company_name='Talleres SL',
+            contact_person='-', address='-',
+        )
+        contract = JobContract.objects.create(
+            job=JobOffer.objects.create(company=company, title='Capó', description='-'), chapista_profile=self.chapista,
+            company=company, agreed_price='90.00', agreed_time_hours=2, status='finished',
+        )
+        request = HttpRequest()
+        request.user = self.user
+        get_identity(request)
+        own = {'reviews': [{'from_user': self.user.pk, 'rating': 4, 'comment': '-'}]}
+        with self.assertNumQueries(0):
+            self.assertTrue(ContractReviewsSerializer(data=own, context={'request': request}).is_valid())
+
+        url = f'/api/reviews/contracts/{contract.pk}/'
+        review = {'from_user': company.user_id, 'rating': 5, 'comment': '-'}
+        self.assertEqual(self.client.post(url, {'reviews': [review]}, format='json').status_code, 403)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, own, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.identity_queries(queries)), 1)
+
+        # Admins by role, not only staff, may submit the other side
+        admin = User.objects.create(username='admin', password='!')
+        UserProfile.objects.create(user=admin, role='admin')
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.post(url, {'reviews': [review]}, format='json').status_code, 201)
+
+    def test_missing_role_profiles_are_none(self):
+        request = HttpRequest()
+        request.user = self.user
+        identity = get_identity(request)
+        self.assertEqual(identity.chapista, self.chapista)
+        self.assertIsNone(identity.company)
+        self.assertEqual(identity.role, 'chapista')
+        with self.assertNumQueries(0):
+            self.assertIs(get_identity(request), identity)
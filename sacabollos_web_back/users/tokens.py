@@ -0,0 +1,113 @@
+"""
+Expiring, hashed API tokens
+
+Each login issues a new AuthToken, so every device keeps its own token and
+logging out of one doesn't affect the others. Keys are 40 random hex
+characters, looked up by their SHA-256 (a fast hash is enough for random
+keys), so the table never holds a usable credential.
+
+Expiry slides: a token used within TTL stays valid, but last_used_at and
+expires_at are only rewritten once per REFRESH_INTERVAL, so authenticated
+traffic doesn't turn into a write per request. Expired rows are removed in
+batches by purge_expired(), keeping the table small enough to stay in memory.
+"""
+import datetime
+import hashlib
+import secrets
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import identity
+from .models import AuthToken
+
+
+def _setting(name, default):
+    return getattr(settings, 'AUTH_TOKENS', {}).get(name, default)
+
+
+def ttl():
+    return datetime.timedelta(seconds=_setting('TTL', 14 * 24 * 3600))
+
+
+def refresh_interval():
+    return datetime.timedelta(seconds=_setting('REFRESH_INTERVAL', 15 * 60))
+
+
+def hash_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue(user, device=''):
+    """
+    Create a new token for a user, dropping their oldest ones beyond MAX_PER_USER
+
+    Returns:
+        tuple: (plaintext key, AuthToken)
+    """
+    key = secrets.token_hex(20)
+    now = timezone.now()
+    token = AuthToken.objects.create(
+        user=user, key_hash=hash_key(key), device=device[:100], last_used_at=now, expires_at=now + ttl(),
+    )
+    stale = list(
+        AuthToken.objects.filter(user=user).order_by('-last_used_at', '-pk')
+        .values_list('pk', flat=True)[_setting('MAX_PER_USER', 10):]
+    )
+    if stale:
+        AuthToken.objects.filter(pk__in=stale).delete()
+    return key, token
+
+
+def authenticate(key):
+    """
+    Resolve a key to its live token, sliding its expiry when due
+
+    Returns:
+        AuthToken: With user and identity profiles loaded, or None if unknown or expired
+    """
+    token = (
+        AuthToken.objects.select_related('user', *(f'user__{name}' for name in identity.RELATED))
+        .filter(key_hash=hash_key(key)).first()
+    )
+    now = timezone.now()
+    if token is None or token.expires_at <= now:
+        return None
+    if now - token.last_used_at >= refresh_interval():
+        # Conditional UPDATE: concurrent requests refresh at most once
+        AuthToken.objects.filter(pk=token.pk, last_used_at=token.last_used_at).update(
+            last_used_at=now, expires_at=now + ttl(),
+        )
+        token.last_used_at, token.expires_at = now, now + ttl()
+    return token
+
+
+def revoke(token=None, user=None):
+    """
+    Delete one token, or every token of a user
+
+    Returns:
+        int: Tokens deleted
+    """
+    queryset = AuthToken.objects.filter(pk=token.pk) if token is not None else AuthToken.objects.filter(user=user)
+    return queryset.delete()[0]
+
+
+def purge_expired(batch_size=1000, max_batches=None):
+    """
+    Delete expired tokens in batches, one short transaction each
+
+    Returns:
+        dict: deleted rows, batches and elapsed seconds
+    """
+    now = timezone.now()
+    deleted = batches = 0
+    start = time.perf_counter()
+    while max_batches is None or batches < max_batches:
+        ids = list(AuthToken.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += AuthToken.objects.filter(pk__in=ids).delete()[0]
+        batches += 1
+    return {'deleted': deleted, 'batches': batches, 'elapsed': time.perf_counter() - start}
@@ -7,6 +7,7 @@ urlpatterns = [
     # Authentication endpoints
     path('register/', views.register_user, name='register'),
     path('login/', views.login_user, name='login'),
+    path('logout/', views.logout_user, name='logout'),
     
     # Profile management
     path('profile/', views.get_user_profile, name='profile'),
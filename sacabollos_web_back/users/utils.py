@@ -51,6 +51,68 @@ def create_user_with_profile(username, email, password, role='chapista', phone='
         return profile
 
 
+USER_FIELDS = ('email', 'first_name', 'last_name')
+PROFILE_FIELDS = ('phone', 'role')
+
+
+def save_changed(instance, values):
+    """
+    Assign the values that differ from the instance and save only those columns
+
+    auto_now columns (updated_at) are only bumped when something else changed.
+
+    Args:
+        instance (Model): Instance to update
+        values (dict): Field name -> new value
+
+    Returns:
+        list: Names of the fields that changed (empty: nothing was written)
+    """
+    changed = [name for name, value in values.items() if getattr(instance, name) != value]
+    if not changed:
+        return []
+    for name in changed:
+        setattr(instance, name, values[name])
+    touched = [f.name for f in instance._meta.concrete_fields if getattr(f, 'auto_now', False)]
+    instance.save(update_fields=changed + touched)
+    return changed
+
+
+def _check_email(user, email):
+    if User.objects.filter(email=email).exclude(id=user.id).exists():
+        raise ValidationError(f"Email '{email}' already exists")
+
+
+def update_profile(user_profile, data):
+    """
+    Apply User and UserProfile field updates in one transaction, writing
+    only the columns whose value changed
+
+    Args:
+        user_profile (UserProfile): Profile to update, with its user
+        data (dict): Any of USER_FIELDS and PROFILE_FIELDS; other keys are ignored
+
+    Returns:
+        dict: Changed field names under 'user' and 'profile'
+
+    Raises:
+        ValidationError: If the email belongs to another user or the role is invalid
+    """
+    user = user_profile.user
+    user_values = {name: data[name] for name in USER_FIELDS if name in data}
+    profile_values = {name: data[name] for name in PROFILE_FIELDS if name in data}
+    if 'role' in profile_values and profile_values['role'] not in dict(UserProfile.ROLE_CHOICES):
+        raise ValidationError(f"Invalid role '{profile_values['role']}'")
+
+    with transaction.atomic():
+        if user_values.get('email', user.email) != user.email:
+            _check_email(user, user_values['email'])
+        return {
+            'user': save_changed(user, user_values),
+            'profile': save_changed(user_profile, profile_values),
+        }
+
+
 def update_user_email(user, new_email):
     """
     Update user email with uniqueness validation
@@ -65,11 +127,9 @@ def update_user_email(user, new_email):
     Raises:
         ValidationError: If email already exists
     """
-    if User.objects.filter(email=new_email).exclude(id=user.id).exists():
-        raise ValidationError(f"Email '{new_email}' already exists")
-    
-    user.email = new_email
-    user.save()
+    if new_email != user.email:
+        _check_email(user, new_email)
+        save_changed(user, {'email': new_email})
     return True
 
 
@@ -112,8 +172,7 @@ def verify_user(user_profile):
     Returns:
         UserProfile: Updated profile
     """
-    user_profile.is_verified = True
-    user_profile.save()
+    save_changed(user_profile, {'is_verified': True})
     return user_profile
 
 
@@ -136,8 +195,7 @@ def change_user_role(user_profile, new_role):
     if new_role not in valid_roles:
         raise ValidationError(f"Invalid role '{new_role}'. Valid roles: {valid_roles}")
     
-    user_profile.role = new_role
-    user_profile.save()
+    save_changed(user_profile, {'role': new_role})
     return user_profile
 
 
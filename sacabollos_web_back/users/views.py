@@ -1,12 +1,15 @@
 from django.shortcuts import render
 from django.contrib.auth import authenticate, login
-from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
-from .models import UserProfile
+from core.mixins import FlatListMixin
+from . import tokens
+from .identity import get_identity
+from .models import AuthToken, UserProfile
+from .utils import update_profile
 from .serializers import (
     UserRegistrationSerializer, 
     UserProfileSerializer, 
@@ -14,6 +17,10 @@ from .serializers import (
 )
 
 
+def _device(request):
+    return request.data.get('device') or request.headers.get('User-Agent', '')
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_user(request):
@@ -26,7 +33,7 @@ def register_user(request):
         user_profile = serializer.save()
         
         # Create authentication token
-        token, created = Token.objects.get_or_create(user=user_profile.user)
+        key, token = tokens.issue(user_profile.user, _device(request))
         
         # Return user profile data with token
         profile_serializer = UserProfileSerializer(user_profile)
@@ -34,7 +41,8 @@ def register_user(request):
         return Response({
             'message': 'User registered successfully',
             'user': profile_serializer.data,
-            'token': token.key
+            'token': key,
+            'expires_at': token.expires_at,
         }, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -55,14 +63,16 @@ def login_user(request):
         user = authenticate(username=username, password=password)
         
         if user:
-            token, created = Token.objects.get_or_create(user=user)
+            # A new token per login, so each device can log out on its own
+            key, token = tokens.issue(user, _device(request))
             user_profile = UserProfile.objects.get(user=user)
             profile_serializer = UserProfileSerializer(user_profile)
             
             return Response({
                 'message': 'Login successful',
                 'user': profile_serializer.data,
-                'token': token.key
+                'token': key,
+                'expires_at': token.expires_at,
             })
         else:
             return Response({
@@ -72,20 +82,37 @@ def login_user(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_user(request):
+    """
+    Revoke the token used for this request (?all=true: every device)
+    """
+    if request.query_params.get('all') in ('1', 'true'):
+        revoked = tokens.revoke(user=request.user)
+    elif isinstance(request.auth, AuthToken):
+        revoked = tokens.revoke(token=request.auth)
+    else:
+        revoked = 0
+    return Response({
+        'message': 'Logged out',
+        'revoked': revoked,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
     """
     Get current user's profile
     """
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        serializer = UserProfileSerializer(user_profile)
-        return Response(serializer.data)
-    except UserProfile.DoesNotExist:
+    user_profile = get_identity(request).profile
+    if user_profile is None:
         return Response({
             'error': 'User profile not found'
         }, status=status.HTTP_404_NOT_FOUND)
+    serializer = UserProfileSerializer(user_profile)
+    return Response(serializer.data)
 
 
 @api_view(['PUT', 'PATCH'])
@@ -94,49 +121,31 @@ def update_user_profile(request):
     """
     Update user profile (both User and UserProfile fields)
     """
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        user = request.user
-        
-        # Update User model fields
-        if 'email' in request.data:
-            # Check email uniqueness
-            if User.objects.filter(email=request.data['email']).exclude(id=user.id).exists():
-                return Response({
-                    'error': 'Email already exists'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            user.email = request.data['email']
-        
-        if 'first_name' in request.data:
-            user.first_name = request.data['first_name']
-        
-        if 'last_name' in request.data:
-            user.last_name = request.data['last_name']
-        
-        user.save()
-        
-        # Update UserProfile fields
-        if 'phone' in request.data:
-            user_profile.phone = request.data['phone']
-        
-        if 'role' in request.data and request.data['role'] in dict(UserProfile.ROLE_CHOICES):
-            user_profile.role = request.data['role']
-        
-        user_profile.save()
-        
-        serializer = UserProfileSerializer(user_profile)
-        return Response({
-            'message': 'Profile updated successfully',
-            'user': serializer.data
-        })
-        
-    except UserProfile.DoesNotExist:
+    user_profile = get_identity(request).profile
+    if user_profile is None:
         return Response({
             'error': 'User profile not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
+    data = dict(request.data.items())
+    # Unknown roles have always been ignored rather than rejected
+    if data.get('role') not in dict(UserProfile.ROLE_CHOICES):
+        data.pop('role', None)
+    try:
+        update_profile(user_profile, data)
+    except ValidationError:
+        return Response({
+            'error': 'Email already exists'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = UserProfileSerializer(user_profile)
+    return Response({
+        'message': 'Profile updated successfully',
+        'user': serializer.data
+    })
+
 
-class UserListView(generics.ListAPIView):
+class UserListView(FlatListMixin, generics.ListAPIView):
     """
     List all users (admin only)
     """
@@ -146,7 +155,7 @@ class UserListView(generics.ListAPIView):
     
     def get_queryset(self):
         # Only allow admins to see all users
-        if self.request.user.userprofile.role == 'admin':
+        if get_identity(self.request).role == 'admin':
             return UserProfile.objects.all()
         else:
             # Regular users can only see their own profile